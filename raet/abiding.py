@@ -30,6 +30,12 @@ if sys.version > '3':  # Python3
         """
         return x
 
+    def b2v(x):
+        """
+        Converts from native bytes type to zero copy sliceable buffer view
+        """
+        return memoryview(x)
+
 else:  # Python2
     # long = long
     # basestring = basestring
@@ -46,3 +52,11 @@ else:  # Python2
         Converts from native str type to native unicode type
         """
         return unicode(x)
+
+    def b2v(x):
+        """
+        Converts from native bytes type to sliceable buffer
+        Python2 str slices are not zero copy but memoryview is not
+        supported everywhere a str is so return as is
+        """
+        return x
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+'''
+asyncing.py raet protocol asyncio integration
+
+Adapter drives a RoadStack or LaneStack from an asyncio event loop instead of
+polling serviceAll from a thread. The server socket is registered with
+loop.add_reader and the earliest stack deadline is scheduled with loop.call_at
+so timer based processing runs only when due.
+
+Usage:
+    adapter = asyncing.Adapter(stack)
+    adapter.open()
+    outcome = await adapter.transmit(odict(content='Hello'))
+    msg, name = await adapter.receive()
+    async for msg, name in adapter:
+        ...
+'''
+# pylint: skip-file
+# pylint: disable=W0611
+
+# Import python libs
+import asyncio
+from collections import deque
+
+# Import ioflo libs
+from ioflo.base.odicting import odict
+
+# Import raet libs
+from .abiding import *  # import globals
+from . import raeting
+from .road import stacking as roadstacking
+
+from .consoling import getConsole
+console = getConsole()
+
+
+class Adapter(object):
+    '''
+    RAET protocol asyncio adapter for a RoadStack or LaneStack
+        .stack is the stack driven by the event loop
+        .loop is the asyncio event loop
+        .manage is True to call stack.manage for keep alive and reaping
+        .handle is the TimerHandle of the scheduled deadline if any
+    The store stamp follows loop.time() from when opened so store based
+    timers run in loop time. The adapter is an async iterator over the
+    received messages of the stack.
+    '''
+    def __init__(self, stack, loop=None, manage=True):
+        '''
+        Setup instance
+        stack is RoadStack or LaneStack instance
+        loop is asyncio event loop, None means the current loop
+        manage is True to also manage remotes of a RoadStack
+        '''
+        self.stack = stack
+        self.loop = loop or asyncio.get_event_loop()
+        self.manage = manage and isinstance(stack, roadstacking.RoadStack)
+        self.handle = None  # TimerHandle of scheduled deadline
+        self.origin = None  # duple (loop time, store stamp) when opened
+        self.waiters = deque()  # futures awaiting received messages
+        self.sents = deque()  # futures awaiting lane transmits
+        self.opened = False
+
+    def open(self):
+        '''
+        Register stack server socket with loop and start servicing
+        Raises StackError if the server has no socket such as mailslots
+        '''
+        if self.opened:
+            return
+        ss = getattr(self.stack.server, 'ss', None)
+        if ss is None:
+            emsg = "Stack '{0}': No socket to add reader\n".format(self.stack.name)
+            raise raeting.StackError(emsg)
+        self.origin = (self.loop.time(), self.stack.store.stamp)
+        self.loop.add_reader(ss, self.service)
+        self.opened = True
+        self.service()
+
+    def close(self):
+        '''
+        Unregister stack server socket and cancel scheduled deadline
+        Ends any pending iteration over received messages
+        '''
+        if not self.opened:
+            return
+        self.loop.remove_reader(self.stack.server.ss)
+        if self.handle:
+            self.handle.cancel()
+            self.handle = None
+        self.opened = False
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(StopAsyncIteration())
+
+    def advance(self):
+        '''
+        Advance store stamp to follow loop time since opened
+        Never moves the stamp back so stacks may share a store
+        '''
+        then, stamp = self.origin
+        stamp += self.loop.time() - then
+        if stamp > self.stack.store.stamp:
+            self.stack.store.changeStamp(stamp)
+
+    def service(self):
+        '''
+        Service stack then deliver received messages and schedule next deadline
+        '''
+        if not self.opened:
+            return
+        self.advance()
+        if self.manage:
+            self.stack.manage()
+        self.stack.serviceAll()
+        self.deliver()
+        self.schedule()
+
+    def deliver(self):
+        '''
+        Resolve waiting futures with received messages and lane transmits
+        '''
+        while self.waiters and self.stack.rxMsgs:
+            waiter = self.waiters.popleft()
+            if not waiter.done():  # skip cancelled
+                waiter.set_result(self.stack.rxMsgs.popleft())
+        if not self.stack.txMsgs:
+            while self.sents:
+                sent = self.sents.popleft()
+                if not sent.done():
+                    sent.set_result(raeting.Outcome.complete)
+
+    def schedule(self):
+        '''
+        Schedule service at the earliest stack deadline with loop.call_at
+        Services soon when the stack still has pending txMsgs or txes
+        '''
+        if self.handle:
+            self.handle.cancel()
+            self.handle = None
+        if self.stack.txMsgs or self.stack.txes or self.stack.rxes:
+            self.handle = self.loop.call_soon(self.service)
+            return
+        deadline = self.stack.deadline(manage=self.manage)
+        if deadline is not None:
+            then, stamp = self.origin
+            self.handle = self.loop.call_at(then + (deadline - stamp), self.service)
+
+    def transmit(self, msg, uid=None, timeout=None):
+        '''
+        Transmit msg to remote uid
+        Returns future that resolves to Outcome.complete when the message
+        transaction completes or raises TransactionError when it is rejected,
+        times out or fails. Lane transmits complete once sent.
+        timeout as in RoadStack.transmit
+        '''
+        future = self.loop.create_future()
+
+        def done(outcome):
+            if future.done():
+                return
+            if outcome == raeting.Outcome.complete:
+                future.set_result(outcome)
+            else:
+                emsg = "Message to '{0}' {1}\n".format(uid, outcome.name)
+                future.set_exception(raeting.TransactionError(emsg))
+
+        if isinstance(self.stack, roadstacking.RoadStack):
+            self.stack.transmit(msg, uid=uid, timeout=timeout, done=done)
+        else:
+            count = len(self.stack.txMsgs)
+            self.stack.transmit(msg, uid=uid)
+            if len(self.stack.txMsgs) > count:
+                self.sents.append(future)
+            else:
+                done(raeting.Outcome.failed)
+
+        if self.opened and not future.done():
+            self.schedule()  # services soon since txMsgs pending
+        return future
+
+    def receive(self):
+        '''
+        Returns future that resolves to the next received (msg, name) duple
+        '''
+        future = self.loop.create_future()
+        if self.stack.rxMsgs and not self.waiters:
+            future.set_result(self.stack.rxMsgs.popleft())
+        elif not self.opened:
+            future.set_exception(StopAsyncIteration())
+        else:
+            self.waiters.append(future)
+        return future
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        return self.receive()
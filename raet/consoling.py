@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+'''
+consoling.py raet protocol console logging facade
+
+Console wraps the ioflo console so that messages given with format args are
+only formatted when the console verbosity allows the write. Hot paths call
+    console.concise("Messenger {0}. Done with {1}\n", name, remote)
+instead of
+    console.concise("Messenger {0}. Done with {1}\n".format(name, remote))
+so the formatting cost is skipped entirely when not written.
+Messages without args are written as is.
+'''
+# pylint: skip-file
+# pylint: disable=W0611
+
+# Import ioflo libs
+from ioflo.base import consoling
+
+# Import raet libs
+from .abiding import *  # import globals
+
+
+class Console(object):
+    '''
+    RAET console facade with lazy formatting over ioflo console
+    Attributes not defined here such as reinit are those of the ioflo console
+    '''
+    Wordage = consoling.Console.Wordage
+    Eager = False  # True formats even when not written for benchmarking
+
+    def __init__(self, console=None):
+        '''
+        Setup instance
+        console is ioflo console, None means the global ioflo console
+        '''
+        self.console = console or consoling.getConsole()
+
+    def __getattr__(self, name):
+        return getattr(self.console, name)
+
+    def enabled(self, verbosity):
+        '''
+        Returns True if console writes at verbosity so callers may guard
+        building costly args
+        '''
+        return verbosity <= self.console._verbosity
+
+    def _write(self, verbosity, msg, args):
+        '''
+        Format msg with args and write only when enabled at verbosity
+        '''
+        if verbosity <= self.console._verbosity:
+            self.console.write(msg.format(*args) if args else msg)
+        elif self.Eager and args:
+            msg.format(*args)
+
+    def terse(self, msg, *args):
+        '''
+        Write at terse verbosity level
+        '''
+        self._write(self.Wordage.terse, msg, args)
+
+    def concise(self, msg, *args):
+        '''
+        Write at concise verbosity level
+        '''
+        self._write(self.Wordage.concise, msg, args)
+
+    def verbose(self, msg, *args):
+        '''
+        Write at verbose verbosity level
+        '''
+        self._write(self.Wordage.verbose, msg, args)
+
+    def profuse(self, msg, *args):
+        '''
+        Write at profuse verbosity level
+        '''
+        self._write(self.Wordage.profuse, msg, args)
+
+
+def getConsole(console=None):
+    '''
+    Returns raet console facade over ioflo console
+    '''
+    return Console(console=console)
@@ -229,7 +229,7 @@ class RaetRoadStackCloser(deeding.Deed):
         Close udp socket
         '''
         if self.stack.value and isinstance(self.stack.value, RoadStack):
-            self.stack.value.server.close()
+            self.stack.value.close()
 
 class RaetRoadStackRxServicer(deeding.Deed):
     '''
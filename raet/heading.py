@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+#pylint: skip-file
+'''
+heading module provides compiled codecs for RAET packet and page heads
+
+Each codec is compiled once per head kind from the field tables in raeting.
+The field order, default elision rules and value converters are resolved
+at compile time into plans so that packing or parsing a head only walks the
+fields that may actually appear in it.
+
+'''
+
+# Import python libs
+import struct
+try:
+    import simplejson as json
+except ImportError:
+    import json
+
+# Import ioflo libs
+from ioflo.base.odicting import odict
+
+from ioflo.base.consoling import getConsole
+console = getConsole()
+
+# Import raet libs
+from .abiding import *  # import globals
+from . import raeting
+from .raeting import HeadKind
+
+def converter(fmt):
+    '''
+    Returns callable that converts text head field value string given by
+    format fmt to its python value
+    '''
+    if 'x' in fmt:
+        return (lambda val: int(val, 16))
+    if 'd' in fmt:
+        return int
+    if 'f' in fmt:
+        return float
+    return str
+
+def flagMasks(fields):
+    '''
+    Returns list of (field, mask) duples for flag fields where
+    first field is the high order bit of the flags byte
+    '''
+    return [(field, 0x80 >> i) for i, field in enumerate(fields)]
+
+
+class RaetPacketHeadCodec(object):
+    '''
+    Compiled codec for raet (text line) packet heads
+    The codecs of the other head kinds subclass it and override .compile,
+    .match, .pack and .parse
+
+    Class Attributes:
+        Hk is the head kind of this codec
+        Extrasize is the extra head size as a result of segmentation
+
+    Attributes:
+        .optionals is list of (field, default) duples of the optional head
+            fields, in head order, that are included only if not default
+        .plan is the compiled plan of .optionals
+        .masks is list of (field, mask) duples for the flag fields
+    '''
+    Hk = HeadKind.raet.value
+    Extrasize = 27
+    Fixeds = ['ri', 'pl', 'hl', 'fg']  # always in head so not in plan
+    Lead = 'ri RAET\npl {0}\nhl {1}\nfg {2:.2s}'
+
+    def __init__(self):
+        '''
+        Setup instance by compiling plan
+        '''
+        self.optionals = [(k, v) for k, v in raeting.PACKET_DEFAULTS.items()
+                          if (k in raeting.PACKET_HEAD_FIELDS and
+                              k not in raeting.PACKET_FLAGS and
+                              k not in self.Fixeds)]
+        self.masks = flagMasks(raeting.PACKET_FLAG_FIELDS)
+        self.compile()
+
+    def compile(self):
+        '''
+        Compile plan with line formatters and converters
+        '''
+        formats = raeting.PACKET_FIELD_FORMATS
+        self.plan = [(k, v, "\n{0} {{0:{1}}}".format(k, formats[k]).format)
+                     for k, v in self.optionals]
+        self.leadsize = (len(self.Lead.format('0000', '00', '00')) +
+                         len(raeting.HEAD_END))
+        self.converters = dict((k, converter(formats[k]))
+                               for k in raeting.PACKET_HEAD_FIELDS
+                               if k in formats)
+
+    def packFlags(self, data):
+        '''
+        Returns flag fields in data packed into single byte integer
+        '''
+        fg = 0
+        for field, mask in self.masks:
+            if data.get(field):
+                fg |= mask
+        return fg
+
+    def unpackFlags(self, data, fg):
+        '''
+        Updates flag fields in data from single byte integer fg
+        '''
+        for field, mask in self.masks:
+            if field in data:
+                data[field] = bool(fg & mask)
+
+    def checkHeadSize(self, hl):
+        '''
+        Raises PacketError if head length hl is too big
+        '''
+        if hl > raeting.MAX_HEAD_SIZE:
+            emsg = "Head length of {0}, exceeds max of {1}".format(
+                    hl, raeting.MAX_HEAD_SIZE)
+            raise raeting.PacketError(emsg)
+
+    def match(self, packed):
+        '''
+        Returns True if packed starts with a raet head
+        '''
+        return (packed.startswith(b'ri RAET\n') and raeting.HEAD_END in packed)
+
+    def pack(self, data, size):
+        '''
+        Returns packed head from data for packet whose coat plus foot
+        is size bytes long. Updates data hl and pl
+        '''
+        rest = ''.join([line(data[k]) for k, v, line in self.plan if data[k] != v])
+        hl = self.leadsize + len(rest)
+        self.checkHeadSize(hl)
+        data['hl'] = hl
+        pl = hl + size
+        data['pl'] = pl
+        # Tray checks for packet length greater than UDP_MAX_PACKET_SIZE
+        # and segments appropriately so pl may be truncated below in this case
+        return (ns2b(self.Lead.format("{0:04x}".format(pl)[-4:],
+                                      "{0:02x}".format(hl)[-2:],
+                                      data['fg']) + rest) + raeting.HEAD_END)
+
+    def parse(self, packed, data):
+        '''
+        Parses head from front of packed into data
+        Returns the packed head bytes
+        Raises PacketError if failure occurs
+        '''
+        hl = packed.find(raeting.HEAD_END) + len(raeting.HEAD_END)
+        head = packed[:hl]  # only copy head not rest of packet
+        converters = self.converters  # for speed
+        for line in str(head[:-len(raeting.HEAD_END)].decode(
+                                            encoding='ISO-8859-1')).split('\n'):
+            key, val = line.split(' ')
+            try:
+                data[key] = converters[key](val)
+            except KeyError:
+                emsg = "Unknown head field '{0}'".format(key)
+                raise raeting.PacketError(emsg)
+        if 'fg' in data:
+            self.unpackFlags(data, int(data['fg'], 16))
+        if data['hl'] != len(head):
+            emsg = 'Actual head length = {0} not match head field = {1}'.format(
+                    len(head), data['hl'])
+            raise raeting.PacketError(emsg)
+        return head
+
+
+class JsonPacketHeadCodec(RaetPacketHeadCodec):
+    '''
+    Compiled codec for json packet heads
+    '''
+    Hk = HeadKind.json.value
+    Extrasize = 36
+    Lead = '{{"ri":"RAET","pl":"{0}","hl":"{1}","fg":"{2}"'
+
+    def compile(self):
+        '''
+        Compile plan with json member formatters
+        '''
+        formats = raeting.PACKET_FIELD_FORMATS
+        plan = []
+        for k, v in self.optionals:
+            if 'x' in formats[k]:  # integer so json is decimal
+                member = ',"{0}":{{0:d}}'.format(k).format
+            else:
+                member = (lambda val, prefix=',"{0}":'.format(k):
+                                prefix + json.dumps(val))
+            plan.append((k, v, member))
+        self.plan = plan
+        self.leadsize = (len(self.Lead.format('0000000', '00', '00')) +
+                         len('}') + len(raeting.JSON_END))
+
+    def match(self, packed):
+        '''
+        Returns True if packed starts with a json head
+        '''
+        return (packed.startswith(b'{"ri":"RAET",') and raeting.JSON_END in packed)
+
+    def pack(self, data, size):
+        '''
+        Returns packed head from data for packet whose coat plus foot
+        is size bytes long. Updates data hl and pl
+        '''
+        rest = ''.join([member(data[k]) for k, v, member in self.plan if data[k] != v])
+        hl = self.leadsize + len(rest)
+        self.checkHeadSize(hl)
+        data['hl'] = hl
+        pl = hl + size
+        data['pl'] = pl
+        # JSON needs double quotes on strings
+        return (ns2b(self.Lead.format("{0:07x}".format(pl)[-7:],
+                                      "{0:02x}".format(hl)[-2:],
+                                      data['fg']) + rest + '}') + raeting.JSON_END)
+
+    def parse(self, packed, data):
+        '''
+        Parses head from front of packed into data
+        Returns the packed head bytes
+        Raises PacketError if failure occurs
+        '''
+        hl = packed.find(raeting.JSON_END) + len(raeting.JSON_END)
+        head = packed[:hl]  # only copy head not rest of packet
+        kit = json.loads(head[:-len(raeting.JSON_END)].decode(encoding='ascii'),
+                         encoding='ascii',
+                         object_pairs_hook=odict)
+        data.update(kit)
+        if 'fg' in data:
+            self.unpackFlags(data, int(data['fg'], 16))
+        hl = int(data['hl'], 16)
+        if hl != len(head):
+            emsg = 'Actual head length does not match head field value.'
+            raise raeting.PacketError(emsg)
+        data['hl'] = hl
+        data['pl'] = int(data['pl'], 16)
+        return head
+
+
+class BinaryPacketHeadCodec(RaetPacketHeadCodec):
+    '''
+    Compiled codec for binary (struct) packet heads
+
+    Attributes:
+        .packers is dict of compiled struct.Struct keyed by presence bitmap
+    '''
+    Hk = HeadKind.binary.value
+    Extrasize = 8
+
+    def compile(self):
+        '''
+        Compile plan with bitmap masks
+        '''
+        self.leader = raeting.PACKET_BINARY_LEADER_PACKER
+        formats = raeting.PACKET_BINARY_FIELD_FORMATS
+        self.plan = [(k, raeting.PACKET_DEFAULTS[k], 1 << i)
+                     for i, k in enumerate(formats.keys())]
+        self.formats = list(formats.items())
+        self.packers = {}
+
+    def packer(self, bitmap):
+        '''
+        Returns duple of (fields, struct.Struct) for presence bitmap
+        Compiles and caches on first use
+        '''
+        try:
+            return self.packers[bitmap]
+        except KeyError:
+            pass
+        fields = []
+        fmt = '!'
+        for i, (k, f) in enumerate(self.formats):
+            if bitmap & (1 << i):
+                fields.append(k)
+                fmt += f
+        self.packers[bitmap] = (fields, struct.Struct(fmt))
+        return self.packers[bitmap]
+
+    def match(self, packed):
+        '''
+        Returns True if packed starts with a binary head
+        '''
+        return (packed.startswith(b'RAET') and len(packed) >= self.leader.size)
+
+    def pack(self, data, size):
+        '''
+        Returns packed head from data for packet whose coat plus foot
+        is size bytes long. Updates data hl and pl
+        '''
+        bitmap = 0
+        values = []
+        for k, v, mask in self.plan:
+            if data[k] != v:  # not default so include
+                bitmap |= mask
+                values.append(data[k])
+        fields, packer = self.packer(bitmap)
+        hl = self.leader.size + packer.size
+        self.checkHeadSize(hl)
+        data['hl'] = hl
+        pl = hl + size
+        data['pl'] = pl
+        # Tray checks for packet length greater than UDP_MAX_PACKET_SIZE
+        # and segments appropriately so pl may be truncated below in this case
+        try:
+            return b''.join([self.leader.pack(b'RAET',
+                                              self.Hk,
+                                              hl,
+                                              pl & 0xffff,
+                                              int(data['fg'], 16),
+                                              bitmap),
+                             packer.pack(*values)])
+        except struct.error as ex:
+            emsg = "Invalid binary head field value. {0}".format(ex)
+            raise raeting.PacketError(emsg)
+
+    def parse(self, packed, data):
+        '''
+        Parses head from front of packed into data
+        Returns the packed head bytes
+        Raises PacketError if failure occurs
+        '''
+        ri, hk, hl, pl, fg, bitmap = self.leader.unpack_from(packed)
+        fields, packer = self.packer(bitmap)
+        if hl != self.leader.size + packer.size or hl > len(packed):
+            emsg = 'Actual head length does not match head field value.'
+            raise raeting.PacketError(emsg)
+        data.update(zip(fields, packer.unpack_from(packed, self.leader.size)))
+        data.update(hk=hk, hl=hl, pl=pl, fg="{0:02x}".format(fg))
+        self.unpackFlags(data, fg)
+        return packed[:hl]
+
+
+# compiled packet head codecs keyed by head kind in detection order
+PACKET_HEAD_CODECS = odict([(codec.Hk, codec) for codec in
+                             [RaetPacketHeadCodec(),
+                              JsonPacketHeadCodec(),
+                              BinaryPacketHeadCodec()]])
+
+def packetHeadCodec(hk):
+    '''
+    Returns compiled packet head codec for head kind hk
+    Raises PacketError if head kind not supported
+    '''
+    try:
+        return PACKET_HEAD_CODECS[hk]
+    except KeyError:
+        emsg = "Unsupported packet head kind '{0}'".format(hk)
+        raise raeting.PacketError(emsg)
+
+def detectPacketHeadCodec(packed):
+    '''
+    Returns compiled packet head codec that matches head of packed or
+    None if unrecognizable
+    '''
+    for codec in PACKET_HEAD_CODECS.values():
+        if codec.match(packed):
+            return codec
+    return None
+
+
+class PageHeadCodec(object):
+    '''
+    Compiled codec for raet (text line) page heads
+
+    Attributes:
+        .lines is dict of line formatters keyed by field
+        .converters is dict of value converters keyed by field
+    '''
+    def __init__(self):
+        '''
+        Setup instance by compiling line formatters and converters
+        '''
+        formats = raeting.PAGE_FIELD_FORMATS
+        self.lines = dict((k, "{0} {{0:{1}}}".format(k, formats[k]).format)
+                          for k in raeting.PAGE_FIELDS)
+        self.converters = dict((k, converter(formats[k]))
+                               for k in raeting.PAGE_FIELDS)
+
+    def match(self, packed):
+        '''
+        Returns True if packed starts with a page head
+        '''
+        return (packed.startswith(b'ri RAET\n') and raeting.HEAD_END in packed)
+
+    def pack(self, data):
+        '''
+        Returns packed head from data
+        Raises PageError if unknown field in data
+        '''
+        lines = self.lines  # for speed
+        try:
+            return (ns2b('\n'.join([lines[k](v) for k, v in data.items()])) +
+                    raeting.HEAD_END)
+        except KeyError as ex:
+            emsg = "Unknown head field '{0}'".format(ex.args[0])
+            raise raeting.PageError(emsg)
+
+    def parse(self, packed, data):
+        '''
+        Parses head from front of packed into data
+        Returns duple of (packed head bytes, remaining packed bytes)
+        Raises PageError if failure occurs
+        '''
+        front, sep, back = packed.partition(raeting.HEAD_END)
+        converters = self.converters  # for speed
+        for line in str(front.decode(encoding='ISO-8859-1')).split('\n'):
+            key, val = line.split(' ')
+            try:
+                data[key] = converters[key](val)
+            except KeyError:
+                emsg = "Unknown head field '{0}'".format(key)
+                raise raeting.PageError(emsg)
+        return (front + sep, back)
+
+PAGE_HEAD_CODEC = PageHeadCodec()
@@ -20,12 +20,12 @@ except ImportError:
 # Import ioflo libs
 from ioflo.base.odicting import odict
 
-from ioflo.base.consoling import getConsole
+from ..consoling import getConsole
 console = getConsole()
 
 # Import raet libs
 from ..abiding import *  # import globals
-from .. import raeting
+from .. import raeting, heading
 from ..raeting import PackKind
 
 class Part(object):
@@ -73,14 +73,7 @@ class TxHead(Head):
         '''
         Composes .packed, which is the packed form of this part
         '''
-        self.packed = b''
-        data = self.page.data  # for speed
-        lines = []
-        for k, v in data.items():
-            lines.append("{key} {val:{fmt}}".format(
-                            key=k, val=v, fmt=raeting.PAGE_FIELD_FORMATS[k]))
-
-        self.packed = ns2b('\n'.join(lines)) + raeting.HEAD_END
+        self.packed = heading.PAGE_HEAD_CODEC.pack(self.page.data)
 
 
 class RxHead(Head):
@@ -101,31 +94,13 @@ class RxHead(Head):
             console.terse(emsg)
             raise raeting.PageError(emsg)
 
-        if (not packed.startswith(ns2b('ri RAET\n')) or raeting.HEAD_END not in packed):
+        codec = heading.PAGE_HEAD_CODEC
+        if not codec.match(packed):
             emsg = "Unrecognized page head\n"
             console.terse(emsg)
             raise raeting.PageError(emsg)
 
-        front, sep, back = packed.partition(raeting.HEAD_END)
-        self.packed = front + sep
-        self.page.body.packed = back
-
-        kit = odict()
-        lines = str(front.decode(encoding='ISO-8859-1')).split('\n')
-        for line in lines:
-            key, val = line.split(' ')
-            if key not in raeting.PAGE_FIELDS:
-                emsg = "Unknown head field '{0}'".format(key)
-                raise raeting.PageError(emsg)
-            if 'x' in raeting.PAGE_FIELD_FORMATS[key]:
-                val = int(val, 16)
-            elif 'd' in raeting.PAGE_FIELD_FORMATS[key]:
-                val = int(val)
-            elif 'f' in raeting.PAGE_FIELD_FORMATS[key]:
-                val = float(val)
-            kit[key] = val
-
-        data.update(kit)
+        self.packed, self.page.body.packed = codec.parse(packed, data)
 
 
 class Body(Part):
@@ -440,8 +415,8 @@ class RxBook(Book):
         #paginated so add to pages
         pc = page.data['pc'] #page count
         pn = page.data['pn']
-        console.verbose("page count={0} number={1} session id={2} book id={2}\n".format(
-                     pc, pn, page.data['si'], page.data['bi']))
+        console.verbose("page count={0} number={1} session id={2} book id={2}\n",
+                     pc, pn, page.data['si'], page.data['bi'])
 
         if not self.sections: #update data from first page received
             self.data.update(page.data)
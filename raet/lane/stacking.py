@@ -34,7 +34,7 @@ from .. import raeting, nacling, stacking
 from . import paging, yarding
 from ..raeting import PackKind
 
-from ioflo.base.consoling import getConsole
+from ..consoling import getConsole
 console = getConsole()
 
 class LaneStack(stacking.Stack):
@@ -115,7 +115,7 @@ class LaneStack(stacking.Stack):
         Assumes that there is a message on the .rxes deque
         '''
         raw, sa = self.rxes.popleft()
-        console.verbose("{0} received raw message \n{1}\n".format(self.name, raw))
+        console.verbose("{0} received raw message \n{1}\n", self.name, raw)
         page = paging.RxPage(packed=raw)
 
         try:
@@ -179,8 +179,8 @@ class LaneStack(stacking.Stack):
         Retrieve next page from stack receive queue if any and parse
         Assumes received header has been parsed
         '''
-        console.verbose("{0} received page header\n{1}\n".format(self.name, received.data))
-        console.verbose("{0} received page index = '{1}'\n".format(self.name, received.index))
+        console.verbose("{0} received page header\n{1}\n", self.name, received.data)
+        console.verbose("{0} received page index = '{1}'\n", self.name, received.index)
 
         if received.paginated:
             index = received.index #(received.data['si'], received.data['bi'])
@@ -212,26 +212,19 @@ class LaneStack(stacking.Stack):
         '''
         body, uid = self.txMsgs.popleft() # duple (body dict, destination name)
         self.message(body, uid=uid)
-        console.verbose("{0} sending to {1}\n{2}\n".format(self.name, uid, body))
+        console.verbose("{0} sending to {1}\n{2}\n", self.name, uid, body)
 
-    def _handleOneTx(self, laters, blocks):
+    def _sendOneTx(self, tx, ta):
         '''
-        Handle one message on .txes deque
-        Assumes there is a message
-        laters is deque of messages to try again later
-        blocks is list of blocked destination address so put all associated into laters
+        Send page tx to destination address ta through server
+        Returns True if consumed, False if blocked so destination is parked
+        Pages to stale yards are dropped and the yard is removed
         '''
-        tx, ta = self.txes.popleft()  # duple = (packet, destination address)
-
-        if ta in blocks: # already blocked on this iteration
-            laters.append((tx, ta)) # keep sequential
-            return
-
         try:
             self.server.send(tx, ta)
         except Exception as ex:
-            console.concise("Error sending to '{0}' from '{1}: {2}\n".format(
-                ta, self.ha, ex))
+            console.concise("Error sending to '{0}' from '{1}: {2}\n",
+                ta, self.ha, ex)
             if ex.errno == errno.ECONNREFUSED or ex.errno == errno.ENOENT:
                 self.incStat("stale_transmit_yard")
                 yard = self.haRemotes.get(ta)
@@ -241,12 +234,12 @@ class LaneStack(stacking.Stack):
             elif ex.errno in [errno.EAGAIN, errno.EWOULDBLOCK, errno.ENOBUFS]:
                 self.incStat("busy_transmit_yard")
                 #busy with last message save it for later
-                laters.append((tx, ta))
-                blocks.append(ta)
+                return False
 
             else:
                 self.incStat("error_transmit_yard")
                 raise
+        return True
 
     def message(self, body, uid=None):
         '''
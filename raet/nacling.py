@@ -6,7 +6,11 @@ nacling.py raet protocol nacl (crypto) management classes
 # Import python libs
 import sys
 import time
+import struct
 import binascii
+import ctypes
+import threading
+from collections import deque
 import six
 import libnacl
 
@@ -20,6 +24,23 @@ from .abiding import *  # import globals
 from . import encoding
 
 
+def cbuffer(data):
+    '''
+    Returns data in a form ctypes accepts as a char pointer without copying
+    when possible so libnacl can work on buffer views
+    bytes are returned as is, writable buffers such as bytearray or their
+    memoryviews as ctypes arrays sharing the memory, read only memoryviews
+    of whole bytes as the underlying bytes. Otherwise returns a bytes copy
+    '''
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, memoryview) and data.readonly:
+        if isinstance(data.obj, bytes) and data.nbytes == len(data.obj):
+            return data.obj
+        return data.tobytes()
+    return (ctypes.c_char * len(data)).from_buffer(data)
+
+
 class CryptoError(Exception):
     """
     Base exception for all nacl related errors
@@ -315,9 +336,14 @@ class VerifyKey(encoding.Encodable, StringFixer, object):
         :rtype: :class:`bytes`
         """
         if signature is not None:
-            # If we were given the message and signature separately, combine
-            #   them.
-            smessage = signature + smessage
+            # If we were given the message and signature separately, verify
+            #   detached so they are not combined.
+            smessage = encoder.decode(smessage)
+            signature = encoder.decode(signature)
+            libnacl.crypto_sign_verify_detached(cbuffer(signature),
+                                                cbuffer(smessage),
+                                                self._key)
+            return smessage
 
         # Decode the signed message
         smessage = encoder.decode(smessage)
@@ -392,6 +418,19 @@ class SigningKey(encoding.Encodable, StringFixer, object):
 
         return SignedMessage._from_parts(signature, message, signed)
 
+    def signature(self, message, encoder=encoding.RawEncoder):
+        """
+        Return detached signature of message using this key without copying
+        the message into a signed message.
+
+        :param message: [:class:`bytes`] or buffer such as
+            :class:`bytearray` or :class:`memoryview` to be signed.
+        :param encoder: A class that is used to encode the signature.
+        :rtype: :class:`bytes`
+        """
+        return encoder.encode(libnacl.crypto_sign_detached(cbuffer(message),
+                                                           self._signing_key))
+
 
 class Signer(object):
     '''
@@ -421,8 +460,9 @@ class Signer(object):
     def signature(self, msg):
         '''
         Return only the signature string resulting from signing the message
+        msg may be bytes or a buffer view
         '''
-        return self.key.sign(msg).signature
+        return self.key.signature(msg)
 
 
 class Verifier(object):
@@ -446,12 +486,13 @@ class Verifier(object):
 
     def verify(self, signature, msg):
         '''
-        Verify the message
+        Verify the message with detached signature
+        msg and signature may be bytes or buffer views
         '''
         if not self.key:
             return False
         try:
-            self.key.verify(signature + msg)
+            self.key.verify(msg, signature)
         except ValueError:
             return False
         return True
@@ -554,6 +595,200 @@ class Privateer(object):
         return box.decrypt(cipher, nonce, decoder)
 
 
+class Sharer(object):
+    '''
+    Container for precomputed nacl shared key of a local Privateer and
+    a remote Publican
+        .key is the shared key
+        .authKey is the key for session foot macs derived from .key
+        .counted is True when nonces are session prefix plus counter
+        .prefix is the random session nonce prefix when counted
+        .counter is the last counter value used when counted
+    Uses the afternm primitives so the Curve25519 scalar multiplication is
+    done once when created instead of once per message
+
+    Counted nonces are a random prefix chosen once per Sharer, that is once
+    per allow session, followed by a monotonically increasing big endian
+    counter so no entropy is drawn per message. The receive side tracks the
+    highest counter seen for the current remote prefix with a sliding window
+    bitmap so nonces that go backwards beyond the window or repeat are
+    rejected while reordered nonces within the window are accepted once.
+    Only tracked when .counted so stacks using random nonces keep accepting
+    duplicate packets as before. Random nonces never share a prefix.
+    '''
+    PrefixSize = 16  # bytes of random prefix for counted nonces
+    CounterPacker = struct.Struct('!Q')  # 64 bit counter for counted nonces
+    Window = 1024  # number of counters behind highest still accepted
+
+    def __init__(self, privateer, publican, counted=False):
+        self.privateer = privateer
+        self.publican = publican
+        pubkey = publican.key
+        if not isinstance(pubkey, PublicKey):
+            if len(pubkey) == 32:
+                pubkey = PublicKey(pubkey, encoding.RawEncoder)
+            else:
+                pubkey = PublicKey(pubkey, encoding.HexEncoder)
+        self.key = libnacl.crypto_box_beforenm(pubkey.encode(encoding.RawEncoder),
+                                               privateer.keyraw)
+        self.authKey = libnacl.crypto_generichash(b'raet session foot', self.key)
+        self.counted = True if counted else False
+        self.prefix = libnacl.randombytes(self.PrefixSize) if self.counted else None
+        self.counter = 0
+        self.rxPrefix = None  # remote prefix of highest counter seen
+        self.rxCounter = 0  # highest counter seen with .rxPrefix
+        self.rxWindow = 0  # bitmap of counters seen, bit n is .rxCounter - n
+
+    def nonce(self):
+        '''
+        Return next nonce, counted if .counted otherwise random
+        '''
+        if not self.counted:
+            return self.privateer.nonce()
+        self.counter += 1
+        if self.counter > 0xFFFFFFFFFFFFFFFF:
+            emsg = "Nonce counter exhausted, rekey required"
+            raise ValueError(emsg)
+        return self.prefix + self.CounterPacker.pack(self.counter)
+
+    def fresh(self, nonce):
+        '''
+        Returns True if nonce is not a replay of a counted nonce from the
+        remote and records it as seen. Otherwise returns False.
+        Only call after the cipher using nonce has been authenticated so
+        forged packets can not advance the window.
+        Always True when not .counted
+        '''
+        if not self.counted:
+            return True
+        prefix = nonce[:self.PrefixSize]
+        counter = self.CounterPacker.unpack(nonce[self.PrefixSize:])[0]
+        if prefix != self.rxPrefix:  # new remote session or random nonce
+            self.rxPrefix = prefix
+            self.rxCounter = counter
+            self.rxWindow = 1
+            return True
+
+        if counter > self.rxCounter:
+            shift = counter - self.rxCounter
+            if shift >= self.Window:
+                self.rxWindow = 1
+            else:
+                self.rxWindow = ((self.rxWindow << shift) | 1) & ((1 << self.Window) - 1)
+            self.rxCounter = counter
+            return True
+
+        offset = self.rxCounter - counter
+        if offset >= self.Window or self.rxWindow & (1 << offset):
+            return False
+        self.rxWindow |= (1 << offset)
+        return True
+
+    def encrypt(self, msg):
+        '''
+        Return duple of (cyphertext, nonce) resulting from encrypting the message
+        using the shared key
+        '''
+        nonce = self.nonce()
+        return (libnacl.crypto_box_afternm(msg, nonce, self.key), nonce)
+
+    def decrypt(self, cipher, nonce):
+        '''
+        Return decrypted msg contained in cypher using nonce and the shared key
+        '''
+        return libnacl.crypto_box_open_afternm(cipher, nonce, self.key)
+
+    def mac(self, msg):
+        '''
+        Return HMAC-SHA-512-256 authenticator of msg using .authKey
+        '''
+        return libnacl.crypto_auth(cbuffer(msg), self.authKey)
+
+    def authenticate(self, tag, msg):
+        '''
+        Returns True if tag is the authenticator of msg using .authKey
+        Otherwise False
+        '''
+        try:
+            libnacl.crypto_auth_verify(tag, cbuffer(msg), self.authKey)
+        except ValueError:
+            return False
+        return True
+
+
+class Keypool(object):
+    '''
+    Pool of pregenerated Privateers for short term keys
+        .size is number of Privateers the pool is filled to
+        .low is number remaining below which taking starts a refill
+        .privateers is deque of pregenerated Privateers
+        .filler is the background refill thread while running
+    Refills in a background daemon thread so bursts of allows do not wait on
+    key generation. Taking from an empty pool generates a Privateer inline.
+    '''
+    def __init__(self, size=16, low=None):
+        self.size = size
+        self.low = low if low is not None else size // 2
+        self.privateers = deque()
+        self.filler = None
+        self.lock = threading.Lock()
+        self.refill()
+
+    def __len__(self):
+        return len(self.privateers)
+
+    def fill(self):
+        '''
+        Generate Privateers until pool has .size of them
+        '''
+        while len(self.privateers) < self.size:
+            self.privateers.append(Privateer())
+
+    def refill(self):
+        '''
+        Fill pool in background thread unless already refilling
+        Returns thread if started otherwise None
+        '''
+        with self.lock:
+            if self.filler is not None and self.filler.is_alive():
+                return None
+            self.filler = threading.Thread(target=self.fill, name="raet-keypool")
+            self.filler.daemon = True
+            self.filler.start()
+            return self.filler
+
+    def take(self):
+        '''
+        Returns pregenerated Privateer or new one if pool is empty
+        Starts refill when pool runs low
+        '''
+        try:
+            privateer = self.privateers.popleft()
+        except IndexError:
+            privateer = Privateer()
+        if len(self.privateers) < self.low:
+            self.refill()
+        return privateer
+
+
+def verifyBatch(triples):
+    '''
+    Returns list of verification results, True or False, one for each
+    (signature, msg, verkey) triple in triples where verkey is raw bytes.
+    libsodium has no Ed25519 batch verification so this verifies in one
+    tight loop calling the detached primitive directly without the per
+    message key objects and exceptions of Verifier.
+    '''
+    verify = libnacl.nacl.crypto_sign_verify_detached
+    ulonglong = ctypes.c_ulonglong
+    sigsize = libnacl.crypto_sign_BYTES
+    keysize = libnacl.crypto_sign_PUBLICKEYBYTES
+    return [(len(sig) == sigsize and
+             len(key) == keysize and
+             verify(cbuffer(sig), cbuffer(msg), ulonglong(len(msg)), key) == 0)
+            for sig, msg, key in triples]
+
+
 def uuid(size=16):
     '''
     Generate universally unique id hex string with size characters
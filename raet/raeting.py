@@ -32,6 +32,15 @@ Header encoding.
         Lengths are encoded as hex strings
         The flags are encoded as a double char hex string in field 'fg'
 
+    When the head kind is binary = 2, then the header is packed with struct in
+    network byte order.
+        A fixed layout leader of ri, hk, hl, pl, fg (flags as one byte) and a
+        two byte presence bitmap is always included
+        The bitmap has one bit per remaining field in the order given by
+        PACKET_BINARY_FIELD_FORMATS
+        A field whose value is not the default has its bit set and its value
+        packed after the leader with the fixed size format for that field
+
 header data =
 {
     ri: raet id Default 'RAET'
@@ -135,6 +144,8 @@ COOKIESTUFF_PACKER = struct.Struct('!32sLL24s')
 COOKIE_PACKER = struct.Struct('!80s24s')
 INITIATESTUFF_PACKER = struct.Struct('!32s48s24s128s')
 INITIATE_PACKER = struct.Struct('!32s24s248s24s')
+SESSION_PACKER = struct.Struct('!B')  # session foot kind in allow ack bodies
+SESSION_FLAGS_PACKER = struct.Struct('!BB')  # session foot kind and SessionFlag bits
 
 
 @enum.unique
@@ -169,6 +180,7 @@ class FootKind(enum.IntEnum):
     nacl = 1
     sha2 = 2
     crc64 = 3
+    mac = 4
     unknown = 255
 
 
@@ -180,6 +192,7 @@ class FootSize(enum.IntEnum):
     nacl = 64
     sha2 = 256
     crc64 = 8
+    mac = 32
     unknown = 0
 
 
@@ -216,9 +229,19 @@ class TrnsKind(enum.IntEnum):
     bind = 2
     allow = 3
     alive = 4
+    coalesce = 5
     unknown = 255
 
 
+@enum.unique
+class SessionFlag(enum.IntEnum):
+    '''
+    Integer Enums of Session Flag bits negotiated in allow ack bodies
+    '''
+    coalesce = 1
+    aggregate = 2
+
+
 @enum.unique
 class PcktKind(enum.IntEnum):
     '''
@@ -240,6 +263,7 @@ class PcktKind(enum.IntEnum):
     reject = 13
     pend = 14
     done = 15
+    acks = 16
     unknown = 255
 
 
@@ -263,6 +287,18 @@ class AutoMode(enum.IntEnum):
     always = 2
 
 
+@enum.unique
+class Outcome(enum.IntEnum):
+    '''
+    Integer Enums of Transaction Outcomes
+    '''
+    pending = 0
+    complete = 1
+    rejected = 2
+    timedout = 3
+    failed = 4
+
+
 @enum.unique
 class PackKind(enum.IntEnum):
     '''
@@ -355,6 +391,30 @@ PACKET_FIELD_FORMATS = odict([
                     ('fg', '.2s'),
               ])
 
+# binary head kind fixed leader (ri, hk, hl, pl, fg, presence bitmap)
+PACKET_BINARY_LEADER_PACKER = struct.Struct('!4sBBHBH')
+
+# binary head kind optional fields in bitmap order (bit 0 is first)
+# included after leader only if not default value
+PACKET_BINARY_FIELD_FORMATS = odict([
+                    ('vn', 'B'),
+                    ('pk', 'B'),
+                    ('se', 'L'),
+                    ('de', 'L'),
+                    ('si', 'L'),
+                    ('ti', 'L'),
+                    ('tk', 'B'),
+                    ('dt', 'd'),
+                    ('oi', 'L'),
+                    ('sn', 'H'),
+                    ('sc', 'H'),
+                    ('ml', 'L'),
+                    ('bk', 'B'),
+                    ('ck', 'B'),
+                    ('fk', 'B'),
+                    ('fl', 'H'),
+              ])
+
 # head fields that may be included in page header if not default value
 PAGE_DEFAULTS = odict([
                         ('ri', 'RAET'),
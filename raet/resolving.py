@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+'''
+resolving.py raet protocol host name resolution
+
+Resolver caches host address and fully qualified domain name lookups in
+least recently used caches whose entries expire after a time to live so that
+creating estates does not block on DNS for every packet. Numeric IPv4
+addresses short circuit resolution entirely. Fqdn lookups may be prefetched
+in a background thread so that later lookups are cache hits.
+
+resolver is the shared default Resolver used by estates.
+'''
+# pylint: skip-file
+# pylint: disable=W0611
+
+# Import python libs
+import socket
+import threading
+import time
+
+# Import ioflo libs
+from ioflo.base.odicting import odict
+
+# Import raet libs
+from .abiding import *  # import globals
+
+from .consoling import getConsole
+console = getConsole()
+
+
+def numeric(host):
+    '''
+    Returns True if host is a dotted quad IPv4 address which needs no lookup
+    '''
+    try:
+        socket.inet_pton(socket.AF_INET, host)
+    except (socket.error, ValueError, TypeError):
+        return False
+    return True
+
+
+class Resolver(object):
+    '''
+    RAET protocol cached host resolver
+        .size is maximum entries in each cache
+        .ttl is seconds cached entries remain valid
+        .hosts is odict LRU cache of host address entries (address, expire)
+        .fqdns is odict LRU cache of host fqdn entries (fqdn, expire)
+        .pendings is set of hosts with fqdn lookups running in background
+    '''
+    Size = 1024  # default maximum entries in each cache
+    Ttl = 300.0  # default seconds to live of cached entries
+
+    def __init__(self, size=None, ttl=None):
+        '''
+        Setup instance
+        '''
+        self.size = size if size is not None else self.Size
+        self.ttl = ttl if ttl is not None else self.Ttl
+        self.hosts = odict()
+        self.fqdns = odict()
+        self.pendings = set()
+        self.lock = threading.Lock()  # background prefetches share the caches
+
+    def _get(self, cache, host):
+        '''
+        Returns unexpired cached value of host from cache and marks it most
+        recently used. Otherwise returns None
+        '''
+        with self.lock:
+            entry = cache.get(host)
+            if entry is None:
+                return None
+            if entry[1] < time.time():  # expired
+                del cache[host]
+                return None
+            del cache[host]  # reinsert as most recently used
+            cache[host] = entry
+            return entry[0]
+
+    def _put(self, cache, host, value):
+        '''
+        Cache value of host evicting least recently used entries when full
+        '''
+        with self.lock:
+            if host in cache:
+                del cache[host]
+            cache[host] = (value, time.time() + self.ttl)
+            while len(cache) > self.size:
+                del cache[next(iter(cache))]
+
+    def resolve(self, host):
+        '''
+        Returns IPv4 address of host as gethostbyname
+        Empty and wildcard hosts resolve to loopback as estates expect
+        Raises socket.error on lookup failure which is not cached
+        '''
+        if host in ('', '0.0.0.0'):
+            return '127.0.0.1'
+        if numeric(host):
+            return host
+        address = self._get(self.hosts, host)
+        if address is None:
+            address = socket.gethostbyname(host)
+            if address == '0.0.0.0':
+                address = '127.0.0.1'
+            self._put(self.hosts, host, address)
+        return address
+
+    def fqdn(self, host):
+        '''
+        Returns fully qualified domain name of host as getfqdn
+        Blocks on lookup unless cached such as by an earlier prefetch
+        '''
+        name = self._get(self.fqdns, host)
+        if name is None:
+            name = socket.getfqdn(host)
+            self._put(self.fqdns, host, name)
+        return name
+
+    def cached(self, host):
+        '''
+        Returns cached fully qualified domain name of host without blocking
+        Otherwise returns None such as while a prefetch is still pending
+        '''
+        return self._get(self.fqdns, host)
+
+    def prefetch(self, host):
+        '''
+        Lookup fqdn of host in background thread unless cached or pending
+        Returns thread if started otherwise None
+        '''
+        if self._get(self.fqdns, host) is not None:
+            return None
+        with self.lock:
+            if host in self.pendings:
+                return None
+            self.pendings.add(host)
+
+        def fetch():
+            try:
+                self.fqdn(host)
+            except Exception as ex:  # leave uncached so later lookup retries
+                console.terse("Failed prefetch of fqdn for '{0}'. {1}\n", host, ex)
+            finally:
+                with self.lock:
+                    self.pendings.discard(host)
+
+        thread = threading.Thread(target=fetch, name="raet-fqdn")
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def clear(self):
+        '''
+        Clear caches
+        '''
+        with self.lock:
+            self.hosts.clear()
+            self.fqdns.clear()
+
+resolver = Resolver()  # shared default
@@ -23,8 +23,10 @@ from .. import raeting
 from ..raeting import TrnsKind
 from .. import nacling
 from .. import lotting
+from .. import timing
+from .. import resolving
 
-from ioflo.base.consoling import getConsole
+from ..consoling import getConsole
 console = getConsole()
 
 
@@ -59,24 +61,32 @@ class Estate(lotting.Lot):
 
         if ha:
             host, port = ha
-            host = socket.gethostbyname(host)
-            if host in ['0.0.0.0', '']:
-                host = '127.0.0.1'
-            ha = (host, port)
+            ha = (resolving.resolver.resolve(host), port)
         self.ha = ha
         if iha:  # takes precedence
             host, port = iha
-            host = socket.gethostbyname(host)
-            if host in ['0.0.0.0', '']:
-                host = '127.0.0.1'
-            iha = (host, port)
+            iha = (resolving.resolver.resolve(host), port)
         self.iha = iha # internal host address duple (host, port)
         self.natted = natted # is estate behind nat router
-        self.fqdn = fqdn or socket.getfqdn(self.ha[0]) if self.ha else ''
+        self._fqdn = fqdn  # looked up lazily from .ha when empty
         self.dyned = dyned
         self.role = role if role is not None else self.name
         self.transactions = odict() # estate transactions keyed by transaction index
 
+    @property
+    def fqdn(self):
+        '''
+        property that returns fully qualified domain name of .ha host
+        Looked up on first use so throwaway estates never block on DNS
+        '''
+        if not self._fqdn and self.ha:
+            self._fqdn = resolving.resolver.fqdn(self.ha[0])
+        return self._fqdn or ''
+
+    @fqdn.setter
+    def fqdn(self, value):
+        self._fqdn = value
+
     @property
     def eha(self):
         '''
@@ -121,7 +131,8 @@ class Estate(lotting.Lot):
             raise raeting.EstateError(emsg)
         self.transactions[index] = transaction
         transaction.remote = self
-        console.verbose( "Added transaction to {0} at '{1}'\n".format(self.name, index))
+        transaction.active = True
+        console.verbose( "Added transaction to {0} at '{1}'\n", self.name, index)
 
     def removeTransaction(self, index, transaction=None):
         '''
@@ -130,17 +141,19 @@ class Estate(lotting.Lot):
         '''
         if index in self.transactions: # fast way
             if not transaction or transaction is self.transactions[index]:
+                self.transactions[index].active = False
                 del self.transactions[index]
                 console.verbose( "Removed transaction from {0} at"
-                                 " '{1}'\n".format(self.name, index))
+                                 " '{1}'\n", self.name, index)
                 return
 
         if transaction: # find transaction slow way
             for i, trans in self.transactions.items():
                 if trans is transaction:
+                    trans.active = False
                     del self.transactions[i]
                     console.concise( "Removed transaction from '{0}' at '{1}',"
-                            " instead of at '{2}'\n".format(self.name, i, index))
+                            " instead of at '{2}'\n", self.name, i, index)
 
 
     def removeStaleTransactions(self):
@@ -183,6 +196,8 @@ class LocalEstate(Estate):
         if 'ha' not in kwa:
             kwa['ha'] = ('127.0.0.1', raeting.RAET_PORT)
         super(LocalEstate, self).__init__( **kwa)
+        if not self._fqdn and self.ha:  # joinents compare it so fetch early
+            resolving.resolver.prefetch(self.ha[0])
         self.signer = nacling.Signer(sigkey)
         self.priver = nacling.Privateer(prikey) # Long term key
 
@@ -197,7 +212,17 @@ class RemoteEstate(Estate):
     .alive = False, dead, recently have not received valid signed packets from remote
 
     .fuid is the far uid of the remote as owned by the farside stack
+
+    .srtt and .rttvar are the smoothed round trip time to the remote and its
+    variation sampled by transactions, None until first sampled
     '''
+    RttGain = 0.125  # gain of each sample in smoothed round trip time
+    RttVarGain = 0.25  # gain of each sample in round trip time variation
+    RedoTimeoutMin = 0.05  # min redo timeout from round trip estimates
+    RedoTimeoutMax = 8.0  # max redo timeout from estimates including backoff
+    CwndMin = 2  # min segments in congestion window
+    CwndInit = 8  # initial segments in congestion window
+    CwndMax = 1024  # max segments in congestion window
 
     def __init__(self,
                  stack,
@@ -232,6 +257,7 @@ class RemoteEstate(Estate):
 
         if 'ha' not in kwa:
             kwa['ha'] = ('127.0.0.1', raeting.RAET_TEST_PORT)
+        self._fqdnHost = None  # host of looked up .fqdn, None when given
         super(RemoteEstate, self).__init__(stack, uid=uid, **kwa)
         self.fuid = fuid
         self.main = main
@@ -241,12 +267,22 @@ class RemoteEstate(Estate):
         self.alived = None
         self.reaped = None
         self.acceptance = acceptance
-        self.privee = nacling.Privateer() # short term key manager
+        self._privee = None # short term key manager made on first use
         self.publee = nacling.Publican() # correspondent short term key  manager
+        self.sharee = None # short term precomputed shared key manager
+        self.macFoot = False # True when allow negotiated mac foot for session
+        self.coalesce = False # True when allow negotiated coalesced messages
+        self.aggregate = False # True when allow negotiated aggregated acks
         self.verfer = nacling.Verifier(verkey) # correspondent verify key manager
         self.pubber = nacling.Publican(pubkey) # correspondent long term key manager
 
         self.rsid = rsid # last sid received from remote when RmtFlag is True
+        self.srtt = None  # smoothed round trip time
+        self.rttvar = None  # round trip time variation
+        self.cwnd = float(self.CwndInit)  # congestion window in segments
+        self.ssthresh = float(self.CwndMax)  # slow start threshold in segments
+        self.paceCredit = float(self.CwndInit)  # segments that may be sent now
+        self.paceStamp = None  # stamp when .paceCredit last updated
 
         # persistence keep alive heartbeat timer. Initial duration has offset so
         # not synced with other side persistence heatbeet
@@ -255,11 +291,15 @@ class RemoteEstate(Estate):
             duration = self.stack.period
         else:
             duration = self.stack.period + self.stack.offset
-        self.timer = aiding.StoreTimer(store=self.stack.store,
-                                       duration=duration)
-
-        self.reapTimer = aiding.StoreTimer(self.stack.store,
-                                           duration=self.stack.interim)
+        self.timer = timing.DueTimer(store=self.stack.store,
+                                     duration=duration,
+                                     timeline=self.stack.remoteTimeline,
+                                     owner=self)
+
+        self.reapTimer = timing.DueTimer(self.stack.store,
+                                         duration=self.stack.interim,
+                                         timeline=self.stack.remoteTimeline,
+                                         owner=self)
         self.messages = deque() # deque of saved stale message body data to remote.uid
 
     @property
@@ -293,13 +333,225 @@ class RemoteEstate(Estate):
         '''
         self.nuid, self.fuid = value
 
+    @property
+    def ha(self):
+        '''
+        property that returns host address (host, port) tuple of remote
+        '''
+        return self._ha
+
+    @ha.setter
+    def ha(self, value):
+        '''
+        setter for ha property, value is duple of (host, port)
+        Forgets .fqdn looked up for a prior host and prefetches the new one
+        once remote is in its stack
+        '''
+        old = getattr(self, '_ha', None)
+        self._ha = value
+        if value == old:
+            return
+        if self._fqdnHost is not None and (not value or value[0] != self._fqdnHost):
+            self._fqdn = ''
+            self._fqdnHost = None
+        if self.stack.remotes.get(self.uid) is self:
+            self.prefetch()
+
+    @property
+    def fqdn(self):
+        '''
+        property that returns fully qualified domain name of .ha host
+        Never blocks on DNS. Returns empty until a background lookup of the
+        host started by .prefetch has been cached
+        '''
+        if not self._fqdn and self.ha:
+            name = resolving.resolver.cached(self.ha[0])
+            if name is None:
+                self.prefetch()
+                return ''
+            self._fqdn = name
+            self._fqdnHost = self.ha[0]
+        return self._fqdn or ''
+
+    @fqdn.setter
+    def fqdn(self, value):
+        self._fqdn = value
+        self._fqdnHost = None
+
+    def prefetch(self):
+        '''
+        Start background lookup of .fqdn from .ha host unless already known
+        '''
+        if not self._fqdn and self.ha:
+            resolving.resolver.prefetch(self.ha[0])
+
+    @property
+    def privee(self):
+        '''
+        property that returns short term key manager
+        Made on first use, taken from stack .keypool when the stack has one,
+        so remotes that never allow do not generate a keypair
+        '''
+        if self._privee is None:
+            if self.stack.keypool is not None:
+                self._privee = self.stack.keypool.take()
+            else:
+                self._privee = nacling.Privateer()
+        return self._privee
+
+    @privee.setter
+    def privee(self, value):
+        '''
+        setter for privee property
+        '''
+        self._privee = value
+
     def rekey(self):
         '''
         Regenerate short term keys
         '''
         self.allowed = None
-        self.privee = nacling.Privateer() # short term key
+        self._privee = None # short term key made on first use
         self.publee = nacling.Publican() # correspondent short term key  manager
+        self.sharee = None # invalidate precomputed shared key
+        self.macFoot = False # renegotiated by allow
+        self.coalesce = False
+        self.aggregate = False
+
+    def sessionFlags(self, offer=False):
+        '''
+        Returns SessionFlag bits negotiated with remote or when offer those
+        the stack offers
+        '''
+        if offer:
+            coalesce, aggregate = self.stack.Coalesce, self.stack.Aggregate
+        else:
+            coalesce, aggregate = self.coalesce, self.aggregate
+        flags = 0
+        if coalesce:
+            flags |= raeting.SessionFlag.coalesce
+        if aggregate:
+            flags |= raeting.SessionFlag.aggregate
+        return flags
+
+    def sessionBody(self, offer=False):
+        '''
+        Returns allow ack body with session foot kind and flags negotiated with
+        remote or when offer those the stack offers
+        Empty when none and only the foot kind when no flags so peers that do
+        not support them ignore the body
+        '''
+        mac = self.stack.MacFoot if offer else self.macFoot
+        fk = raeting.FootKind.mac.value if mac else raeting.FootKind.nada.value
+        flags = self.sessionFlags(offer=offer)
+        if flags:
+            return raeting.SESSION_FLAGS_PACKER.pack(fk, flags)
+        if mac:
+            return raeting.SESSION_PACKER.pack(fk)
+        return b''
+
+    def negotiate(self, body):
+        '''
+        Update session foot kind and flags from allow ack body of remote to
+        those in body also offered by stack
+        '''
+        fk, flags = raeting.FootKind.nada.value, 0
+        if isinstance(body, bytes):
+            if len(body) == raeting.SESSION_PACKER.size:
+                fk, = raeting.SESSION_PACKER.unpack(body)
+            elif len(body) == raeting.SESSION_FLAGS_PACKER.size:
+                fk, flags = raeting.SESSION_FLAGS_PACKER.unpack(body)
+        self.macFoot = bool(self.stack.MacFoot and fk == raeting.FootKind.mac)
+        self.coalesce = bool(self.stack.Coalesce and
+                             flags & raeting.SessionFlag.coalesce)
+        self.aggregate = bool(self.stack.Aggregate and
+                              flags & raeting.SessionFlag.aggregate)
+
+    def share(self):
+        '''
+        Returns .sharee the nacling.Sharer with the precomputed shared key of
+        the short term keys .privee and .publee
+        Computed when first needed after either is replaced, that is, once
+        per allow, so the coat does not redo the key exchange per packet
+        '''
+        if (self.sharee is None or
+                self.sharee.privateer is not self.privee or
+                self.sharee.publican is not self.publee):
+            self.sharee = nacling.Sharer(self.privee,
+                                         self.publee,
+                                         counted=self.stack.Counted)
+        return self.sharee
+
+    def sampleRtt(self, rtt):
+        '''
+        Update .srtt and .rttvar with round trip time sample rtt in seconds
+        '''
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2.0
+        else:
+            self.rttvar += self.RttVarGain * (abs(self.srtt - rtt) - self.rttvar)
+            self.srtt += self.RttGain * (rtt - self.srtt)
+
+    def redoTimeout(self):
+        '''
+        Returns redo timeout from round trip estimates as smoothed round trip
+        time plus four variations bounded by .RedoTimeoutMin and
+        .RedoTimeoutMax or None if not yet sampled
+        '''
+        if self.srtt is None:
+            return None
+        return min(max(self.RedoTimeoutMin, self.srtt + 4.0 * self.rttvar),
+                   self.RedoTimeoutMax)
+
+    def congest(self, timeout=False):
+        '''
+        Multiplicatively decrease congestion window on loss
+        On timeout restart from the minimum window in slow start
+        '''
+        self.ssthresh = max(self.cwnd / 2.0, float(self.CwndMin))
+        self.cwnd = float(self.CwndMin) if timeout else self.ssthresh
+
+    def relieve(self, count):
+        '''
+        Increase congestion window for count segments acked
+        By count in slow start below .ssthresh otherwise additively by
+        about one segment per window acked
+        '''
+        if self.cwnd < self.ssthresh:
+            self.cwnd = min(self.cwnd + count, self.ssthresh)
+        else:
+            self.cwnd += float(count) / self.cwnd
+        self.cwnd = min(self.cwnd, float(self.CwndMax))
+
+    def paceInterval(self):
+        '''
+        Returns seconds between segments so a congestion window is spread
+        over a smoothed round trip time, zero if not yet sampled
+        '''
+        if not self.srtt:
+            return 0.0
+        return self.srtt / self.cwnd
+
+    def pace(self, count):
+        '''
+        Returns how many of count segments may be sent now
+        Credit accrues at one segment per .paceInterval up to half the
+        congestion window so bursts are at most that. Unpaced until round
+        trip time is sampled
+        '''
+        interval = self.paceInterval()
+        if not interval:
+            return count
+        stamp = self.stack.store.stamp
+        depth = max(float(self.CwndMin), self.cwnd / 2.0)
+        if self.paceStamp is not None:
+            self.paceCredit += (stamp - self.paceStamp) / interval
+        self.paceCredit = min(self.paceCredit, depth)
+        self.paceStamp = stamp
+        count = min(count, int(self.paceCredit))
+        self.paceCredit -= count
+        return count
 
     def validRsid(self, rsid):
         '''
@@ -345,8 +597,8 @@ class RemoteEstate(Estate):
         Remote is dead, reap it if main estate.
         '''
         if self.stack.main: # only main can reap
-            console.concise("Stack {0}: Reaping dead remote {1} at {2}\n".format(
-                    self.stack.name, self.name, self.stack.store.stamp))
+            console.concise("Stack {0}: Reaping dead remote {1} at {2}\n",
+                    self.stack.name, self.name, self.stack.store.stamp)
             self.stack.incStat("remote_reap")
             self.reaped = True
 
@@ -355,8 +607,8 @@ class RemoteEstate(Estate):
         Remote packet received from remote so not dead anymore.
         '''
         if self.stack.main: # only only main can reap or unreap
-            console.concise("Stack {0}: Unreaping dead remote {1} at {2}\n".format(
-                    self.stack.name, self.name, self.stack.store.stamp))
+            console.concise("Stack {0}: Unreaping dead remote {1} at {2}\n",
+                    self.stack.name, self.name, self.stack.store.stamp)
             self.stack.incStat("remote_unreap")
             self.reaped = False
 
@@ -422,7 +674,7 @@ class RemoteEstate(Estate):
             sid = index[3]
 
             if not rf and not self.validSid(sid): # transaction sid newer or equal
-                if transaction.kind in [TrnsKind.message]:
+                if transaction.kind in [TrnsKind.message, TrnsKind.coalesce]:
                     self.saveMessage(transaction)
                 transaction.nack()
                 self.removeTransaction(index)
@@ -439,8 +691,13 @@ class RemoteEstate(Estate):
         Save copy of body data from stale initiated messenger onto .messages deque
         for retransmitting later after new session is established
         messenger is instance of Messenger compatible transaction
+        Coalesced messages are saved each on its own
         '''
-        self.messages.append(odict(messenger.tray.body))
+        if messenger.kind == TrnsKind.coalesce:
+            for body in messenger.tray.body.get('msgs', []):
+                self.messages.append(odict(body))
+        else:
+            self.messages.append(odict(messenger.tray.body))
         emsg = ("Stack {0}: Saved stale message with remote {1}"
                                                 "\n".format(self.stack.name,
                                                             self.name))
@@ -6,7 +6,8 @@ packeting module provides classes for Raet packets
 '''
 
 # Import python libs
-from collections import Mapping, deque
+import binascii
+from collections import Mapping
 try:
     import simplejson as json
 except ImportError:
@@ -17,17 +18,18 @@ try:
 except ImportError:
     mspack = None
 
+import libnacl
+
 # Import ioflo libs
 from ioflo.base.odicting import odict
-from ioflo.base.aiding import packByte, unpackByte
 
-from ioflo.base.consoling import getConsole
+from ..consoling import getConsole
 console = getConsole()
 
 # Import raet libs
 from ..abiding import *  # import globals
-from .. import raeting
-from ..raeting import PcktKind, TailSize, CoatKind, FootSize, FootKind, BodyKind, HeadKind
+from .. import raeting, heading
+from ..raeting import PcktKind, TailSize, CoatKind, FootSize, FootKind, BodyKind, HeadKind, TrnsKind
 
 class Part(object):
     '''
@@ -79,85 +81,20 @@ class TxHead(Head):
         data['fl'] = self.packet.foot.size
         data['fg'] = "{0:02x}".format(self.packFlags())
 
-        # kit always includes raet id, packet length, header kind and flag fields
-        kit = odict([('ri', 'RAET'), ('pl', 0), ('hl', 0), ('fg', '00')])
-        for k, v in raeting.PACKET_DEFAULTS.items():  # include if not equal to default
-            if ((k in raeting.PACKET_HEAD_FIELDS) and
-                (k not in raeting.PACKET_FLAGS) and
-                (data[k] != v)):
-                kit[k] = data[k]
-
-        if data['hk'] == HeadKind.raet:
-            packed = b''
-            lines = []
-            for k, v in kit.items():
-                lines.append("{key} {val:{fmt}}".format(
-                        key=k, val=v, fmt=raeting.PACKET_FIELD_FORMATS[k]))
-            packed = ns2b('\n'.join(lines)) + raeting.HEAD_END
-            hl = len(packed)
-            if hl > raeting.MAX_HEAD_SIZE:
-                emsg = "Head length of {0}, exceeds max of {1}".format(hl, MAX_HEAD_SIZE)
-                raise raeting.PacketError(emsg)
-            data['hl'] = hl
-
-            if self.packet.coat.size > raeting.MAX_MESSAGE_SIZE:
-                emsg = "Packed message length of {0}, exceeds max of {1}".format(
-                         self.packet.coat.size, raeting.MAX_MESSAGE_SIZE)
-                raise raeting.PacketError(emsg)
-            pl = hl + self.packet.coat.size + data['fl']
-            data['pl'] = pl
-            # Tray checks for packet length greater than UDP_MAX_PACKET_SIZE
-            # and segments appropriately so pl may be truncated below in this case
-            # substitute true lengths
-            packed = packed.replace(ns2b('\npl {val:{fmt}}\n'.format(
-                                        val=kit['pl'],
-                                        fmt=raeting.PACKET_FIELD_FORMATS['pl'])),
-                                    ns2b('\npl {0}\n'.format("{val:{fmt}}".format(
-                                        val=pl,
-                                        fmt=raeting.PACKET_FIELD_FORMATS['pl'])[-4:])),
-                                    1)
-            packed = packed.replace(ns2b('\nhl {val:{fmt}}\n'.format(
-                                        val=kit['hl'],
-                                        fmt=raeting.PACKET_FIELD_FORMATS['hl'])),
-                                    ns2b('\nhl {0}\n'.format("{val:{fmt}}".format(
-                                            val=hl,
-                                            fmt=raeting.PACKET_FIELD_FORMATS['hl'])[-2:])),
-                                    1)
-            self.packed = packed
-
-        elif data['hk'] == HeadKind.json:
-            kit['pl'] = '0000000'  # need hex string so fixed length and jsonable
-            kit['hl'] = '00'  # need hex string so fixed length and jsonable
-            packed = (ns2b(json.dumps(kit, separators=(',', ':'),
-                                     encoding='ascii',)) + raeting.JSON_END)
-            hl = len(packed)
-            if hl > raeting.MAX_HEAD_SIZE:
-                emsg = "Head length of {0}, exceeds max of {1}".format(hl, MAX_HEAD_SIZE)
-                raise raeting.PacketError(emsg)
-            data['hl'] = hl
+        if self.packet.coat.size > raeting.MAX_MESSAGE_SIZE:
+            emsg = "Packed message length of {0}, exceeds max of {1}".format(
+                     self.packet.coat.size, raeting.MAX_MESSAGE_SIZE)
+            raise raeting.PacketError(emsg)
 
-            if self.packet.coat.size > raeting.MAX_MESSAGE_SIZE:
-                emsg = "Packed message length of {0}, exceeds max of {1}".format(
-                         self.packet.coat.size, raeting.MAX_MESSAGE_SIZE)
-                raise raeting.PacketError(emsg)
-            pl = hl + self.packet.coat.size + data['fl']
-            data['pl'] = pl
-            #substitute true length converted to 2 byte hex string
-            packed = packed.replace(ns2b('"pl":"0000000"'),
-                                    ns2b('"pl":"{0}"'.format("{0:07x}".format(pl)[-7:])),
-                                    1)  # JSON needs double quotes on strings
-            self.packed = packed.replace(ns2b('"hl":"00"'),
-                                         ns2b('"hl":"{0}"'.format("{0:02x}".format(hl)[-2:])),
-                                         1)  # JSON needs double quotes on strings
+        codec = heading.packetHeadCodec(data['hk'])
+        self.packed = codec.pack(data, self.packet.coat.size + data['fl'])
 
     def packFlags(self):
         '''
         Packs all the flag fields into a single two char hex string
         '''
-        values = []
-        for field in raeting.PACKET_FLAG_FIELDS:
-            values.append(1 if self.packet.data.get(field, 0) else 0)
-        return packByte(fmt=b'11111111', fields=values)
+        return heading.packetHeadCodec(self.packet.data['hk']).packFlags(
+                                                            self.packet.data)
 
 class RxHead(Head):
     '''
@@ -173,83 +110,29 @@ class RxHead(Head):
         data = self.packet.data  # for speed
         packed = self.packet.packed  # for speed
 
-        if packed.startswith(b'ri RAET\n') and raeting.HEAD_END in packed: # raet head
-            hk = HeadKind.raet.value
-            front, sep, back = packed.partition(raeting.HEAD_END)
-            self.packed = front + sep
-            kit = odict()
-            lines = str(front.decode(encoding='ISO-8859-1')).split('\n')
-            for line in lines:
-                key, val = line.split(' ')
-                if key not in raeting.PACKET_HEAD_FIELDS:
-                    emsg = "Unknown head field '{0}'".format(key)
-                    raise raeting.PacketError(emsg)
-                if 'x' in raeting.PACKET_FIELD_FORMATS[key]:
-                    val = int(val, 16)
-                elif 'd' in raeting.PACKET_FIELD_FORMATS[key]:
-                    val = int(val)
-                elif 'f' in raeting.PACKET_FIELD_FORMATS[key]:
-                    val = float(val)
-                kit[key] = val
-
-            data.update(kit)
-            if 'fg' in data:
-                self.unpackFlags(data['fg'])
-
-            if data['hk'] != hk:
-                emsg = 'Recognized head kind does not match head field value.'
-                raise raeting.PacketError(emsg)
-
-            if data['hl'] != self.size:
-                emsg = 'Actual head length = {0} not match head field = {1}'.format(
-                        self.size, data['hl'])
-                raise raeting.PacketError(emsg)
-
-            if data['pl'] != self.packet.size:
-                emsg = 'Actual packet length = {0} not match head field = {1}'.format(
-                    self.packet.size, data['pl'])
-                raise raeting.PacketError(emsg)
-
-
-        elif packed.startswith(ns2b('{"ri":"RAET",')) and raeting.JSON_END in packed: # json head
-            hk = HeadKind.json.value
-            front, sep, back = packed.partition(raeting.JSON_END)
-            self.packed = front + sep
-            kit = json.loads(front.decode(encoding='ascii'),
-                             encoding='ascii',
-                             object_pairs_hook=odict)
-            data.update(kit)
-            if 'fg' in data:
-                self.unpackFlags(data['fg'])
+        codec = heading.detectPacketHeadCodec(packed)
+        if codec is None:  # notify unrecognizable packet head
+            data['hk'] = HeadKind.unknown.value
+            emsg = "Unrecognizable packet head."
+            raise raeting.PacketError(emsg)
 
-            if data['hk'] != hk:
-                emsg = 'Recognized head kind does not match head field value.'
-                raise raeting.PacketError(emsg)
+        self.packed = codec.parse(packed, data)
 
-            hl = int(data['hl'], 16)
-            if hl != self.size:
-                emsg = 'Actual head length does not match head field value.'
-                raise raeting.PacketError(emsg)
-            data['hl'] = hl
-            pl = int(data['pl'], 16)
-            if pl != self.packet.size:
-                emsg = 'Actual packet length does not match head field value.'
-                raise raeting.PacketError(emsg)
-            data['pl'] = pl
+        if data['hk'] != codec.Hk:
+            emsg = 'Recognized head kind does not match head field value.'
+            raise raeting.PacketError(emsg)
 
-        else:  # notify unrecognizable packet head
-            data['hk'] = HeadKind.unknown.value
-            emsg = "Unrecognizable packet head."
+        if data['pl'] != self.packet.size:
+            emsg = 'Actual packet length = {0} not match head field = {1}'.format(
+                self.packet.size, data['pl'])
             raise raeting.PacketError(emsg)
 
     def unpackFlags(self, flags):
         '''
         Unpacks all the flag fields from a single two char hex string
         '''
-        values = unpackByte(fmt=b'11111111', byte=int(flags, 16), boolean=True)
-        for i, field in enumerate(raeting.PACKET_FLAG_FIELDS):
-            if field in self.packet.data:
-                self.packet.data[field] = values[i]
+        heading.PACKET_HEAD_CODECS[HeadKind.raet.value].unpackFlags(
+                                                    self.packet.data, int(flags, 16))
 
 class Body(Part):
     '''
@@ -290,6 +173,29 @@ class TxBody(Body):
         elif bk == BodyKind.raw:
             self.packed = self.data # data is already formatted string
 
+    @staticmethod
+    def join(bk, key, packeds):
+        '''
+        Returns packed body of kind bk for mapping with list at key of the
+        bodies already packed in packeds without packing them again
+        '''
+        if bk == BodyKind.json:
+            head, tail = ns2b(json.dumps(odict([(key, [])]),
+                                         separators=(',', ':'),
+                                         encoding='utf-8')).split(b'[]')
+            return b''.join([head + b'[', b','.join(packeds), b']' + tail])
+        if bk == BodyKind.msgpack:
+            if not msgpack:
+                emsg = "Msgpack not installed."
+                raise raeting.PacketError(emsg)
+            packer = msgpack.Packer(encoding='utf-8')
+            return b''.join([packer.pack_map_header(1),
+                             packer.pack(key),
+                             packer.pack_array_header(len(packeds))] +
+                            list(packeds))
+        emsg = "Cannot join bodies of kind '{0}'.".format(bk)
+        raise raeting.PacketError(emsg)
+
 class RxBody(Body):
     '''
     RAET protocol rx packet body class
@@ -310,7 +216,7 @@ class RxBody(Body):
 
         if bk == BodyKind.json:
             if self.packed:
-                kit = json.loads(self.packed.decode(encoding='utf-8'),
+                kit = json.loads(bytes(self.packed).decode(encoding='utf-8'),
                                  object_pairs_hook=odict,
                                  encoding='utf-8')
                 if not isinstance(kit, Mapping):
@@ -330,7 +236,7 @@ class RxBody(Body):
                     raise raeting.PacketError(emsg)
                 self.data = kit
         elif bk == BodyKind.raw:
-            self.data = self.packed # return as bytes
+            self.data = bytes(self.packed) # return as bytes
         elif bk == BodyKind.nada:
             pass
 
@@ -382,7 +288,7 @@ class RxCoat(Coat):
             if self.packed:
                 tl = TailSize.nacl.value # nonce length
                 cipher = self.packed[:-tl]
-                nonce = self.packed[-tl:]
+                nonce = bytes(self.packed[-tl:])
                 msg = self.packet.decrypt(cipher, nonce)
                 self.packet.body.packed = msg
             else:
@@ -423,6 +329,9 @@ class TxFoot(Foot):
         if fk == FootKind.nacl:
             self.packed = b''.rjust(FootSize.nacl.value, b'\x00')
 
+        elif fk == FootKind.mac:
+            self.packed = b''.rjust(FootSize.mac.value, b'\x00')
+
         elif fk == FootKind.nada:
             pass
 
@@ -439,6 +348,9 @@ class TxFoot(Foot):
         if fk == FootKind.nacl:
             self.packed = self.packet.signature(self.packet.packed)
 
+        elif fk == FootKind.mac:
+            self.packed = self.packet.mac(self.packet.packed)
+
         elif fk == FootKind.nada:
             pass
 
@@ -446,13 +358,17 @@ class RxFoot(Foot):
     '''
     RAET protocol receive packet foot class
     '''
-    def parse(self):
+    def parse(self, deferred=False):
         '''
         Parses foot. Assumes foot already unpacked
+        If deferred then signature verification triple is put in
+        packet .unverified for the caller to verify instead
         '''
         fk = self.packet.data['fk']
         fl = self.packet.data['fl']
         self.packed = b''
+        self.packet.unverified = None
+        self.packet.checkedKey = None
 
         if fk not in list(FootKind):
             self.packet.data['fk'] = FootKind.unknown.value
@@ -474,13 +390,32 @@ class RxFoot(Foot):
             signature = self.packed
             blank = b''.rjust(FootSize.nacl.value, b'\x00')
 
-            front = self.packet.packed[:self.packet.size - fl]
-
-            msg = front + blank
-            if not self.packet.verify(signature, msg):
+            # join front window with blank so only one copy
+            msg = b''.join([self.packet.window(0, self.packet.size - fl), blank])
+            self.packet.checkedKey = self.packet.verkey
+            if deferred:
+                self.packet.unverified = (signature, msg, self.packet.checkedKey)
+            elif not self.packet.verify(signature, msg):
                 emsg = "Failed verification"
                 raise raeting.PacketError(emsg)
 
+        if fk == FootKind.mac:
+            if self.size != FootSize.mac:
+                emsg = ("Actual foot size '{0}' does not match "
+                    "kind size '{1}'".format(self.size, FootSize.mac.value))
+                raise raeting.PacketError(emsg)
+
+            if self.packet.data['tk'] in [TrnsKind.join, TrnsKind.allow]:
+                emsg = "Mac foot not allowed for join or allow packets"
+                raise raeting.PacketError(emsg)
+
+            tag = bytes(self.packed)
+            blank = b''.rjust(FootSize.mac.value, b'\x00')
+            msg = b''.join([self.packet.window(0, self.packet.size - fl), blank])
+            if not self.packet.authenticate(tag, msg):
+                emsg = "Failed authentication"
+                raise raeting.PacketError(emsg)
+
         if fk == FootKind.nada:
             pass
 
@@ -509,6 +444,12 @@ class Packet(object):
         '''
         return len(self.packed)
 
+    def window(self, begin=0, end=None):
+        '''
+        Returns zero copy window onto .packed from begin to end
+        '''
+        return b2v(self.packed)[begin:end]
+
     @property
     def segmentive(self):
         '''
@@ -560,14 +501,24 @@ class TxPacket(Packet):
         '''
         return (self.stack.local.signer.signature(msg))
 
+    def mac(self, msg):
+        '''
+        Return session authenticator resulting from keyed hash of msg
+        with short term shared key
+        '''
+        remote = self.stack.remotes[self.data['se']]
+        return (remote.share().mac(msg))
+
     def sign(self):
         '''
         Sign packet with foot
+        Foot is written in place over the blank trailing .packed so the
+        packet is not joined again
         '''
         self.foot.sign()
-        self.packed = b''.join([self.head.packed,
-                               self.coat.packed,
-                               self.foot.packed])
+        fl = len(self.foot.packed)
+        if fl:
+            self.packed[-fl:] = self.foot.packed
 
     def encrypt(self, msg):
         '''
@@ -575,20 +526,22 @@ class TxPacket(Packet):
         with short term keys
         '''
         remote = self.stack.remotes[self.data['se']]
-        return (remote.privee.encrypt(msg, remote.publee.key))
+        return (remote.share().encrypt(msg))
 
-    def prepack(self):
+    def prepack(self, bodied=False):
         '''
         Pre Pack the parts of the packet .packed but do not sign so can see
         if needs to be segmented
+        bodied True means .body.packed already holds packed .body.data
         '''
-        self.body.pack()
+        if not bodied:
+            self.body.pack()
         self.coat.pack()
         self.foot.pack()
         self.head.pack()
-        self.packed = b''.join([self.head.packed,
-                               self.coat.packed,
-                               self.foot.packed])
+        self.packed = bytearray(b'').join([self.head.packed,
+                                          self.coat.packed,
+                                          self.foot.packed])
 
     def repack(self):
         '''
@@ -596,9 +549,9 @@ class TxPacket(Packet):
         '''
         self.foot.pack()  # need to pack to reblank it
         self.head.pack()
-        self.packed = b''.join([self.head.packed,
-                               self.coat.packed,
-                               self.foot.packed])
+        self.packed = bytearray(b'').join([self.head.packed,
+                                          self.coat.packed,
+                                          self.foot.packed])
 
         self.sign()  # sign updates self.packed
         if self.size > raeting.UDP_MAX_PACKET_SIZE:
@@ -630,7 +583,10 @@ class RxPacket(Packet):
         self.body = RxBody(packet=self)
         self.coat = RxCoat(packet=self)
         self.foot = RxFoot(packet=self)
-        self.packed = packed or ''
+        self.packed = packed or b''
+        self.deciphered = None  # (sharee, msg) duple when decrypted ahead
+        self.unverified = None  # (signature, msg, verkey) when verify deferred
+        self.checkedKey = None  # raw verify key foot signature was checked with
 
     @property
     def index(self):
@@ -646,6 +602,14 @@ class RxPacket(Packet):
             re = (data['sh'], data['sp'])
         return ((not cf, le, re, data['si'], data['ti'], data['bf']))
 
+    @property
+    def verkey(self):
+        '''
+        Property is raw verify key of source remote or empty if unknown
+        '''
+        remote = self.stack.remotes.get(self.data['de'])
+        return (remote.verfer.keyraw if remote else b'')
+
     def verify(self, signature, msg):
         '''
         Return result of verifying msg with signature
@@ -655,13 +619,62 @@ class RxPacket(Packet):
             return False
         return (self.stack.remotes[nuid].verfer.verify(signature, msg))
 
+    def authenticate(self, tag, msg):
+        '''
+        Return result of authenticating msg with session tag
+        Only allowed remotes when stack accepts mac foot
+        '''
+        nuid = self.data['de']
+        if not self.stack.MacFoot or not nuid in self.stack.remotes:
+            return False
+        remote = self.stack.remotes[nuid]
+        if not remote.allowed:
+            return False
+        return (remote.share().authenticate(tag, msg))
+
     def decrypt(self, cipher, nonce):
         '''
         Return msg resulting from decrypting cipher and nonce
         with short term keys
+        Raises PacketError if nonce is a stale counted nonce
         '''
         remote = self.stack.remotes[self.data['de']]
-        return (remote.privee.decrypt(cipher, nonce, remote.publee.key))
+        sharee = remote.share()
+        if self.deciphered and self.deciphered[0] is sharee:
+            msg = self.deciphered[1]
+        else:
+            msg = sharee.decrypt(cipher, nonce)
+        if not sharee.fresh(nonce):
+            emsg = "Stale nonce from remote '{0}'".format(remote.name)
+            raise raeting.PacketError(emsg)
+        return msg
+
+    def decipher(self):
+        '''
+        Decrypt unsegmented nacl coat ahead of parseInner with the current
+        shared key of the remote if already computed so decryption can be
+        offloaded. Result in .deciphered is used by .decrypt only if the
+        remote still has the same sharee. Failures are left for parseInner.
+        Assumes parseOuter already done
+        '''
+        self.deciphered = None
+        if self.data['ck'] != CoatKind.nacl or self.segmentive:
+            return
+        self.unpackInner()
+        if not self.coat.packed:
+            return
+        remote = self.stack.remotes.get(self.data['de'])
+        sharee = remote.sharee if remote else None
+        if (sharee is None or
+                sharee.privateer is not remote.privee or
+                sharee.publican is not remote.publee):
+            return
+        tl = TailSize.nacl.value
+        try:
+            msg = sharee.decrypt(self.coat.packed[:-tl], bytes(self.coat.packed[-tl:]))
+        except (ValueError, libnacl.CryptError):
+            return
+        self.deciphered = (sharee, msg)
 
     def parse(self, packed=None):
         '''
@@ -672,12 +685,14 @@ class RxPacket(Packet):
         self.parseOuter(packed=packed)
         self.parseInner()
 
-    def parseOuter(self, packed=None):
+    def parseOuter(self, packed=None, deferred=False):
         '''
         Parses raw packet head from packed if provided or .packed otherwise
         Deserializes head
         Unpacks rest of packet.
         Parses foot (signature) if given and verifies signature
+        If deferred then signature verification is left to caller
+        with the triple in .unverified
         Returns False if not verified Otherwise True
         Result is .data
         Raises PacketError exception If failure
@@ -695,7 +710,7 @@ class RxPacket(Packet):
                     "version '{1}'".format(self.data['vn']))
             raise raeting.PacketError(emsg)
 
-        self.foot.parse() #foot unpacks itself
+        self.foot.parse(deferred=deferred) #foot unpacks itself
 
     def unpackInner(self, packed=None):
         '''
@@ -705,7 +720,7 @@ class RxPacket(Packet):
         '''
         hl = self.data['hl']
         fl = self.data['fl']
-        self.coat.packed = self.packed[hl:self.size - fl] #coat.parse loads body.packed
+        self.coat.packed = self.window(hl, self.size - fl) #coat.parse loads body.packed
 
     def parseInner(self):
         '''
@@ -722,6 +737,29 @@ class RxPacket(Packet):
         self.coat.parse()
         self.body.parse()
 
+class RxEntry(RxPacket):
+    '''
+    RAET protocol rx packet for one entry of a received acks packet
+    Its .data is that of the acks packet updated with the entry tk, si, ti
+    and pk and its .body.data is the entry body already parsed with the
+    acks packet so parseInner does nothing
+    '''
+    def __init__(self, packet, tk, si, ti, pk, body):
+        '''
+        Setup RxEntry instance from acks packet and entry fields
+        '''
+        super(RxEntry, self).__init__(stack=packet.stack,
+                                      data=packet.data,
+                                      packed=packet.packed)
+        self.data.update(tk=tk, si=si, ti=ti, pk=pk)
+        self.body.data = body
+
+    def parseInner(self):
+        '''
+        Body already parsed with acks packet
+        '''
+        pass
+
 class Tray(object):
     '''
     Manages messages, segmentation when needed and the associated packets
@@ -747,19 +785,28 @@ class Tray(object):
 class TxTray(Tray):
     '''
     Manages an outgoing message and ites associated packet(s)
+
+    In streaming mode the segments of a segmented message are not packed and
+    signed up front. Only the coat bytes in .packed and the segment size are
+    kept and each segment packet is built and signed when .packet() is called
+    for it, that is, only when actually needed for a burst or a resend
     '''
-    def __init__(self, **kwa):
+    def __init__(self, streaming=False, **kwa):
         '''
         Setup instance
         '''
         super(TxTray, self).__init__(**kwa)
+        self.streaming = True if streaming else False
         self.packets = []
+        self.count = 0  # number of segment packets in message
+        self.segsize = 0  # coat bytes per segment, 0 if not segmented
         self.current = 0 # next  packet to send
         self.last = 0 # last packet sent
 
-    def pack(self, data=None, body=None):
+    def pack(self, data=None, body=None, packed=None):
         '''
         Convert message in .body into one or more packets
+        packed is optional .body already packed so not packed again
         '''
         if data:
             self.data.update(data)
@@ -768,15 +815,20 @@ class TxTray(Tray):
 
         self.current = 0
         self.packets = []
+        self.count = 0
+        self.segsize = 0
         packet = TxPacket(stack=self.stack,
                           kind=PcktKind.message.value,
                           embody=self.body,
                           data=self.data)
+        if packed is not None:
+            packet.body.packed = packed
 
-        packet.prepack()
+        packet.prepack(bodied=packed is not None)
         if packet.size <= raeting.UDP_MAX_PACKET_SIZE:
             packet.sign()
             self.packets.append(packet)
+            self.count = 1
         else:
             self.packed = packet.coat.packed
             self.packetize(headsize=packet.head.size, footsize=packet.foot.size)
@@ -784,46 +836,78 @@ class TxTray(Tray):
     def packetize(self, headsize, footsize):
         '''
         Create packeted segments from .packed using headsize footsize
+        In streaming mode only compute segment size and count
         '''
-        extrasize = 0
-        if self.data['hk'] == HeadKind.raet:
-            extrasize = 27 # extra header size as a result of segmentation
-        elif self.data['hk'] == HeadKind.json:
-            extrasize = 36 # extra header size as a result of segmentation
+        # extra header size as a result of segmentation
+        extrasize = heading.packetHeadCodec(self.data['hk']).Extrasize
 
         hotelsize = headsize + extrasize + footsize
-        segsize = raeting.UDP_MAX_PACKET_SIZE - hotelsize
-
-        segcount = (self.size // segsize) + (1 if self.size % segsize else 0)
-        for i in range(segcount):
-            if i == segcount - 1: #last segment
-                segment = self.packed[i * segsize:]
-            else:
-                segment = self.packed[i * segsize: (i+1) * segsize]
-
-            packet = TxPacket( stack=self.stack,
-                                data=self.data)
-            packet.data.update(sn=i, sc=segcount, ml=self.size, sf=True)
-            packet.coat.packed = packet.body.packed = segment
-            packet.foot.pack()
-            packet.head.pack()
-            packet.packed = b''.join([packet.head.packed,
-                                     packet.coat.packed,
-                                     packet.foot.packed])
-            packet.sign()
-            self.packets.append(packet)
+        self.segsize = raeting.UDP_MAX_PACKET_SIZE - hotelsize
+
+        self.count = (self.size // self.segsize) + (1 if self.size % self.segsize else 0)
+        if not self.streaming:
+            for i in range(self.count):
+                self.packets.append(self.segment(i))
+
+    def segment(self, sn, **kwa):
+        '''
+        Returns new signed packet for segment number sn of .packed
+        with packet data updated with kwa
+        '''
+        packet = TxPacket( stack=self.stack,
+                            data=self.data)
+        packet.data.update(sn=sn, sc=self.count, ml=self.size, sf=True)
+        packet.data.update(kwa)
+        packet.coat.packed = packet.body.packed = self.packed[sn * self.segsize:
+                                                              (sn + 1) * self.segsize]
+        packet.foot.pack()
+        packet.head.pack()
+        packet.packed = bytearray(b'').join([packet.head.packed,
+                                            packet.coat.packed,
+                                            packet.foot.packed])
+        packet.sign()
+        return packet
+
+    def packet(self, sn, **kwa):
+        '''
+        Returns signed packet for segment number sn with packet data
+        updated with kwa such as flags.
+        In streaming mode segmented packets are built when called otherwise
+        the stored packet is updated and repacked if kwa changes it
+        '''
+        if self.streaming and self.segsize:
+            return self.segment(sn, **kwa)
+
+        packet = self.packets[sn]
+        for key, val in kwa.items():
+            if packet.data[key] != val:
+                packet.data.update(kwa)
+                packet.repack()
+                break
+        return packet
 
 
 class RxTray(Tray):
     '''
     Manages segmentated messages and the associated packets
+
+    Received segments are tracked with a bitmap, one bit per segment number,
+    and a tally so completeness is checked in constant time and memory
+    stays bounded at MAX_SEGMENT_COUNT / 8 bytes
     '''
-    def __init__(self, segments=None, **kwa):
+    def __init__(self, **kwa):
         '''
         Setup instance
         '''
         super(RxTray, self).__init__(**kwa)
-        self.segments = segments if segments is not None else []
+        self.total = 0  # segment count of message once first segment received
+        self.received = bytearray()  # bitmap of received segment numbers
+        self.tally = 0  # number of unique segments received
+        self.floor = 0  # lowest segment number not yet received
+        self.highest = -1  # highest segment number received
+        self.buffer = None  # preallocated reassembly buffer sized from ml
+        self.segsize = 0  # size of each segment except the last
+        self.lastsize = 0  # size of the last segment
         self.complete = False
         self.last = 0 # last packet number received
         self.prev = 0 # previous packet number received
@@ -835,8 +919,8 @@ class RxTray(Tray):
         sc = packet.data['sc']
         self.prev = self.last
         self.last = sn = packet.data['sn']
-        console.verbose("segment count={0} number={1} tid={2}\n".format(
-            sc, sn, packet.data['ti']))
+        console.verbose("segment count={0} number={1} tid={2}\n",
+            sc, sn, packet.data['ti'])
 
         if sc == 1:  # this is only segment to complete now
             self.data.update(packet.data)
@@ -845,39 +929,129 @@ class RxTray(Tray):
             self.complete = True
             return self.body
 
-        if not self.segments: #get data from first packet received
+        if not self.total: #get data from first packet received
             self.data.update(packet.data)
-            self.segments = [None] * sc
+            ml = self.data['ml']
+            if ml > raeting.MAX_MESSAGE_SIZE or ml > sc * raeting.UDP_MAX_PACKET_SIZE:
+                emsg = "Message length of {0}, exceeds max for {1} segments".format(
+                        ml, sc)
+                raise raeting.PacketError(emsg)
+            self.total = sc
+            self.received = bytearray((sc + 7) // 8)
+            self.buffer = bytearray(ml)
 
-        hl = packet.data['hl']
-        fl = packet.data['fl']
-        segment = packet.packed[hl:packet.size - fl]
+        if sn >= self.total:
+            emsg = "Segment number '{0}' exceeds segment count '{1}'".format(
+                    sn, self.total)
+            raise raeting.PacketError(emsg)
 
-        self.segments[sn] = segment
-        if None in self.segments: #don't have all segments yet
+        if not self.has(sn):  # duplicates already placed
+            hl = packet.data['hl']
+            fl = packet.data['fl']
+            self.place(sn, packet.window(hl, packet.size - fl))
+            self.received[sn >> 3] |= (0x80 >> (sn & 7))
+            self.tally += 1
+            if sn > self.highest:
+                self.highest = sn
+            while self.floor < self.total and self.has(self.floor):
+                self.floor += 1
+
+        if self.tally < self.total: #don't have all segments yet
             return None
-        self.body = self.desegmentize()
+        if not self.complete:
+            self.body = self.desegmentize()
         return self.body
 
+    def has(self, sn):
+        '''
+        Returns True if segment number sn has been received
+        '''
+        return bool(self.received[sn >> 3] & (0x80 >> (sn & 7)))
+
+    def place(self, sn, segment):
+        '''
+        Copy segment with segment number sn into its offset in .buffer
+        All but the last segment are the same size so the offset of the last
+        is from the end of the buffer and the others are from the start
+        Raises PacketError if segment does not fit
+        '''
+        size = len(segment)
+        ml = len(self.buffer)
+        if sn == self.total - 1:  # last segment
+            self.lastsize = size
+            offset = ml - size
+        else:
+            if not self.segsize:
+                self.segsize = size
+            if size != self.segsize:
+                emsg = ("Segment size '{0}' does not match prior segment size "
+                        "'{1}'".format(size, self.segsize))
+                raise raeting.PacketError(emsg)
+            offset = sn * size
+        if offset < 0 or offset + size > ml:
+            emsg = ("Segment '{0}' of size '{1}' does not fit message length "
+                    "'{2}'".format(sn, size, ml))
+            raise raeting.PacketError(emsg)
+        self.buffer[offset:offset + size] = segment
+
+    def missingRuns(self, begin=None, end=None):
+        '''
+        Returns list of (start, stop) duples of runs of missing segment numbers,
+        stop exclusive, between begin and end that are followed by at least
+        one received segment number. Skips whole bitmap bytes when all
+        received or all missing
+        '''
+        begin = self.floor if begin is None else max(begin, self.floor)
+        end = self.total if end is None else min(end, self.total)
+        end = min(end, self.highest + 1)
+        received = self.received  # for speed
+        runs = []
+        start = None  # start of current run of missing
+        i = begin
+        while i < end:
+            byte = received[i >> 3]
+            if not (i & 7) and i + 8 <= end and (byte == 0xff or byte == 0x00):
+                if byte:  # all received
+                    if start is not None:
+                        runs.append((start, i))
+                        start = None
+                elif start is None:  # all missing
+                    start = i
+                i += 8
+                continue
+            if byte & (0x80 >> (i & 7)):  # received
+                if start is not None:
+                    runs.append((start, i))
+                    start = None
+            elif start is None:
+                start = i
+            i += 1
+        return runs  # trailing run not followed by received so not included
+
+    def sack(self, size):
+        '''
+        Returns hex of the bitmap bytes of received segment numbers from the
+        byte holding .floor covering at most size segments past it
+        Bit i of the result is segment number (.floor // 8) * 8 + i
+        '''
+        if not self.total:
+            return ''
+        start = self.floor >> 3
+        stop = min(len(self.received), ((self.floor + size + 7) >> 3),
+                   (self.highest >> 3) + 1)
+        if stop <= start:
+            return ''
+        return binascii.hexlify(bytes(self.received[start:stop])).decode('ascii')
+
     def missing(self, begin=None, end=None):
         '''
-        return deque of missing packet numbers between begin and end where
+        return list of missing packet numbers between begin and end where
         after at least one is found one starting from the end
         '''
-        if begin is None:
-            begin = 0
-        if end is None:
-            end = len(self.segments)
-        if begin >= end:
-            return []
-        misseds = deque()
-        found = False  # first missed after found
-        for i in range(end - 1, begin - 1, -1):  # iterate backwards
-            if self.segments[i]:
-                found =  True
-            if found and self.segments[i] is None:
-                misseds.appendleft(i)  # this reverses order
-        return list(misseds)   # convert into a list
+        misseds = []
+        for start, stop in self.missingRuns(begin=begin, end=end):
+            misseds.extend(range(start, stop))
+        return misseds
 
     def desegmentize(self):
         '''
@@ -885,15 +1059,15 @@ class RxTray(Tray):
         and processed header data
         '''
         sc = self.data['sc']
-        self.packed = b''.join(self.segments)
         ml = self.data['ml']
-        if sc > 1 and self.size != ml:
+        if sc > 1 and (self.segsize * (sc - 1) + self.lastsize) != ml:
             emsg = ("Full message payload length '{0}' does not equal head field"
-                                          " '{1}'".format(self.size, ml))
+                    " '{1}'".format(self.segsize * (sc - 1) + self.lastsize, ml))
             raise raeting.PacketError(emsg)
+        self.packed = self.buffer  # segments already placed in buffer
 
         packet = RxPacket(stack = self.stack, data=self.data)
-        packet.coat.packed = self.packed
+        packet.coat.packed = b2v(self.packed)
 
         packet.coat.parse()
         packet.body.parse()
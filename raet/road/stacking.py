@@ -21,6 +21,11 @@ try:
 except ImportError:
     mspack = None
 
+try:
+    from concurrent import futures
+except ImportError:
+    futures = None
+
 # Import ioflo libs
 from ioflo.base.odicting import odict
 from ioflo.base import aiding
@@ -33,12 +38,14 @@ from .. import raeting
 from ..raeting import PcktKind, TrnsKind, CoatKind, FootKind, BodyKind, HeadKind
 from .. import nacling
 from .. import stacking
+from .. import timing
 from . import keeping
 from . import packeting
 from . import estating
 from . import transacting
+from . import udping
 
-from ioflo.base.consoling import getConsole
+from ..consoling import getConsole
 console = getConsole()
 
 class RoadStack(stacking.KeepStack):
@@ -88,6 +95,37 @@ class RoadStack(stacking.KeepStack):
     Ck = CoatKind.nacl.value # stack default
     Bf = False # stack default for bcstflag
     BurstSize = 0  # stack default for max segments in each burst, 0 = no limit
+    Window = 0  # stack default for segments in flight with selective acks, 0 = bursts
+    Streaming = False  # stack default for packing segments only when sent
+    Counted = False  # stack default for session prefix plus counter coat nonces
+    MacFoot = False  # stack default for negotiating mac instead of signature foot
+    CryptoWorkers = 0  # stack default for crypto offload threads, 0 = serial
+    IoBatch = 0  # stack default for datagrams per batched socket call, 0 = single
+    BatchVerify = False  # stack default for verifying drained rxes signatures as one batch
+    Scheduled = False  # stack default for processing only due timers from timelines
+    KeyPool = 0  # stack default for pregenerated short term keys, 0 = none
+    Adaptive = False  # stack default for redo timeouts from remote round trip times
+    Congestion = False  # stack default for per remote congestion window and pacing
+    Coalesce = 0  # stack default for max bytes of small messages coalesced, 0 = none
+    Aggregate = False  # stack default for offering one acks packet per remote per service
+    # names of handlers of packets that initiate new correspondent transactions
+    # keyed by (tk, pk, cf), bound to .correspondences when instanced
+    Correspondences = {
+        (TrnsKind.join.value, PcktKind.request.value, False): 'replyJoin',
+        (TrnsKind.allow.value, PcktKind.hello.value, False): 'replyAllow',
+        (TrnsKind.alive.value, PcktKind.request.value, False): 'replyAlive',
+        (TrnsKind.message.value, PcktKind.message.value, False): 'replyMessageOrStale',
+        (TrnsKind.coalesce.value, PcktKind.message.value, False): 'replyMessageOrStale',
+    }
+    # packet kinds of stale nacks that are not themselves nacked
+    StaleNacks = frozenset([PcktKind.nack.value,
+                            PcktKind.unjoined.value,
+                            PcktKind.unallowed.value,
+                            PcktKind.renew.value,
+                            PcktKind.refuse.value,
+                            PcktKind.reject.value, ])
+    # same for stale correspondents except renew which is nacked to refuse it
+    StalentNacks = StaleNacks - frozenset([PcktKind.renew.value])
     Period = 1.0 # stack default for keep alive
     Offset = 0.5 # stack default for keep alive
     Interim = 3600 # stack default for reap timeout
@@ -147,6 +185,11 @@ class RoadStack(stacking.KeepStack):
         self.period = period if period is not None else self.Period
         self.offset = offset if offset is not None else self.Offset
         self.interim = interim if interim is not None else self.Interim
+        # timelines of due transactions and remotes when scheduled
+        self.transactionTimeline = timing.Timeline() if self.Scheduled else None
+        self.remoteTimeline = timing.Timeline() if self.Scheduled else None
+        # pool of short term keys for remote allows
+        self.keypool = nacling.Keypool(size=self.KeyPool) if self.KeyPool else None
 
         super(RoadStack, self).__init__(puid=puid,
                                         keep=keep,
@@ -162,6 +205,10 @@ class RoadStack(stacking.KeepStack):
         self.aliveds =  odict() # alived remotes keyed by name
         self.reapeds =  odict() # reaped remotes keyed by name
         self.availables = set() # set of available remote names
+        self.cryptor = None # crypto offload thread pool created when needed
+        self.replies = odict() # queued replies to aggregate keyed by remote uid
+        self.correspondences = dict((key, getattr(self, name)) for key, name
+                                    in self.Correspondences.items())
 
     @property
     def ha(self):
@@ -188,6 +235,10 @@ class RoadStack(stacking.KeepStack):
         '''
         Create local listening server for stack
         '''
+        if self.IoBatch:
+            return udping.SocketUdpBatch(ha=self.ha,
+                        bufsize=raeting.UDP_MAX_PACKET_SIZE * self.bufcnt,
+                        count=self.IoBatch)
         server = nonblocking.SocketUdpNb(ha=self.ha,
                         bufsize=raeting.UDP_MAX_PACKET_SIZE * self.bufcnt)
         return server
@@ -200,6 +251,7 @@ class RoadStack(stacking.KeepStack):
         if remote.timer.store is not self.store:
             raise raeting.StackError("Store reference mismatch between remote"
                     " '{0}' and stack '{1}'".format(remote.name, stack.name))
+        remote.prefetch()  # so .fqdn is cached before transactions use it
         return remote
 
     def removeRemote(self, remote, clear=True):
@@ -386,6 +438,15 @@ class RoadStack(stacking.KeepStack):
         self.clearLocalRoleKeep()
         self.clearRemoteRoleKeeps()
 
+    def close(self):
+        '''
+        Shutdown crypto offload threads if any then close server
+        '''
+        if self.cryptor is not None:
+            self.cryptor.shutdown()
+            self.cryptor = None
+        super(RoadStack, self).close()
+
     def manage(self, cascade=False, immediate=False):
         '''
         Manage remote estates. Time based processing of remote status such as
@@ -397,12 +458,20 @@ class RoadStack(stacking.KeepStack):
         immediate indicates to run first attempt immediately and not wait for timer
 
         availables = dict of remotes that are both alive and allowed
+
+        When scheduled only remotes with due timers on the .remoteTimeline are
+        managed unless immediate
         '''
+        if self.remoteTimeline is not None and not immediate:
+            for remote in self.remoteTimeline.pop(self.store.stamp):
+                if self.remotes.get(remote.uid) is remote:  # not removed
+                    remote.manage(cascade=cascade)
         alloweds = odict()
         aliveds = odict()
         reapeds = odict()
         for remote in self.remotes.values(): # should not start anything
-            remote.manage(cascade=cascade, immediate=immediate)
+            if self.remoteTimeline is None or immediate:
+                remote.manage(cascade=cascade, immediate=immediate)
             if remote.allowed:
                 alloweds[remote.name] = remote
             if remote.alived:
@@ -426,7 +495,7 @@ class RoadStack(stacking.KeepStack):
         Assumes that there is a message on the .rxes deque
         '''
         raw, sa = self.rxes.popleft()
-        console.verbose("{0} received packet\n{1}\n".format(self.name, raw))
+        console.verbose("{0} received packet\n{1}\n", self.name, raw)
 
         packet = packeting.RxPacket(stack=self, packed=raw)
         try:
@@ -440,24 +509,121 @@ class RoadStack(stacking.KeepStack):
         packet.data.update(sh=sh, sp=sp)
         self.processRx(packet)
 
+    def serviceRxes(self):
+        '''
+        Process all messages in .rxes deque
+        When .CryptoWorkers or .BatchVerify the deque is drained and handled
+        as one batch otherwise each message is handled alone in turn.
+        Replies queued for aggregation while processing are then sent.
+        '''
+        if (self.CryptoWorkers and futures is not None) or self.BatchVerify:
+            self._handleRxBatch()
+        else:
+            while self.rxes:
+                self._handleOneRx()
+        self.serviceReplies()
+
+    def _handleRxBatch(self):
+        '''
+        Handle all messages in .rxes deque as one batch
+        The outer parse of the whole batch is done first with the signature
+        foot verifications collected and done together in one tight loop.
+        When .CryptoWorkers the outer parse with foot verification and the
+        coat decryption are instead offloaded to a thread pool.
+        libnacl calls through ctypes release the GIL so they run in parallel.
+        The batch is then processed in received order so per remote order is
+        kept. Processing earlier packets in the batch, such as a join or a
+        rejoin, may change the verify key of a remote so a packet whose
+        signature was checked with another key than the current one is
+        redone alone in turn. Other failed packets are dropped.
+        '''
+        batch = []
+        while self.rxes:
+            raw, sa = self.rxes.popleft()
+            batch.append((packeting.RxPacket(stack=self, packed=raw), sa))
+
+        if self.CryptoWorkers and futures is not None:
+            if self.cryptor is None:
+                self.cryptor = futures.ThreadPoolExecutor(max_workers=self.CryptoWorkers)
+            fs = [self.cryptor.submit(self._offloadRx, packet) for packet, sa in batch]
+            # wait for whole batch so workers never read state while processing
+            futures.wait(fs)
+            exs = [future.result() for future in fs]
+        else:
+            exs = self._parseOuterRxes([packet for packet, sa in batch])
+
+        for (packet, sa), ex in zip(batch, exs):
+            if packet.checkedKey is not None and packet.checkedKey != packet.verkey:
+                self.rxes.appendleft((packet.packed, sa))
+                self._handleOneRx()
+                continue
+            console.verbose("{0} received packet\n{1}\n", self.name, packet.packed)
+            if ex is not None:
+                console.terse(str(ex) + '\n')
+                self.incStat('parsing_outer_error')
+                continue
+            sh, sp = sa
+            packet.data.update(sh=sh, sp=sp)
+            self.processRx(packet)
+
+    def _parseOuterRxes(self, packets):
+        '''
+        Parse outer of each packet in packets deferring signature verification
+        Then verify all deferred signatures together with nacling.verifyBatch
+        Returns list in order of None if parsed and verified otherwise
+        the PacketError
+        '''
+        exs = []
+        signeds = []
+        for i, packet in enumerate(packets):
+            try:
+                packet.parseOuter(deferred=True)
+            except raeting.PacketError as ex:
+                exs.append(ex)
+                continue
+            exs.append(None)
+            if packet.unverified:
+                signeds.append(i)
+
+        verifieds = nacling.verifyBatch([packets[i].unverified for i in signeds])
+        for i, verified in zip(signeds, verifieds):
+            if not verified:
+                exs[i] = raeting.PacketError("Failed verification")
+        return exs
+
+    def _offloadRx(self, packet):
+        '''
+        Crypto worker parse of packet outer and coat decryption
+        Returns None if parsed otherwise the PacketError. Runs in a .cryptor
+        thread while the servicing thread waits on the batch so no transaction
+        is processed concurrently.
+        '''
+        try:
+            packet.parseOuter()
+        except raeting.PacketError as ex:
+            return ex
+        packet.decipher()
+        return None
+
     def processRx(self, packet):
         '''
         Process packet via associated transaction or
         reply with new correspondent transaction
         '''
-        console.profuse("{0} received packet data\n{1}\n".format(self.name, packet.data))
-        console.verbose("{0} received packet index: (rf={1[0]}, le={1[1]}, re={1[2]},"
-                " si={1[3]}, ti={1[4]}, bf={1[5]})\n".format(self.name, packet.index))
-        try:
-            tkname = TrnsKind(packet.data['tk'])
-        except ValueError as ex:
-            tkname = None
-        try:
-            pkname = PcktKind(packet.data['pk'])
-        except ValueError as ex:
-            pkname = None
-        console.verbose("{0} received trans kind = '{1}' packet kind = '{2}'"
-                        "\n".format(self.name, tkname, pkname))
+        console.profuse("{0} received packet data\n{1}\n", self.name, packet.data)
+        if console.enabled(console.Wordage.verbose):  # enum lookups only to log
+            console.verbose("{0} received packet index: (rf={1[0]}, le={1[1]}, re={1[2]},"
+                    " si={1[3]}, ti={1[4]}, bf={1[5]})\n", self.name, packet.index)
+            try:
+                tkname = TrnsKind(packet.data['tk'])
+            except ValueError as ex:
+                tkname = None
+            try:
+                pkname = PcktKind(packet.data['pk'])
+            except ValueError as ex:
+                pkname = None
+            console.verbose("{0} received trans kind = '{1}' packet kind = '{2}'"
+                            "\n", self.name, tkname, pkname)
 
         bf = packet.data['bf']
         if bf:
@@ -472,7 +638,7 @@ class RoadStack(stacking.KeepStack):
 
         remote = None
 
-        if tk in [TrnsKind.join]: # join transaction
+        if tk == TrnsKind.join.value: # join transaction
             sha = (packet.data['sh'],  packet.data['sp'])
             if rsid != 0: # join  must use sid == 0
                 emsg = ("Stack '{0}'. Nonzero join sid '{1}' in packet from {2}."
@@ -519,7 +685,7 @@ class RoadStack(stacking.KeepStack):
 
                     if not remote: # no current joinees for remote initiator at rha
                         # is it not first packet of join
-                        if pk not in [PcktKind.request]:
+                        if pk != PcktKind.request.value:
                             emsg = ("Stack '{0}'. Stale join initiatance from '{1}',"
                                 " Not a request and no remote. Dropping...\n".format(
                                         self.name, sha))
@@ -559,7 +725,7 @@ class RoadStack(stacking.KeepStack):
             if de == 0 or se == 0:
                 emsg = ("Stack '{0}'. Invalid nonjoin from remote '{1}'."
                         " Zero nuid {2} or fuid {3}. Dropping...\n".format(
-                            self.name, sha, de, se))
+                            self.name, (packet.data['sh'], packet.data['sp']), de, se))
                 console.terse(emsg)
                 self.incStat('invalid_uid')
                 return
@@ -584,6 +750,16 @@ class RoadStack(stacking.KeepStack):
                 if remote.reaped:
                     remote.unreap() # packet a valid packet so remote is not dead
 
+        if pk == PcktKind.acks.value:  # aggregate of replies to transactions
+            if remote and cf:
+                self.receiveAcks(packet, remote)
+                return
+            emsg = ("Stack '{0}'. Invalid acks packet for remote '{1}'."
+                    " Dropping...\n".format(self.name, de))
+            console.terse(emsg)
+            self.incStat('invalid_acks')
+            return
+
         if remote:
             trans = remote.transactions.get(packet.index, None)
             if trans:
@@ -606,41 +782,170 @@ class RoadStack(stacking.KeepStack):
     def correspond(self, packet, remote):
         '''
         Create correspondent transaction remote and handle packet
+        Dispatches on (tk, pk, cf) via .correspondences
         '''
-        if (packet.data['tk'] == TrnsKind.join and
-                packet.data['pk'] == PcktKind.request):
-            self.replyJoin(packet, remote)
+        handler = self.correspondences.get((packet.data['tk'],
+                                            packet.data['pk'],
+                                            packet.data['cf']))
+        if handler is None:
+            self.incStat('stale_packet')
             return
+        handler(packet, remote)
 
-        if (packet.data['tk'] == TrnsKind.allow and
-                packet.data['pk'] == PcktKind.hello):
-            self.replyAllow(packet, remote)
+    def receiveAcks(self, packet, remote):
+        '''
+        Process acks packet from remote by handing each of its
+        (tk, si, ti, pk, body) entries to the matching locally initiated
+        transaction as if received alone. Entries without one are stale
+        Dropped unless remote is allowed as its session keys may be renewing
+        '''
+        if not remote.allowed:
+            emsg = "Stack '{0}'. Dropping acks from unallowed {1}\n".format(
+                    self.name, remote.name)
+            console.terse(emsg)
+            self.incStat('unallowed_acks')
             return
-
-        if (packet.data['tk'] == TrnsKind.alive and
-                packet.data['pk'] == PcktKind.request):
-            self.replyAlive(packet, remote)
+        if not self.parseInner(packet):
             return
-
-        if (packet.data['tk'] == TrnsKind.message and
-                packet.data['pk'] == PcktKind.message):
-            if packet.data['af']:  # packet is a stale resend
-                self.replyStale(packet, remote)
+        entries = packet.body.data.get('acks')
+        if not isinstance(entries, list):
+            emsg = "Stack '{0}'. Invalid acks '{1}' from {2}\n".format(
+                    self.name, entries, remote.name)
+            console.terse(emsg)
+            self.incStat('invalid_acks')
+            return
+        self.incStat('acks_rx')
+        for entry in entries:
+            try:
+                tk, si, ti, pk, body = entry
+            except (TypeError, ValueError):
+                emsg = "Stack '{0}'. Invalid acks entry '{1}' from {2}\n".format(
+                        self.name, entry, remote.name)
+                console.terse(emsg)
+                self.incStat('invalid_acks')
+                continue
+            rxPacket = packeting.RxEntry(packet, tk=tk, si=si, ti=ti, pk=pk, body=body)
+            trans = remote.transactions.get(rxPacket.index, None)
+            if trans:
+                trans.receive(rxPacket)
             else:
-                self.replyMessage(packet, remote)
+                self.stale(rxPacket)
+
+    def queueReply(self, transaction, kind, body):
+        '''
+        Queue reply of packet kind with body and copy of head data of
+        correspondent transaction to be sent to its remote by .serviceReplies
+        '''
+        self.replies.setdefault(transaction.remote.uid, []).append(
+                (transaction, odict(transaction.txData), kind, body))
+
+    def serviceReplies(self):
+        '''
+        Send queued replies for each remote. A lone reply is sent as is.
+        Otherwise the replies are sent together as (tk, si, ti, pk, body)
+        entries of one acks packet
+        '''
+        if not self.replies:
             return
+        queued, self.replies = self.replies, odict()
+        for uid, replies in queued.items():
+            remote = self.remotes.get(uid, None)
+            if remote is not None:
+                self._sendReplies(remote, replies)
 
-        self.incStat('stale_packet')
+    def _sendReplies(self, remote, replies):
+        '''
+        Pack and send list of replies to remote in one packet. When too many
+        for one packet send each half in turn
+        A transaction whose lone reply fails to pack is removed as when
+        it replies without aggregation
+        '''
+        if len(replies) == 1:
+            transaction, data, kind, body = replies[0]
+        else:
+            data = odict(replies[0][1])
+            data.update(tk=TrnsKind.unknown.value, ti=0, wf=False)
+            kind = PcktKind.acks.value
+            body = odict(acks=[[entry['tk'], entry['si'], entry['ti'], pk, each]
+                               for transaction, entry, pk, each in replies])
+        packet = packeting.TxPacket(stack=self, kind=kind, embody=body, data=data)
+        try:
+            packet.pack()
+        except raeting.PacketError as ex:
+            if len(replies) > 1:
+                half = len(replies) // 2
+                self._sendReplies(remote, replies[:half])
+                self._sendReplies(remote, replies[half:])
+                return
+            console.terse(str(ex) + '\n')
+            self.incStat("packing_error")
+            if transaction.active:
+                transaction.remove()
+            return
+        try:
+            self.tx(packet.packed, remote.uid)
+        except raeting.StackError as ex:
+            console.terse(str(ex) + '\n')
+            self.incStat("reply_tx_failure")
+            return
+        if len(replies) > 1:
+            self.incStat("acks_tx")
+            self.incStat("acks_aggregated", len(replies))
 
     def process(self):
         '''
         Call .process or all remotes to allow timer based processing
         of their transactions
+        When scheduled only process transactions with due timers on the
+        .transactionTimeline
+        Then send replies queued for aggregation
         '''
         #for transaction in self.transactions.values():
             #transaction.process()
+        if self.transactionTimeline is not None:
+            for transaction in self.transactionTimeline.pop(self.store.stamp):
+                remote = transaction.remote
+                if (transaction.active and remote is not None and
+                        self.remotes.get(remote.uid) is remote):  # not removed
+                    transaction.process()
+        else:
+            for remote in self.remotes.values():
+                remote.process()
+
+        self.serviceReplies()
+
+    def deadline(self, manage=False):
+        '''
+        Returns earliest future store stamp at which timer based processing
+        is due or None if nothing is pending.
+        Includes transaction timeout and redo timers and when manage is True
+        the remote keep alive and reap timers and the park timers of blocked
+        destinations.
+        Timers already expired are skipped as they were serviced.
+        When scheduled uses the timelines.
+        '''
+        stamp = self.store.stamp
+        stops = [super(RoadStack, self).deadline(manage=manage)]  # parks
+        if self.transactionTimeline is not None:
+            stops.append(self.transactionTimeline.deadline(stamp))
+            if manage:
+                stops.append(self.remoteTimeline.deadline(stamp))
+            stops = [stop for stop in stops if stop is not None]
+            return min(stops) if stops else None
+
         for remote in self.remotes.values():
-            remote.process()
+            if manage and not remote.reaped:
+                stops.append(remote.timer.stop)
+                if self.main and self.interim > 0.0:
+                    stops.append(remote.reapTimer.stop)
+            for transaction in remote.transactions.values():
+                if transaction.timeout > 0.0:
+                    stops.append(transaction.timer.stop)
+                redoTimer = getattr(transaction, 'redoTimer', None)
+                if redoTimer is not None:
+                    stops.append(redoTimer.stop)
+        stops = [stop for stop in stops if stop is not None and stop > stamp]
+        return min(stops) if stops else None
 
     def parseInner(self, packet):
         '''
@@ -649,8 +954,8 @@ class RoadStack(stacking.KeepStack):
         '''
         try:
             packet.parseInner()
-            console.verbose("Stack '{0}'. Received packet body\n{1}\n".format(
-                    self.name, packet.body.data))
+            console.verbose("Stack '{0}'. Received packet body\n{1}\n",
+                    self.name, packet.body.data)
         except raeting.PacketError as ex:
             console.terse(str(ex) + '\n')
             self.incStat('parsing_inner_error')
@@ -662,12 +967,7 @@ class RoadStack(stacking.KeepStack):
         Initiate stale transaction in order to nack a stale correspondent packet
         but only for preexisting remotes
         '''
-        if packet.data['pk'] in [PcktKind.nack,
-                                PcktKind.unjoined,
-                                PcktKind.unallowed,
-                                PcktKind.renew,
-                                PcktKind.refuse,
-                                PcktKind.reject,]:
+        if packet.data['pk'] in self.StaleNacks:
             return # ignore stale nacks
         create = False
         uid = packet.data['de']
@@ -692,11 +992,7 @@ class RoadStack(stacking.KeepStack):
         '''
         Correspond to stale initiated transaction
         '''
-        if packet.data['pk'] in [PcktKind.nack,
-                                 PcktKind.unjoined,
-                                 PcktKind.unallowed,
-                                 PcktKind.refuse,
-                                 PcktKind.reject,]:
+        if packet.data['pk'] in self.StalentNacks:
             return # ignore stale nacks
         data = odict(hk=self.Hk, bk=self.Bk)
         stalent = transacting.Stalent(stack=self,
@@ -747,6 +1043,14 @@ class RoadStack(stacking.KeepStack):
                                       rxPacket=packet)
         joinent.join()
 
+    def footKind(self, remote):
+        '''
+        Returns foot kind for packets of session transactions with remote
+        FootKind.mac when negotiated with remote in allow
+        Otherwise stack default .Fk
+        '''
+        return (FootKind.mac.value if remote.macFoot else self.Fk)
+
     def allow(self, uid=None, timeout=None, cascade=False):
         '''
         Initiate allow transaction
@@ -789,7 +1093,7 @@ class RoadStack(stacking.KeepStack):
             console.terse(emsg)
             self.incStat('invalid_remote_eid')
             return
-        data = odict(hk=self.Hk, bk=self.Bk, fk=self.Fk, ck=self.Ck)
+        data = odict(hk=self.Hk, bk=self.Bk, fk=self.footKind(remote), ck=self.Ck)
         aliver = transacting.Aliver(stack=self,
                                     remote=remote,
                                     timeout=timeout,
@@ -801,7 +1105,7 @@ class RoadStack(stacking.KeepStack):
         '''
         Correspond to new Alive transaction
         '''
-        data = odict(hk=self.Hk, bk=self.Bk, fk=self.Fk, ck=self.Ck)
+        data = odict(hk=self.Hk, bk=self.Bk, fk=self.footKind(remote), ck=self.Ck)
         alivent = transacting.Alivent(stack=self,
                                       remote=remote,
                                       bcst=packet.data['bf'],
@@ -811,65 +1115,179 @@ class RoadStack(stacking.KeepStack):
                                       rxPacket=packet)
         alivent.alive()
 
-    def transmit(self, msg, uid=None, timeout=None):
+    def transmit(self, msg, uid=None, timeout=None, done=None):
         '''
         Append duple (msg, uid) to .txMsgs deque
         If msg is not mapping then raises exception
         If uid is None then it will default to the first entry in .remotes
         If timeout is None then it will use Messenger default
         timeout of 0 means never timeout of message transaction
+        done is optional callable called with the Outcome of the message
+        transaction and appended as fourth entry when provided
         '''
         if not isinstance(msg, Mapping):
             emsg = "Invalid msg, not a mapping {0}\n".format(msg)
             console.terse(emsg)
             self.incStat("invalid_transmit_body")
+            if done:
+                done(raeting.Outcome.failed)
             return
         if uid is None:
             if not self.remotes:
                 emsg = "No remote to send to\n"
                 console.terse(emsg)
                 self.incStat("invalid_destination")
+                if done:
+                    done(raeting.Outcome.failed)
                 return
             uid = self.remotes.values()[0].uid
-        self.txMsgs.append((msg, uid, timeout))
+        if done:
+            self.txMsgs.append((msg, uid, timeout, done))
+        else:
+            self.txMsgs.append((msg, uid, timeout))
+
+    def serviceTxMsgs(self):
+        '''
+        Service .txMsgs queue of outgoing  messages
+        When .Coalesce small messages are coalesced
+        '''
+        if self.Coalesce:
+            self._coalesceTxMsgs()
+        else:
+            super(RoadStack, self).serviceTxMsgs()
+
+    def _coalesceTxMsgs(self):
+        '''
+        Take all messages from .txMsgs deque and send those queued since last
+        serviced for the same remote uid and timeout as one coalesce
+        transaction whose body holds the list of their bodies at 'msgs'
+        while their packed size stays within .Coalesce bytes.
+        Larger messages are sent alone after those before them as are all
+        messages to remotes that did not negotiate coalescing in allow
+        '''
+        batches = odict()  # lists of (body, done, packed) keyed by (uid, timeout)
+        while self.txMsgs:
+            tx = self.txMsgs.popleft()
+            body, uid, timeout = tx[:3]
+            done = tx[3] if len(tx) > 3 else None
+            key = (uid, timeout)
+            remote = self.retrieveRemote(uid=uid)
+            if not (remote and remote.coalesce):
+                self.message(body, uid=uid, timeout=timeout, done=done)
+                continue
+            try:
+                packed = self.packBody(body)
+            except raeting.PacketError as ex:
+                console.terse(str(ex) + '\n')
+                self.incStat("packing_error")
+                if done:
+                    done(raeting.Outcome.failed)
+                continue
+            size = len(packed)
+            batch = batches.setdefault(key, [])
+            if batch and (size + sum(len(entry[2]) for entry in batch) > self.Coalesce):
+                self._messageBatch(key, batches.pop(key))
+                batch = batches.setdefault(key, [])
+            if size > self.Coalesce:
+                self._messageBatch(key, [(body, done, packed)])
+            else:
+                batch.append((body, done, packed))
+        for key, batch in batches.items():
+            self._messageBatch(key, batch)
+
+    def _messageBatch(self, key, batch):
+        '''
+        Send message transaction for batch list of (body, done, packed) of
+        messages to key duple (uid, timeout) coalesced when more than one
+        The already packed bodies are joined not packed again
+        '''
+        if not batch:
+            return
+        uid, timeout = key
+        if len(batch) == 1:
+            body, done, packed = batch[0]
+            self.message(body, uid=uid, timeout=timeout, done=done, packed=packed)
+            console.verbose("{0} sending\n{1}\n", self.name, body)
+            return
+        body = odict(msgs=[entry[0] for entry in batch])
+        packed = packeting.TxBody.join(self.Bk, 'msgs', [entry[2] for entry in batch])
+        dones = [entry[1] for entry in batch if entry[1]]
+        done = None
+        if dones:
+            def done(outcome):
+                for each in dones:
+                    each(outcome)
+        self.incStat("message_coalesced", len(batch))
+        self.message(body, uid=uid, timeout=timeout, done=done, packed=packed,
+                     coalesced=True)
+        console.verbose("{0} sending\n{1}\n", self.name, body)
+
+    def packBody(self, body):
+        '''
+        Returns body packed as message body
+        '''
+        packet = packeting.TxPacket(stack=self, embody=body, data=odict(bk=self.Bk))
+        packet.body.pack()
+        return packet.body.packed
 
     def  _handleOneTxMsg(self):
         '''
         Take one message from .txMsgs deque and handle it
         Assumes there is a message on the deque
         '''
-        # triple (body dict, destination uid, timout)
-        body, uid, timeout = self.txMsgs.popleft()
-        self.message(body, uid=uid, timeout=timeout)
-        console.verbose("{0} sending\n{1}\n".format(self.name, body))
+        # triple (body dict, destination uid, timout) or with done callback
+        tx = self.txMsgs.popleft()
+        body, uid, timeout = tx[:3]
+        done = tx[3] if len(tx) > 3 else None
+        self.message(body, uid=uid, timeout=timeout, done=done)
+        console.verbose("{0} sending\n{1}\n", self.name, body)
 
-    def message(self, body, uid=None, timeout=None):
+    def message(self, body, uid=None, timeout=None, done=None, packed=None,
+                coalesced=False):
         '''
         Initiate message transaction to remote at duid
         If uid is None then create remote at ha
         If timeout is None then use Messenger default
         If timeout is 0 then never timeout
+        done is optional callable called with the Outcome of the transaction
+        packed is optional body already packed so not packed again
+        coalesced True means body holds list of message bodies at 'msgs'
         '''
         remote = self.retrieveRemote(uid=uid)
         if not remote:
             emsg = "Invalid remote destination estate id '{0}'\n".format(uid)
             console.terse(emsg)
             self.incStat('invalid_remote_uid')
+            if done:
+                done(raeting.Outcome.failed)
             return
-        data = odict(hk=self.Hk, bk=self.Bk, fk=self.Fk, ck=self.Ck)
+        data = odict(hk=self.Hk, bk=self.Bk, fk=self.footKind(remote), ck=self.Ck)
         messenger = transacting.Messenger(stack=self,
                                           remote=remote,
                                           timeout=timeout,
                                           txData=data,
                                           bcst=self.Bf,
-                                          burst=self.BurstSize)
-        messenger.message(body)
+                                          burst=self.BurstSize,
+                                          window=self.Window,
+                                          streaming=self.Streaming,
+                                          done=done,
+                                          coalesced=coalesced)
+        messenger.message(body, packed=packed)
+
+    def replyMessageOrStale(self, packet, remote):
+        '''
+        Correspond to new Message transaction unless packet is a stale resend
+        '''
+        if packet.data['af']:  # packet is a stale resend
+            self.replyStale(packet, remote)
+        else:
+            self.replyMessage(packet, remote)
 
     def replyMessage(self, packet, remote):
         '''
         Correspond to new Message transaction
         '''
-        data = odict(hk=self.Hk, bk=self.Bk, fk=self.Fk, ck=self.Ck)
+        data = odict(hk=self.Hk, bk=self.Bk, fk=self.footKind(remote), ck=self.Ck)
         messengent = transacting.Messengent(stack=self,
                                             remote=remote,
                                             bcst=packet.data['bf'],
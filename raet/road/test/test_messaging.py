@@ -26,7 +26,7 @@ console = getConsole()
 # Import raet libs
 from raet.abiding import *  # import globals
 from raet import raeting, nacling
-from raet.road import estating, keeping, stacking, packeting, transacting
+from raet.road import estating, keeping, stacking, packeting, transacting, udping
 
 if sys.platform == 'win32':
     TEMPDIR = 'c:/temp'
@@ -346,6 +346,35 @@ class BasicTestCase(unittest.TestCase):
             self.store.advanceStamp(0.1)
             time.sleep(0.05)
 
+    def serviceStacksWithLatency(self, stacks, latency, duration=1.0, tick=0.01):
+        '''
+        Utility method to service queues for list of stacks. Call from test method.
+        Holds each tx in flight for latency seconds of store time before it is
+        sent so the link has a fixed round trip time of twice latency.
+        '''
+        flights = deque()  # triples of (due, stack, (packet, destination address))
+        self.timer.restart(duration=duration)
+        while not self.timer.expired:
+            for stack in stacks:
+                stack.serviceReceives()
+                stack.serviceRxes()
+                stack.process()
+                stack.serviceTxMsgs()
+                while stack.txes:
+                    flights.append((self.store.stamp + latency,
+                                    stack,
+                                    stack.txes.popleft()))
+            while flights and flights[0][0] <= self.store.stamp:
+                due, stack, (tx, ta) = flights.popleft()
+                stack.server.send(tx, ta)
+                for stack in stacks:  # drain so socket buffers never overflow
+                    stack.serviceReceives()
+
+            if all([not stack.transactions for stack in stacks]) and not flights:
+                break
+            self.store.advanceStamp(tick)
+            time.sleep(0.001)
+
     def serviceStacksFlushTx(self, stacks, duration=1.0):
         '''
         Utility method to service queues for list of stacks. Call from test method.
@@ -1301,6 +1330,1310 @@ class BasicTestCase(unittest.TestCase):
             stack.server.close()
             stack.clearAllKeeps()
 
+    def testMessageBinaryHead(self):
+        '''
+        Test message where one side uses binary head kind and the other raet
+        '''
+        console.terse("{0}\n".format(self.testMessageBinaryHead.__doc__))
+
+        alphaData = self.createRoadData(name='alpha',
+                                        base=self.base,
+                                        auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(alphaData['dirpath'])
+        alpha = self.createRoadStack(data=alphaData,
+                                     main=True,
+                                     auto=alphaData['auto'],
+                                     ha=None)
+        alpha.Hk = raeting.HeadKind.binary.value
+
+        betaData = self.createRoadData(name='beta',
+                                       base=self.base,
+                                       auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(betaData['dirpath'])
+        beta = self.createRoadStack(data=betaData,
+                                    main=True,
+                                    auto=betaData['auto'],
+                                    ha=("", raeting.RAET_TEST_PORT))
+        self.assertEqual(beta.Hk, raeting.HeadKind.raet.value)
+
+        console.terse("\nJoin *********\n")
+        self.join(alpha, beta)
+        for stack in [alpha, beta]:
+            self.assertEqual(len(stack.transactions), 0)
+            self.assertEqual(len(stack.remotes), 1)
+            remote = stack.remotes.values()[0]
+            self.assertIs(remote.joined, True)
+
+        console.terse("\nAllow *********\n")
+        self.allow(alpha, beta)
+        for stack in [alpha, beta]:
+            self.assertEqual(len(stack.transactions), 0)
+            remote = stack.remotes.values()[0]
+            self.assertIs(remote.allowed, True)
+            self.assertIs(remote.alived, True)  # fast alive
+
+        console.terse("\nMessage Alpha to Beta *********\n")
+        msgs = []
+        bloat = []
+        for i in range(300):
+            bloat.append(str(i).rjust(100, " "))
+        bloat = "".join(bloat)
+        sentMsg = odict(who="Green", data=bloat)
+        msgs.append(sentMsg)
+
+        self.message(msgs, alpha, beta, duration=5.0)
+
+        for stack in [alpha, beta]:
+            self.assertEqual(len(stack.transactions), 0)
+        self.assertEqual(len(beta.rxMsgs), 1)
+        receivedMsg, source = beta.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+
+        console.terse("\nMessage Beta to Alpha *********\n")
+        self.message(msgs, beta, alpha, duration=5.0)
+
+        for stack in [beta, alpha]:
+            self.assertEqual(len(stack.transactions), 0)
+        self.assertEqual(len(alpha.rxMsgs), 1)
+        receivedMsg, source = alpha.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+
+        for stack in [alpha, beta]:
+            stack.server.close()
+            stack.clearAllKeeps()
+
+    def testMessageStreamingWithBurstDrops(self):
+        '''
+        Test message in streaming mode with packets dropped
+        '''
+        console.terse("{0}\n".format(self.testMessageStreamingWithBurstDrops.__doc__))
+
+        alphaData = self.createRoadData(name='alpha',
+                                        base=self.base,
+                                        auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(alphaData['dirpath'])
+        alpha = self.createRoadStack(data=alphaData,
+                                     main=True,
+                                     auto=alphaData['auto'],
+                                     ha=None)
+
+
+        betaData = self.createRoadData(name='beta',
+                                       base=self.base,
+                                       auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(betaData['dirpath'])
+        beta = self.createRoadStack(data=betaData,
+                                    main=True,
+                                    auto=betaData['auto'],
+                                    ha=("", raeting.RAET_TEST_PORT))
+
+        stacking.RoadStack.BurstSize = 4
+        self.assertEqual(stacking.RoadStack.BurstSize, 4)
+        stacking.RoadStack.Streaming = True
+        self.assertIs(stacking.RoadStack.Streaming, True)
+
+        console.terse("\nJoin *********\n")
+        self.join(alpha, beta) # vacuous join fails because other not main
+        for stack in [alpha, beta]:
+            self.assertEqual(len(stack.transactions), 0)
+            self.assertEqual(len(stack.remotes), 1)
+            self.assertEqual(len(stack.nameRemotes), 1)
+            remote = stack.remotes.values()[0]
+            self.assertIs(remote.joined, True)
+            self.assertIs(remote.allowed, None)
+            self.assertIs(remote.alived, None)
+
+        console.terse("\nAllow *********\n")
+        self.allow(alpha, beta)
+        for stack in [alpha, beta]:
+            self.assertEqual(len(stack.transactions), 0)
+            self.assertEqual(len(stack.remotes), 1)
+            self.assertEqual(len(stack.nameRemotes), 1)
+            remote = stack.remotes.values()[0]
+            self.assertIs(remote.joined, True)
+            self.assertIs(remote.allowed, True)
+            self.assertIs(remote.alived, True)  # fast alive
+
+        console.terse("\nMessage Alpha to Beta *********\n")
+        msgs = []
+        bloat = []
+        for i in range(300):
+            bloat.append(str(i).rjust(100, " "))
+        bloat = "".join(bloat)
+        sentMsg = odict(who="Green", data=bloat)
+        msgs.append(sentMsg)
+
+        console.terse("\nMessage with drops Alpha to Beta *********\n")
+        self.assertEqual(len(alpha.txMsgs), 0)
+        self.assertEqual(len(alpha.txes), 0)
+        self.assertEqual(len(beta.rxes), 0)
+        self.assertEqual(len(beta.rxMsgs), 0)
+        alpha.transmit(sentMsg)
+        alpha.serviceAllTx()
+        messenger = alpha.transactions[0]
+        self.assertIs(messenger.tray.streaming, True)
+        self.assertEqual(messenger.tray.count, 35)
+        self.assertEqual(len(messenger.tray.packets), 0)
+
+        drops = [0, 0, 0, 1, 0, 0, 1, 0, 1, 0, 0, 1, 0, 0, 1, 1]
+        dropage = [list(drops), list(drops)]
+        self.serviceStacksWithDrops([alpha, beta], dropage=dropage, duration=10.0)
+
+        for stack in [alpha, beta]:
+            self.assertEqual(len(stack.transactions), 0)
+
+        self.assertEqual(len(alpha.txMsgs), 0)
+        self.assertEqual(len(alpha.txes), 0)
+        self.assertEqual(len(beta.rxes), 0)
+        self.assertEqual(len(beta.rxMsgs), 1)
+        receivedMsg, source = beta.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+
+        console.terse("\nMessage with drops Beta to Alpha *********\n")
+        self.assertEqual(len(beta.txMsgs), 0)
+        self.assertEqual(len(beta.txes), 0)
+        self.assertEqual(len(alpha.rxes), 0)
+        self.assertEqual(len(alpha.rxMsgs), 0)
+        beta.transmit(sentMsg)
+
+        drops = [0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 1, 0, 1, 0, 0, 1]
+        dropage = [list(drops), list(drops)]
+        self.serviceStacksWithDrops([alpha, beta], dropage=dropage, duration=10.0)
+
+        for stack in [beta, alpha]:
+            self.assertEqual(len(stack.transactions), 0)
+
+        self.assertEqual(len(beta.txMsgs), 0)
+        self.assertEqual(len(beta.txes), 0)
+        self.assertEqual(len(alpha.rxes), 0)
+        self.assertEqual(len(alpha.rxMsgs), 1)
+        receivedMsg, source = alpha.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+
+        stacking.RoadStack.BurstSize = 0
+        stacking.RoadStack.Streaming = False
+        for stack in [alpha, beta]:
+            stack.server.close()
+            stack.clearAllKeeps()
+
+    def testMessageSharedKey(self):
+        '''
+        Test message coat uses shared key precomputed once per allow
+        '''
+        console.terse("{0}\n".format(self.testMessageSharedKey.__doc__))
+
+        alphaData = self.createRoadData(name='alpha',
+                                        base=self.base,
+                                        auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(alphaData['dirpath'])
+        alpha = self.createRoadStack(data=alphaData,
+                                     main=True,
+                                     auto=alphaData['auto'],
+                                     ha=None)
+
+        betaData = self.createRoadData(name='beta',
+                                       base=self.base,
+                                       auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(betaData['dirpath'])
+        beta = self.createRoadStack(data=betaData,
+                                    main=True,
+                                    auto=betaData['auto'],
+                                    ha=("", raeting.RAET_TEST_PORT))
+
+        console.terse("\nJoin *********\n")
+        self.join(alpha, beta)
+        for stack in [alpha, beta]:
+            remote = stack.remotes.values()[0]
+            self.assertIs(remote.joined, True)
+            self.assertIs(remote.sharee, None)
+
+        console.terse("\nAllow *********\n")
+        self.allow(alpha, beta)
+        sharees = []
+        for stack in [alpha, beta]:
+            remote = stack.remotes.values()[0]
+            self.assertIs(remote.allowed, True)
+            self.assertIsNot(remote.sharee, None)
+            self.assertIs(remote.sharee.privateer, remote.privee)
+            self.assertIs(remote.sharee.publican, remote.publee)
+            sharees.append(remote.sharee)
+        self.assertEqual(sharees[0].key, sharees[1].key)
+
+        console.terse("\nMessage Alpha to Beta *********\n")
+        sentMsg = odict(who="Green", data="Hello Beta")
+        self.message([sentMsg], alpha, beta, duration=2.0)
+        self.assertEqual(len(beta.rxMsgs), 1)
+        receivedMsg, source = beta.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+        for stack, sharee in zip([alpha, beta], sharees):
+            self.assertIs(stack.remotes.values()[0].sharee, sharee)
+
+        console.terse("\nAllow Again *********\n")
+        remote = alpha.remotes.values()[0]
+        remote.rekey()
+        self.assertIs(remote.sharee, None)
+        self.allow(alpha, beta)
+        for stack, sharee in zip([alpha, beta], sharees):
+            remote = stack.remotes.values()[0]
+            self.assertIs(remote.allowed, True)
+            self.assertIsNot(remote.sharee, sharee)
+            self.assertNotEqual(remote.sharee.key, sharee.key)
+
+        console.terse("\nMessage Beta to Alpha *********\n")
+        self.message([sentMsg], beta, alpha, duration=2.0)
+        self.assertEqual(len(alpha.rxMsgs), 1)
+        receivedMsg, source = alpha.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+
+        for stack in [alpha, beta]:
+            stack.server.close()
+            stack.clearAllKeeps()
+
+    def testMessageCountedNonce(self):
+        '''
+        Test message coat with counted session nonces rejects replayed packets
+        '''
+        console.terse("{0}\n".format(self.testMessageCountedNonce.__doc__))
+
+        stacking.RoadStack.Counted = True
+        self.assertIs(stacking.RoadStack.Counted, True)
+
+        alphaData = self.createRoadData(name='alpha',
+                                        base=self.base,
+                                        auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(alphaData['dirpath'])
+        alpha = self.createRoadStack(data=alphaData,
+                                     main=True,
+                                     auto=alphaData['auto'],
+                                     ha=None)
+
+        betaData = self.createRoadData(name='beta',
+                                       base=self.base,
+                                       auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(betaData['dirpath'])
+        beta = self.createRoadStack(data=betaData,
+                                    main=True,
+                                    auto=betaData['auto'],
+                                    ha=("", raeting.RAET_TEST_PORT))
+
+        console.terse("\nJoin *********\n")
+        self.join(alpha, beta)
+
+        console.terse("\nAllow *********\n")
+        self.allow(alpha, beta)
+        for stack in [alpha, beta]:
+            remote = stack.remotes.values()[0]
+            self.assertIs(remote.allowed, True)
+            self.assertIs(remote.sharee.counted, True)
+        counter = alpha.remotes.values()[0].sharee.counter
+        self.assertEqual(counter, 1)  # initiate
+
+        console.terse("\nMessage Alpha to Beta *********\n")
+        sentMsg = odict(who="Green", data="Hello Beta")
+        self.message([sentMsg], alpha, beta, duration=2.0)
+        self.assertEqual(len(beta.rxMsgs), 1)
+        receivedMsg, source = beta.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+        self.assertEqual(alpha.remotes.values()[0].sharee.counter, counter + 1)
+        self.assertEqual(beta.remotes.values()[0].sharee.rxCounter, counter + 1)
+
+        console.terse("\nMessage Replayed Alpha to Beta *********\n")
+        alpha.transmit(sentMsg)
+        alpha.serviceAll()
+        self.dupReceives(beta)
+        beta.serviceAllRx()
+        self.assertEqual(len(beta.rxMsgs), 1)
+        self.assertEqual(beta.stats.get('parsing_message_error'), 1)
+        self.serviceStacks([alpha, beta], duration=2.0)
+        self.assertEqual(len(beta.rxMsgs), 1)
+        receivedMsg, source = beta.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+
+        stacking.RoadStack.Counted = False
+        self.assertIs(stacking.RoadStack.Counted, False)
+
+        for stack in [alpha, beta]:
+            stack.server.close()
+            stack.clearAllKeeps()
+
+    def testMessageMacFoot(self):
+        '''
+        Test message with mac foot negotiated in allow instead of signature
+        '''
+        console.terse("{0}\n".format(self.testMessageMacFoot.__doc__))
+
+        alphaData = self.createRoadData(name='alpha',
+                                        base=self.base,
+                                        auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(alphaData['dirpath'])
+        alpha = self.createRoadStack(data=alphaData,
+                                     main=True,
+                                     auto=alphaData['auto'],
+                                     ha=None)
+
+        betaData = self.createRoadData(name='beta',
+                                       base=self.base,
+                                       auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(betaData['dirpath'])
+        beta = self.createRoadStack(data=betaData,
+                                    main=True,
+                                    auto=betaData['auto'],
+                                    ha=("", raeting.RAET_TEST_PORT))
+
+        console.terse("\nJoin *********\n")
+        self.join(alpha, beta)
+
+        console.terse("\nAllow Old Peer *********\n")
+        alpha.MacFoot = True  # beta does not support mac foot
+        self.allow(alpha, beta)
+        for stack in [alpha, beta]:
+            remote = stack.remotes.values()[0]
+            self.assertIs(remote.allowed, True)
+            self.assertIs(remote.macFoot, False)
+            self.assertEqual(stack.footKind(remote), raeting.FootKind.nacl.value)
+
+        sentMsg = odict(who="Green", data="Hello Beta")
+        self.message([sentMsg], alpha, beta, duration=2.0)
+        self.assertEqual(len(beta.rxMsgs), 1)
+        receivedMsg, source = beta.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+
+        console.terse("\nAllow Again *********\n")
+        beta.MacFoot = True
+        self.allow(alpha, beta)
+        for stack in [alpha, beta]:
+            remote = stack.remotes.values()[0]
+            self.assertIs(remote.allowed, True)
+            self.assertIs(remote.macFoot, True)
+            self.assertEqual(stack.footKind(remote), raeting.FootKind.mac.value)
+
+        console.terse("\nMessage Both Ways *********\n")
+        alpha.transmit(sentMsg)
+        alpha.serviceAll()
+        beta.serviceReceives()
+        for rx in beta.rxes:
+            packet = packeting.RxPacket(stack=beta, packed=rx[0])
+            packet.parseOuter()
+            self.assertEqual(packet.data['fk'], raeting.FootKind.mac.value)
+            self.assertEqual(packet.data['fl'], raeting.FootSize.mac.value)
+        self.serviceStacks([alpha, beta], duration=2.0)
+        self.assertEqual(len(beta.rxMsgs), 1)
+        receivedMsg, source = beta.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+
+        self.message([sentMsg], beta, alpha, duration=2.0)
+        self.assertEqual(len(alpha.rxMsgs), 1)
+        receivedMsg, source = alpha.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+
+        console.terse("\nMessage Rejected Without Support *********\n")
+        beta.MacFoot = False
+        self.message([sentMsg], alpha, beta, duration=2.0)
+        self.assertEqual(len(beta.rxMsgs), 0)
+        self.assertTrue(beta.stats.get('parsing_outer_error'))
+
+        for stack in [alpha, beta]:
+            stack.server.close()
+            stack.clearAllKeeps()
+
+    def testMessageCryptoWorkers(self):
+        '''
+        Test messages with crypto offloaded to worker pool keep order
+        '''
+        console.terse("{0}\n".format(self.testMessageCryptoWorkers.__doc__))
+
+        stacking.RoadStack.CryptoWorkers = 2
+        self.assertEqual(stacking.RoadStack.CryptoWorkers, 2)
+
+        alphaData = self.createRoadData(name='alpha',
+                                        base=self.base,
+                                        auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(alphaData['dirpath'])
+        alpha = self.createRoadStack(data=alphaData,
+                                     main=True,
+                                     auto=alphaData['auto'],
+                                     ha=None)
+
+        betaData = self.createRoadData(name='beta',
+                                       base=self.base,
+                                       auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(betaData['dirpath'])
+        beta = self.createRoadStack(data=betaData,
+                                    main=True,
+                                    auto=betaData['auto'],
+                                    ha=("", raeting.RAET_TEST_PORT))
+
+        console.terse("\nJoin *********\n")
+        self.join(alpha, beta)
+        console.terse("\nAllow *********\n")
+        self.allow(alpha, beta)
+        for stack in [alpha, beta]:
+            remote = stack.remotes.values()[0]
+            self.assertIs(remote.joined, True)
+            self.assertIs(remote.allowed, True)
+            self.assertIsNot(stack.cryptor, None)
+
+        console.terse("\nDecipher Ahead *********\n")
+        sentMsg = odict(who="Green", data="Hello Beta")
+        alpha.transmit(sentMsg)
+        alpha.serviceAll()
+        beta.serviceReceives()
+        self.assertEqual(len(beta.rxes), 1)
+        packet = packeting.RxPacket(stack=beta, packed=beta.rxes[0][0])
+        packet.parseOuter()
+        packet.decipher()
+        self.assertIs(packet.deciphered[0], beta.remotes.values()[0].sharee)
+        self.assertIs(beta.parseInner(packet), packet)
+        self.assertDictEqual(packet.body.data, sentMsg)
+        self.serviceStacks([alpha, beta], duration=3.0)
+        self.assertEqual(len(beta.rxMsgs), 1)
+        receivedMsg, source = beta.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+
+        console.terse("\nMessages In Order *********\n")
+        msgs = []
+        for i in range(20):
+            msgs.append(odict(who="Green", data="Hello Beta {0}".format(i)))
+        msgs.append(odict(who="Green", data="Big Beta " * 400))  # segmented
+        self.message(msgs, alpha, beta, duration=5.0)
+        self.assertEqual(len(beta.rxMsgs), len(msgs))
+        for msg in msgs:
+            receivedMsg, source = beta.rxMsgs.popleft()
+            self.assertDictEqual(msg, receivedMsg)
+
+        self.message(msgs, beta, alpha, duration=5.0)
+        self.assertEqual(len(alpha.rxMsgs), len(msgs))
+        for msg in msgs:
+            receivedMsg, source = alpha.rxMsgs.popleft()
+            self.assertDictEqual(msg, receivedMsg)
+
+        console.terse("\nMessages Verify Key Changed *********\n")
+        msgs = []
+        for i in range(2):
+            msgs.append(odict(who="Green", data="Hello Beta {0}".format(i)))
+            alpha.transmit(msgs[-1])
+        alpha.serviceAll()
+        time.sleep(0.1)
+        beta.serviceReceives()
+        self.assertEqual(len(beta.rxes), 2)
+
+        # first packet processed changes verify key so second checked with stale key
+        remote = beta.remotes.values()[0]
+        processRx = beta.processRx
+        def rekey(packet):
+            processRx(packet)
+            remote.verfer = nacling.Verifier(nacling.Signer().verhex)
+        beta.processRx = rekey
+
+        beta.stats.clear()
+        beta.serviceRxes()
+        self.assertEqual(len(beta.rxes), 0)
+        self.assertEqual(beta.stats.get('parsing_outer_error'), 1)
+        self.assertEqual(len(beta.rxMsgs), 1)
+        receivedMsg, source = beta.rxMsgs.popleft()
+        self.assertDictEqual(msgs[0], receivedMsg)
+
+        stacking.RoadStack.CryptoWorkers = 0
+        self.assertEqual(stacking.RoadStack.CryptoWorkers, 0)
+
+        for stack in [alpha, beta]:
+            stack.close()
+            self.assertIs(stack.cryptor, None)
+            stack.clearAllKeeps()
+
+    def testMessageBatchVerify(self):
+        '''
+        Test drained rxes verified as batch with failed packets dropped
+        and only packets checked with a stale verify key redone alone
+        '''
+        console.terse("{0}\n".format(self.testMessageBatchVerify.__doc__))
+
+        stacking.RoadStack.BatchVerify = True
+
+        alphaData = self.createRoadData(name='alpha',
+                                        base=self.base,
+                                        auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(alphaData['dirpath'])
+        alpha = self.createRoadStack(data=alphaData,
+                                     main=True,
+                                     auto=alphaData['auto'],
+                                     ha=None)
+
+        betaData = self.createRoadData(name='beta',
+                                       base=self.base,
+                                       auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(betaData['dirpath'])
+        beta = self.createRoadStack(data=betaData,
+                                    main=True,
+                                    auto=betaData['auto'],
+                                    ha=("", raeting.RAET_TEST_PORT))
+
+        console.terse("\nJoin *********\n")
+        self.join(alpha, beta)
+        console.terse("\nAllow *********\n")
+        self.allow(alpha, beta)
+
+        console.terse("\nMessages Batch *********\n")
+        msgs = []
+        for i in range(5):
+            msgs.append(odict(who="Green", data="Hello Beta {0}".format(i)))
+            alpha.transmit(msgs[-1])
+        alpha.serviceAll()
+        time.sleep(0.1)
+        beta.serviceReceives()
+        self.assertEqual(len(beta.rxes), 5)
+        raw, sa = beta.rxes[2]
+        raw = bytearray(raw)
+        raw[-1] ^= 0xff  # corrupt signature
+        beta.rxes[2] = (bytes(raw), sa)
+
+        verifieds = []
+        verify = beta.remotes.values()[0].verfer.verify
+        def spy(signature, msg):
+            verifieds.append(msg)
+            return verify(signature, msg)
+        beta.remotes.values()[0].verfer.verify = spy
+
+        beta.stats.clear()
+        beta.serviceRxes()
+        self.assertEqual(len(beta.rxes), 0)
+        self.assertEqual(beta.stats.get('parsing_outer_error'), 1)
+        self.assertEqual(verifieds, [])  # failed packet not verified again
+        self.assertEqual(len(beta.rxMsgs), 4)
+        for i in [0, 1, 3, 4]:
+            receivedMsg, source = beta.rxMsgs.popleft()
+            self.assertDictEqual(msgs[i], receivedMsg)
+
+        console.terse("\nMessages Verify Key Changed *********\n")
+        msgs = []
+        for i in range(2):
+            msgs.append(odict(who="Green", data="Hello Beta {0}".format(i)))
+            alpha.transmit(msgs[-1])
+        alpha.serviceAll()
+        time.sleep(0.1)
+        beta.serviceReceives()
+        self.assertEqual(len(beta.rxes), 2)
+
+        # first packet processed changes verify key so second checked with stale key
+        remote = beta.remotes.values()[0]
+        processRx = beta.processRx
+        def rekey(packet):
+            processRx(packet)
+            remote.verfer = nacling.Verifier(nacling.Signer().verhex)
+        beta.processRx = rekey
+
+        beta.stats.clear()
+        beta.serviceRxes()
+        self.assertEqual(len(beta.rxes), 0)
+        self.assertEqual(beta.stats.get('parsing_outer_error'), 1)
+        self.assertEqual(len(beta.rxMsgs), 1)
+        receivedMsg, source = beta.rxMsgs.popleft()
+        self.assertDictEqual(msgs[0], receivedMsg)
+
+        stacking.RoadStack.BatchVerify = False
+        for stack in [alpha, beta]:
+            stack.server.close()
+            stack.clearAllKeeps()
+
+    def testMessageIoBatch(self):
+        '''
+        Test messages with batched datagram io
+        '''
+        console.terse("{0}\n".format(self.testMessageIoBatch.__doc__))
+
+        stacking.RoadStack.IoBatch = 4
+        self.assertEqual(stacking.RoadStack.IoBatch, 4)
+
+        alphaData = self.createRoadData(name='alpha',
+                                        base=self.base,
+                                        auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(alphaData['dirpath'])
+        alpha = self.createRoadStack(data=alphaData,
+                                     main=True,
+                                     auto=alphaData['auto'],
+                                     ha=None)
+
+        betaData = self.createRoadData(name='beta',
+                                       base=self.base,
+                                       auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(betaData['dirpath'])
+        beta = self.createRoadStack(data=betaData,
+                                    main=True,
+                                    auto=betaData['auto'],
+                                    ha=("", raeting.RAET_TEST_PORT))
+        for stack in [alpha, beta]:
+            self.assertIsInstance(stack.server, udping.SocketUdpBatch)
+            self.assertIs(stack.server.batched, True)
+            self.assertEqual(stack.server.count, 4)
+
+        console.terse("\nJoin *********\n")
+        self.join(alpha, beta)
+        console.terse("\nAllow *********\n")
+        self.allow(alpha, beta)
+        for stack in [alpha, beta]:
+            remote = stack.remotes.values()[0]
+            self.assertIs(remote.joined, True)
+            self.assertIs(remote.allowed, True)
+
+        console.terse("\nMessages Both Ways *********\n")
+        msgs = []
+        for i in range(10):
+            msgs.append(odict(who="Green", data="Hello {0}".format(i)))
+        msgs.append(odict(who="Green", data="Big " * 2000))  # segmented
+        self.message(msgs, alpha, beta, duration=5.0)
+        self.assertEqual(len(beta.rxMsgs), len(msgs))
+        for msg in msgs:
+            receivedMsg, source = beta.rxMsgs.popleft()
+            self.assertDictEqual(msg, receivedMsg)
+
+        self.message(msgs, beta, alpha, duration=5.0)
+        self.assertEqual(len(alpha.rxMsgs), len(msgs))
+        for msg in msgs:
+            receivedMsg, source = alpha.rxMsgs.popleft()
+            self.assertDictEqual(msg, receivedMsg)
+
+        stacking.RoadStack.IoBatch = 0
+        self.assertEqual(stacking.RoadStack.IoBatch, 0)
+
+        for stack in [alpha, beta]:
+            stack.server.close()
+            stack.clearAllKeeps()
+
+    def testMessageScheduled(self):
+        '''
+        Test messages with drops when processing only due timers from timelines
+        '''
+        console.terse("{0}\n".format(self.testMessageScheduled.__doc__))
+
+        stacking.RoadStack.Scheduled = True
+        self.assertEqual(stacking.RoadStack.Scheduled, True)
+
+        alphaData = self.createRoadData(name='alpha',
+                                        base=self.base,
+                                        auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(alphaData['dirpath'])
+        alpha = self.createRoadStack(data=alphaData,
+                                     main=True,
+                                     auto=alphaData['auto'],
+                                     ha=None)
+
+        betaData = self.createRoadData(name='beta',
+                                       base=self.base,
+                                       auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(betaData['dirpath'])
+        beta = self.createRoadStack(data=betaData,
+                                    main=True,
+                                    auto=betaData['auto'],
+                                    ha=("", raeting.RAET_TEST_PORT))
+        for stack in [alpha, beta]:
+            self.assertIsNot(stack.transactionTimeline, None)
+            self.assertIsNot(stack.remoteTimeline, None)
+
+        console.terse("\nJoin *********\n")
+        self.join(alpha, beta)
+        console.terse("\nAllow *********\n")
+        self.allow(alpha, beta)
+        for stack in [alpha, beta]:
+            remote = stack.remotes.values()[0]
+            self.assertIs(remote.joined, True)
+            self.assertIs(remote.allowed, True)
+            self.assertEqual(len(stack.transactions), 0)
+
+        console.terse("\nMessage with drops Alpha to Beta *********\n")
+        bloat = "".join([str(i).rjust(100, " ") for i in range(300)])
+        sentMsg = odict(who="Green", data=bloat)
+        alpha.transmit(sentMsg)
+        drops = [0, 1, 1, 0, 0, 0, 0, 0, 1]
+        dropage = [list(drops), list(drops)]
+        self.serviceStacksWithDrops([alpha, beta], dropage=dropage, duration=10.0)
+        for stack in [alpha, beta]:
+            self.assertEqual(len(stack.transactions), 0)
+        self.assertEqual(len(beta.rxMsgs), 1)
+        receivedMsg, source = beta.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+        self.assertTrue(alpha.stats.get('redo_segment', 0) +
+                        alpha.stats.get('message_resend_rx', 0) >= 1)
+
+        console.terse("\nProcess Only Due *********\n")
+        # removed transactions leave no work once their timers are due
+        self.store.advanceStamp(10.0)
+        alpha.process()
+        self.assertEqual(len(alpha.transactionTimeline), 0)
+        self.assertIs(alpha.deadline(), None)
+
+        console.terse("\nManage Only Due *********\n")
+        remote = alpha.remotes.values()[0]
+        self.assertTrue(remote.timer.expired)  # stale entry due
+        remote.timer.restart(duration=100.0)
+        remote.reapTimer.restart(duration=200.0)
+        alpha.manage()  # pops stale early entries only
+        self.assertEqual(len(alpha.transactions), 0)
+        self.assertEqual(alpha.deadline(manage=True), remote.timer.stop)
+        self.store.advanceStamp(100.0)
+        alpha.manage()  # keep alive due
+        self.assertEqual(len(alpha.transactions), 1)
+        self.serviceStacks([alpha, beta], duration=2.0)
+        self.assertEqual(len(alpha.transactions), 0)
+        self.assertIs(remote.alived, True)
+
+        stacking.RoadStack.Scheduled = False
+        self.assertEqual(stacking.RoadStack.Scheduled, False)
+
+        for stack in [alpha, beta]:
+            stack.server.close()
+            stack.clearAllKeeps()
+
+    def testMessageWindowed(self):
+        '''
+        Test windowed messages with selective acks, drops and peers without
+        '''
+        console.terse("{0}\n".format(self.testMessageWindowed.__doc__))
+
+        stacking.RoadStack.Window = 8
+        self.assertEqual(stacking.RoadStack.Window, 8)
+
+        alphaData = self.createRoadData(name='alpha',
+                                        base=self.base,
+                                        auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(alphaData['dirpath'])
+        alpha = self.createRoadStack(data=alphaData,
+                                     main=True,
+                                     auto=alphaData['auto'],
+                                     ha=None)
+
+        betaData = self.createRoadData(name='beta',
+                                       base=self.base,
+                                       auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(betaData['dirpath'])
+        beta = self.createRoadStack(data=betaData,
+                                    main=True,
+                                    auto=betaData['auto'],
+                                    ha=("", raeting.RAET_TEST_PORT))
+
+        console.terse("\nJoin *********\n")
+        self.join(alpha, beta)
+        console.terse("\nAllow *********\n")
+        self.allow(alpha, beta)
+        for stack in [alpha, beta]:
+            remote = stack.remotes.values()[0]
+            self.assertIs(remote.allowed, True)
+            self.assertEqual(len(stack.transactions), 0)
+
+        bloat = "".join([str(i).rjust(100, " ") for i in range(300)])
+        sentMsg = odict(who="Green", data=bloat)
+
+        console.terse("\nMessage Window Alpha to Beta *********\n")
+        alpha.transmit(sentMsg)
+        alpha.serviceTxMsgs()
+        messenger = alpha.transactions[0]
+        self.assertEqual(messenger.window, 8)
+        self.assertTrue(messenger.tray.count > 16)
+        self.assertEqual(messenger.tray.current, 8)  # window in flight
+        self.serviceStacks([alpha, beta], duration=10.0)
+        for stack in [alpha, beta]:
+            self.assertEqual(len(stack.transactions), 0)
+        self.assertIs(messenger.sacking, True)
+        self.assertEqual(messenger.tray.current, messenger.tray.count)
+        receivedMsg, source = beta.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+
+        console.terse("\nMessage Window with drops Alpha to Beta *********\n")
+        alpha.clearStats()
+        alpha.transmit(sentMsg)
+        alpha.serviceTxMsgs()
+        messenger = alpha.transactions[0]
+        drops = [0, 0, 1, 0, 0, 1, 0, 0, 0, 0, 0, 1]
+        dropage = [list(drops), list(drops)]
+        self.serviceStacksWithDrops([alpha, beta], dropage=dropage, duration=10.0)
+        for stack in [alpha, beta]:
+            self.assertEqual(len(stack.transactions), 0)
+        self.assertIs(messenger.outcome, raeting.Outcome.complete)
+        receivedMsg, source = beta.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+        # only holes resent so few more than the segment count sent
+        self.assertTrue(alpha.stats['message_segment_tx'] < 2 * messenger.tray.count)
+
+        console.terse("\nMessage Window to peer without selective acks *********\n")
+        sack = transacting.Messengent.sack
+        transacting.Messengent.sack = lambda self, body: body  # as before
+        try:
+            alpha.transmit(sentMsg)
+            alpha.serviceTxMsgs()
+            messenger = alpha.transactions[0]
+            dropage = [list(drops), list(drops)]
+            self.serviceStacksWithDrops([alpha, beta], dropage=dropage, duration=10.0)
+        finally:
+            transacting.Messengent.sack = sack
+        for stack in [alpha, beta]:
+            self.assertEqual(len(stack.transactions), 0)
+        self.assertIs(messenger.sacking, False)
+        receivedMsg, source = beta.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+
+        stacking.RoadStack.Window = 0
+        self.assertEqual(stacking.RoadStack.Window, 0)
+
+        for stack in [alpha, beta]:
+            stack.server.close()
+            stack.clearAllKeeps()
+
+    def testMessageAdaptive(self):
+        '''
+        Test redo timeouts adapted from remote round trip time estimates
+        '''
+        console.terse("{0}\n".format(self.testMessageAdaptive.__doc__))
+
+        stacking.RoadStack.Adaptive = True
+        self.assertEqual(stacking.RoadStack.Adaptive, True)
+
+        alphaData = self.createRoadData(name='alpha',
+                                        base=self.base,
+                                        auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(alphaData['dirpath'])
+        alpha = self.createRoadStack(data=alphaData,
+                                     main=True,
+                                     auto=alphaData['auto'],
+                                     ha=None)
+
+        betaData = self.createRoadData(name='beta',
+                                       base=self.base,
+                                       auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(betaData['dirpath'])
+        beta = self.createRoadStack(data=betaData,
+                                    main=True,
+                                    auto=betaData['auto'],
+                                    ha=("", raeting.RAET_TEST_PORT))
+
+        console.terse("\nEstimates *********\n")
+        remote = estating.RemoteEstate(stack=alpha, fuid=0, sid=0, ha=beta.local.ha)
+        self.assertIs(remote.srtt, None)
+        self.assertIs(remote.redoTimeout(), None)
+        remote.sampleRtt(0.1)
+        self.assertAlmostEqual(remote.srtt, 0.1)
+        self.assertAlmostEqual(remote.rttvar, 0.05)
+        self.assertAlmostEqual(remote.redoTimeout(), 0.3)
+        remote.sampleRtt(0.3)
+        self.assertAlmostEqual(remote.srtt, 0.125)
+        self.assertAlmostEqual(remote.rttvar, 0.0875)
+        self.assertAlmostEqual(remote.redoTimeout(), 0.475)
+        remote.sampleRtt(0.0)
+        remote.srtt = remote.rttvar = 0.0
+        self.assertEqual(remote.redoTimeout(), remote.RedoTimeoutMin)
+        remote.srtt = 100.0
+        self.assertEqual(remote.redoTimeout(), remote.RedoTimeoutMax)
+
+        console.terse("\nJoin Allow *********\n")
+        self.join(alpha, beta)
+        self.allow(alpha, beta)
+        remote = alpha.remotes.values()[0]
+        self.assertIs(remote.allowed, True)
+        self.assertIsNot(remote.srtt, None)  # sampled by allower
+        self.assertIs(beta.remotes.values()[0].srtt, None)  # never initiated
+
+        console.terse("\nMessage with drops Alpha to Beta *********\n")
+        bloat = "".join([str(i).rjust(100, " ") for i in range(300)])
+        sentMsg = odict(who="Green", data=bloat)
+        alpha.transmit(sentMsg)
+        alpha.serviceTxMsgs()
+        messenger = alpha.transactions[0]
+        self.assertEqual(messenger.redoTimer.duration, remote.redoTimeout())
+        self.assertTrue(messenger.tray.count > 1)
+        self.assertEqual(len(messenger.rtStamps), 1)  # only wait flagged last
+        drops = [0, 1, 1, 0, 0, 0, 0, 0, 1]
+        dropage = [list(drops), list(drops)]
+        self.serviceStacksWithDrops([alpha, beta], dropage=dropage, duration=10.0)
+        for stack in [alpha, beta]:
+            self.assertEqual(len(stack.transactions), 0)
+        receivedMsg, source = beta.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+
+        console.terse("\nKarn's rule *********\n")
+        srtt = remote.srtt
+        alpha.alive()
+        aliver = alpha.transactions[0]
+        alpha.serviceAllTx()  # sent but not yet received
+        self.assertEqual(len(aliver.rtStamps), 1)
+        self.store.advanceStamp(aliver.redoTimer.duration)
+        alpha.process()  # redo so reply is ambiguous
+        self.assertEqual(alpha.stats.get('redo_alive'), 1)
+        self.assertEqual(len(aliver.rtStamps), 0)  # dropped by resend
+        self.serviceStacks([alpha, beta])
+        self.assertEqual(len(alpha.transactions), 0)
+        self.assertEqual(remote.srtt, srtt)  # not sampled
+
+        remote.srtt = 1.0
+        alpha.alive()
+        self.serviceStacks([alpha, beta])
+        self.assertTrue(remote.srtt < 1.0)  # sampled
+
+        stacking.RoadStack.Adaptive = False
+        self.assertEqual(stacking.RoadStack.Adaptive, False)
+
+        for stack in [alpha, beta]:
+            stack.server.close()
+            stack.clearAllKeeps()
+
+    def testMessageCongestion(self):
+        '''
+        Test messages with per remote congestion window and pacing
+        '''
+        console.terse("{0}\n".format(self.testMessageCongestion.__doc__))
+
+        stacking.RoadStack.Congestion = True
+        self.assertEqual(stacking.RoadStack.Congestion, True)
+
+        alphaData = self.createRoadData(name='alpha',
+                                        base=self.base,
+                                        auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(alphaData['dirpath'])
+        alpha = self.createRoadStack(data=alphaData,
+                                     main=True,
+                                     auto=alphaData['auto'],
+                                     ha=None)
+
+        betaData = self.createRoadData(name='beta',
+                                       base=self.base,
+                                       auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(betaData['dirpath'])
+        beta = self.createRoadStack(data=betaData,
+                                    main=True,
+                                    auto=betaData['auto'],
+                                    ha=("", raeting.RAET_TEST_PORT))
+
+        console.terse("\nWindow *********\n")
+        remote = estating.RemoteEstate(stack=alpha, fuid=0, sid=0, ha=beta.local.ha)
+        self.assertEqual(remote.cwnd, remote.CwndInit)
+        self.assertEqual(remote.pace(100), 100)  # unpaced until sampled
+        remote.relieve(4)  # slow start
+        self.assertEqual(remote.cwnd, 12.0)
+        remote.congest()
+        self.assertEqual(remote.cwnd, 6.0)
+        self.assertEqual(remote.ssthresh, 6.0)
+        remote.relieve(3)  # congestion avoidance
+        self.assertEqual(remote.cwnd, 6.5)
+        remote.congest(timeout=True)
+        self.assertEqual(remote.cwnd, remote.CwndMin)
+        self.assertEqual(remote.ssthresh, 3.25)
+
+        console.terse("\nJoin Allow *********\n")
+        self.join(alpha, beta)
+        self.allow(alpha, beta)
+        remote = alpha.remotes.values()[0]
+        self.assertIs(remote.allowed, True)
+        self.assertTrue(remote.srtt > 0.0)
+        self.assertEqual(remote.cwnd, remote.CwndInit)
+
+        console.terse("\nMessage Alpha to Beta *********\n")
+        bloat = "".join([str(i).rjust(100, " ") for i in range(300)])
+        sentMsg = odict(who="Green", data=bloat)
+        alpha.transmit(sentMsg)
+        alpha.serviceTxMsgs()
+        messenger = alpha.transactions[0]
+        self.assertTrue(messenger.tray.count > remote.CwndInit)
+        self.assertEqual(messenger.burstStop, remote.CwndInit)  # window limited
+        self.assertEqual(messenger.tray.current, remote.CwndInit // 2)  # paced
+        self.assertFalse(messenger.paceTimer.expired)
+        self.serviceStacks([alpha, beta], duration=10.0)
+        for stack in [alpha, beta]:
+            self.assertEqual(len(stack.transactions), 0)
+        receivedMsg, source = beta.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+        self.assertTrue(alpha.stats.get('message_paced') >= 1)
+        self.assertTrue(remote.cwnd > remote.CwndInit)  # grew with acks
+
+        console.terse("\nMessage with drops Alpha to Beta *********\n")
+        alpha.transmit(sentMsg)
+        drops = [0, 1, 1, 0, 0, 0, 0, 0, 1]
+        dropage = [list(drops), list(drops)]
+        self.serviceStacksWithDrops([alpha, beta], dropage=dropage, duration=10.0)
+        for stack in [alpha, beta]:
+            self.assertEqual(len(stack.transactions), 0)
+        receivedMsg, source = beta.rxMsgs.popleft()
+        self.assertDictEqual(sentMsg, receivedMsg)
+        self.assertTrue(remote.ssthresh < remote.CwndMax)  # reduced on loss
+
+        stacking.RoadStack.Congestion = False
+        self.assertEqual(stacking.RoadStack.Congestion, False)
+
+        for stack in [alpha, beta]:
+            stack.server.close()
+            stack.clearAllKeeps()
+
+    def testMessageRttWindow(self):
+        '''
+        Test round trip estimates over fixed latency link do not grow with window
+        '''
+        console.terse("{0}\n".format(self.testMessageRttWindow.__doc__))
+
+        stacking.RoadStack.Congestion = True
+        self.assertEqual(stacking.RoadStack.Congestion, True)
+
+        alphaData = self.createRoadData(name='alpha',
+                                        base=self.base,
+                                        auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(alphaData['dirpath'])
+        alpha = self.createRoadStack(data=alphaData,
+                                     main=True,
+                                     auto=alphaData['auto'],
+                                     ha=None)
+
+        betaData = self.createRoadData(name='beta',
+                                       base=self.base,
+                                       auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(betaData['dirpath'])
+        beta = self.createRoadStack(data=betaData,
+                                    main=True,
+                                    auto=betaData['auto'],
+                                    ha=("", raeting.RAET_TEST_PORT))
+
+        console.terse("\nJoin Allow *********\n")
+        self.join(alpha, beta)
+        self.allow(alpha, beta)
+        remote = alpha.remotes.values()[0]
+        self.assertIs(remote.allowed, True)
+
+        latency = 0.05
+        rtt = 2 * latency
+        bloat = "".join([str(i).rjust(100, " ") for i in range(1000)])
+        sentMsg = odict(who="Green", data=bloat)
+        for window in [0, 8, 64]:
+            console.terse("\nMessage Window {0} Alpha to Beta *********\n".format(window))
+            stacking.RoadStack.Window = window
+            remote.srtt = remote.rttvar = None
+            remote.cwnd = float(remote.CwndMax)  # so window alone limits flight
+            alpha.transmit(sentMsg)
+            self.serviceStacksWithLatency([alpha, beta], latency=latency, duration=20.0)
+            for stack in [alpha, beta]:
+                self.assertEqual(len(stack.transactions), 0)
+            receivedMsg, source = beta.rxMsgs.popleft()
+            self.assertDictEqual(sentMsg, receivedMsg)
+            self.assertTrue(alpha.stats.get('message_segment_tx') > 64)
+            self.assertTrue(rtt <= remote.srtt < 1.5 * rtt)
+
+        stacking.RoadStack.Window = 0
+        self.assertEqual(stacking.RoadStack.Window, 0)
+        stacking.RoadStack.Congestion = False
+        self.assertEqual(stacking.RoadStack.Congestion, False)
+
+        for stack in [alpha, beta]:
+            stack.server.close()
+            stack.clearAllKeeps()
+
+    def testMessageCoalesce(self):
+        '''
+        Test small messages coalesced into one transaction and split on receive
+        '''
+        console.terse("{0}\n".format(self.testMessageCoalesce.__doc__))
+
+        stacking.RoadStack.Coalesce = 512
+        self.assertEqual(stacking.RoadStack.Coalesce, 512)
+
+        alphaData = self.createRoadData(name='alpha',
+                                        base=self.base,
+                                        auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(alphaData['dirpath'])
+        alpha = self.createRoadStack(data=alphaData,
+                                     main=True,
+                                     auto=alphaData['auto'],
+                                     ha=None)
+
+        betaData = self.createRoadData(name='beta',
+                                       base=self.base,
+                                       auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(betaData['dirpath'])
+        beta = self.createRoadStack(data=betaData,
+                                    main=True,
+                                    auto=betaData['auto'],
+                                    ha=("", raeting.RAET_TEST_PORT))
+
+        self.join(alpha, beta)
+        self.allow(alpha, beta)
+        for stack in [alpha, beta]:
+            remote = stack.remotes.values()[0]
+            self.assertIs(remote.allowed, True)
+            self.assertIs(remote.coalesce, True)  # negotiated by allow
+
+        console.terse("\nCoalesce Alpha to Beta *********\n")
+        self.assertEqual(alpha.packBody(odict(a=1)), b'{"a":1}')
+        packed = packeting.TxBody.join(raeting.BodyKind.json.value,
+                                       'msgs',
+                                       [alpha.packBody(odict(a=1)),
+                                        alpha.packBody(odict(b=2))])
+        self.assertEqual(packed, b'{"msgs":[{"a":1},{"b":2}]}')
+        outcomes = []
+        sentMsgs = [odict(who="Green", count=i, data="x" * 40) for i in range(20)]
+        bigMsg = odict(who="Blue", data="y" * 1000)
+        for msg in sentMsgs[:10]:
+            alpha.transmit(msg, done=outcomes.append)
+        alpha.transmit(bigMsg)
+        for msg in sentMsgs[10:]:
+            alpha.transmit(msg, done=outcomes.append)
+        alpha.serviceTxMsgs()
+        self.assertEqual(len(alpha.txMsgs), 0)
+        # 20 small about 75 bytes each fit 6 per 512 so 4 plus the big one
+        self.assertEqual(len(alpha.transactions), 5)
+        self.assertEqual([transaction.kind for transaction in alpha.transactions],
+                         [raeting.TrnsKind.coalesce.value] * 2 +
+                         [raeting.TrnsKind.message.value] +
+                         [raeting.TrnsKind.coalesce.value] * 2)
+        self.assertEqual(alpha.stats['message_coalesced'], 20)
+        self.serviceStacks([alpha, beta], duration=5.0)
+        for stack in [alpha, beta]:
+            self.assertEqual(len(stack.transactions), 0)
+
+        self.assertEqual(len(beta.rxMsgs), 21)
+        receiveds = []
+        while beta.rxMsgs:
+            msg, source = beta.rxMsgs.popleft()
+            self.assertEqual(source, alpha.local.name)
+            receiveds.append(msg)
+        self.assertIn(bigMsg, receiveds)
+        receiveds.remove(bigMsg)
+        self.assertEqual(receiveds, sentMsgs)  # order kept within the remote
+        self.assertEqual(outcomes, [raeting.Outcome.complete] * 20)
+
+        console.terse("\nNo Coalesce Alpha to Beta *********\n")
+        stacking.RoadStack.Coalesce = 0
+        self.assertEqual(stacking.RoadStack.Coalesce, 0)
+        for msg in sentMsgs[:3]:
+            alpha.transmit(msg)
+        alpha.serviceTxMsgs()
+        self.assertEqual(len(alpha.transactions), 3)
+        self.serviceStacks([alpha, beta], duration=5.0)
+        self.assertEqual([beta.rxMsgs.popleft()[0] for i in range(3)], sentMsgs[:3])
+
+        console.terse("\nNot Negotiated Alpha to Beta *********\n")
+        stacking.RoadStack.Coalesce = 512
+        self.assertEqual(stacking.RoadStack.Coalesce, 512)
+        beta.Coalesce = 0  # beta does not offer so not negotiated
+        self.allow(alpha, beta)
+        for stack in [alpha, beta]:
+            self.assertIs(stack.remotes.values()[0].coalesce, False)
+        for msg in sentMsgs[:3]:
+            alpha.transmit(msg)
+        alpha.serviceTxMsgs()
+        self.assertEqual(len(alpha.transactions), 3)
+        self.assertEqual(alpha.stats['message_coalesced'], 20)
+        self.serviceStacks([alpha, beta], duration=5.0)
+        self.assertEqual([beta.rxMsgs.popleft()[0] for i in range(3)], sentMsgs[:3])
+
+        stacking.RoadStack.Coalesce = 0
+        self.assertEqual(stacking.RoadStack.Coalesce, 0)
+
+        for stack in [alpha, beta]:
+            stack.server.close()
+            stack.clearAllKeeps()
+
+    def testMessageAggregate(self):
+        '''
+        Test replies to concurrent transactions aggregated into acks packets
+        '''
+        console.terse("{0}\n".format(self.testMessageAggregate.__doc__))
+
+        stacking.RoadStack.Aggregate = True
+        self.assertEqual(stacking.RoadStack.Aggregate, True)
+
+        alphaData = self.createRoadData(name='alpha',
+                                        base=self.base,
+                                        auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(alphaData['dirpath'])
+        alpha = self.createRoadStack(data=alphaData,
+                                     main=True,
+                                     auto=alphaData['auto'],
+                                     ha=None)
+
+        betaData = self.createRoadData(name='beta',
+                                       base=self.base,
+                                       auto=raeting.AutoMode.once.value)
+        keeping.clearAllKeep(betaData['dirpath'])
+        beta = self.createRoadStack(data=betaData,
+                                    main=True,
+                                    auto=betaData['auto'],
+                                    ha=("", raeting.RAET_TEST_PORT))
+
+        self.join(alpha, beta)
+        self.allow(alpha, beta)
+        for stack in [alpha, beta]:
+            remote = stack.remotes.values()[0]
+            self.assertIs(remote.allowed, True)
+            self.assertIs(remote.aggregate, True)  # negotiated by allow
+
+        console.terse("\nAggregate Alpha to Beta *********\n")
+        outcomes = []
+        sentMsgs = [odict(who="Green", count=i, data="x" * 40) for i in range(10)]
+        sentMsgs.append(odict(who="Blue", data="y" * 4000))  # segmented
+        for msg in sentMsgs:
+            alpha.transmit(msg, done=outcomes.append)
+        alpha.serviceTxMsgs()
+        alpha.alive()
+        self.assertEqual(len(alpha.transactions), 12)
+        self.serviceStacks([alpha, beta], duration=5.0)
+        for stack in [alpha, beta]:
+            self.assertEqual(len(stack.transactions), 0)
+            self.assertEqual(len(stack.replies), 0)
+
+        self.assertEqual([msg for msg, source in beta.rxMsgs], sentMsgs)
+        beta.rxMsgs.clear()
+        self.assertEqual(outcomes, [raeting.Outcome.complete] * 11)
+        self.assertEqual(alpha.stats['message_initiate_complete'], 11)
+        self.assertEqual(alpha.stats['alive_complete'], 1)
+        self.assertGreaterEqual(beta.stats['acks_tx'], 1)
+        self.assertEqual(alpha.stats['acks_rx'], beta.stats['acks_tx'])
+        self.assertGreater(beta.stats['acks_aggregated'], beta.stats['acks_tx'])
+        self.assertNotIn('stale_correspondent_attempt', alpha.stats)
+
+        console.terse("\nOversized Acks Alpha to Beta *********\n")
+        remote = beta.remotes.values()[0]
+
+        class Correspondent(object):
+            def __init__(self, ti):
+                self.remote = remote
+                self.active = True
+                self.txData = odict(hk=beta.Hk, bk=beta.Bk, fk=beta.footKind(remote),
+                                    ck=beta.Ck, se=remote.nuid, de=remote.fuid,
+                                    tk=raeting.TrnsKind.alive.value, cf=True,
+                                    bf=False, si=remote.sid, ti=ti)
+
+            def remove(self):
+                self.active = False
+
+        correspondents = []
+        for i in range(40):  # too many for one packet so split
+            correspondents.append(Correspondent(i + 1000))
+            beta.queueReply(correspondents[-1], raeting.PcktKind.ack.value,
+                            odict(sk="ab" * 8))
+        # too big for any packet so never sent and its transaction removed
+        beta.queueReply(correspondents[20], raeting.PcktKind.ack.value,
+                        odict(sk="ab" * raeting.UDP_MAX_PACKET_SIZE))
+        acks = beta.stats['acks_tx']
+        errors = beta.stats.get('packing_error', 0)
+        beta.serviceReplies()
+        self.assertGreater(beta.stats['acks_tx'] - acks, 1)
+        self.assertEqual(len(beta.replies), 0)
+        self.assertEqual(beta.stats['packing_error'], errors + 1)
+        self.assertEqual([each for each in correspondents if not each.active],
+                         [correspondents[20]])
+
+        console.terse("\nNot Negotiated Alpha to Beta *********\n")
+        alpha.Aggregate = False  # alpha does not offer so beta must not aggregate
+        self.allow(alpha, beta)
+        self.assertGreater(alpha.stats.get('unallowed_acks', 0), 0)  # oversized ones
+        for stack in [alpha, beta]:
+            self.assertIs(stack.remotes.values()[0].aggregate, False)
+        acks = beta.stats['acks_tx']
+        for msg in sentMsgs[:3]:
+            alpha.transmit(msg)
+        self.serviceStacks([alpha, beta], duration=5.0)
+        self.assertEqual([beta.rxMsgs.popleft()[0] for i in range(3)], sentMsgs[:3])
+        self.assertEqual(beta.stats['acks_tx'], acks)
+
+        stacking.RoadStack.Aggregate = False
+        self.assertEqual(stacking.RoadStack.Aggregate, False)
+
+        for stack in [alpha, beta]:
+            stack.server.close()
+            stack.clearAllKeeps()
+
 def runOne(test):
     '''
     Unittest Runner
@@ -1325,6 +2658,21 @@ def runSome():
                 'testMessageWithDropsLimits',
                 'testMessageWithBurstElevenDropsLimits',
                 'testMessageWithBurstSevenDropsLimits',
+                'testMessageBinaryHead',
+                'testMessageStreamingWithBurstDrops',
+                'testMessageSharedKey',
+                'testMessageCountedNonce',
+                'testMessageMacFoot',
+                'testMessageCryptoWorkers',
+                'testMessageBatchVerify',
+                'testMessageIoBatch',
+                'testMessageScheduled',
+                'testMessageWindowed',
+                'testMessageAdaptive',
+                'testMessageCongestion',
+                'testMessageRttWindow',
+                'testMessageCoalesce',
+                'testMessageAggregate',
             ]
 
     tests.extend(map(BasicTestCase, names))
@@ -393,6 +393,276 @@ class BasicTestCase(unittest.TestCase):
                                            'fg': '08'})
         self.assertEquals( tray1.body, stuff)
 
+    def testBasicBinaryJson(self):
+        '''
+        Basic pack parse with header binary and body json
+        '''
+        console.terse("{0}\n".format(self.testBasicBinaryJson.__doc__))
+
+        hk = raeting.HeadKind.binary.value
+        bk = raeting.BodyKind.json.value
+
+        data = odict(hk=hk, bk=bk)
+        body = odict([('msg', 'Hello Raet World'), ('extra', 'Goodby Big Moon')])
+        packet0 = packeting.TxPacket(embody=body, data=data, )
+        self.assertDictEqual(packet0.body.data, body)
+        packet0.pack()
+        self.assertEqual(packet0.packed,
+                b'RAET\x02\x0c\x00@\x00\x10\x00\x01{"msg":"Hello Raet World","extra":"Goodby Big Moon"}')
+
+        packet1 = packeting.RxPacket(packed=packet0.packed)
+        packet1.parse()
+        self.assertDictEqual(packet1.data, {'sh': '',
+                                            'sp': 7530,
+                                            'dh': '127.0.0.1',
+                                            'dp': 7530,
+                                            'ri':'RAET',
+                                            'vn': 0,
+                                            'pk': 0,
+                                            'pl': 64,
+                                            'hk': 2,
+                                            'hl': 12,
+                                            'se': 0,
+                                            'de': 0,
+                                            'cf': False,
+                                            'bf': False,
+                                            'nf': False,
+                                            'df': False,
+                                            'vf': False,
+                                            'si': 0,
+                                            'ti': 0,
+                                            'tk': 0,
+                                            'dt': 0,
+                                            'oi': 0,
+                                            'wf': False,
+                                            'sn': 0,
+                                            'sc': 1,
+                                            'ml': 0,
+                                            'sf': False,
+                                            'af': False,
+                                            'bk': 1,
+                                            'ck': 0,
+                                            'fk': 0,
+                                            'fl': 0,
+                                            'fg': '00'})
+        self.assertDictEqual(packet1.body.data, body)
+
+        # non default field values round trip
+        data = odict(hk=hk, bk=bk, se=2, de=3, si=7, ti=5, tk=1, pk=2,
+                     dt=1400000000.5, cf=True, af=True)
+        packet0 = packeting.TxPacket(embody=body, data=data, )
+        packet0.pack()
+        self.assertEqual(packet0.packed[:4], b'RAET')
+        self.assertEqual(len(packet0.packed), 90)
+        packet1 = packeting.RxPacket(packed=packet0.packed)
+        packet1.parse()
+        for key in ['hk', 'bk', 'se', 'de', 'si', 'ti', 'tk', 'pk', 'dt', 'cf', 'af']:
+            self.assertEqual(packet1.data[key], data[key])
+        self.assertDictEqual(packet1.body.data, body)
+
+    def testSegmentationBinary(self):
+        '''
+        Test pack unpack segmented with header binary
+        '''
+        console.terse("{0}\n".format(self.testSegmentationBinary.__doc__))
+        hk = raeting.HeadKind.binary.value
+        bk = raeting.BodyKind.raw.value
+
+        data = odict(hk=hk, bk=bk)
+
+        stuff = []
+        for i in range(300):
+            stuff.append(str(i).rjust(4, " "))
+        stuff = ns2b("".join(stuff))
+        self.assertEqual(len(stuff), 1200)
+
+        tray0 = packeting.TxTray(data=data, body=stuff)
+        tray0.pack()
+        self.assertEquals(tray0.packed, stuff)
+        self.assertEquals(len(tray0.packets), 2)
+        self.assertEqual(len(tray0.packets[0].packed), 1022)
+        self.assertEqual(len(tray0.packets[1].packed), 216)
+
+        tray1 = packeting.RxTray()
+        for packet in tray0.packets:
+            tray1.parse(packet)
+
+        self.assertDictEqual(tray1.data, {'sh': '',
+                                           'sp': 7530,
+                                           'dh': '127.0.0.1',
+                                           'dp': 7530,
+                                           'ri': 'RAET',
+                                           'vn': 0,
+                                           'pk': 0,
+                                           'pl': 1022,
+                                           'hk': 2,
+                                           'hl': 18,
+                                           'se': 0,
+                                           'de': 0,
+                                           'cf': False,
+                                           'bf': False,
+                                           'nf': False,
+                                           'df': False,
+                                           'vf': False,
+                                           'si': 0,
+                                           'ti': 0,
+                                           'tk': 0,
+                                           'dt': 0,
+                                           'oi': 0,
+                                           'wf': False,
+                                           'sn': 0,
+                                           'sc': 2,
+                                           'ml': 1200,
+                                           'sf': True,
+                                           'af': False,
+                                           'bk': 2,
+                                           'ck': 0,
+                                           'fk': 0,
+                                           'fl': 0,
+                                           'fg': '08'})
+        self.assertEquals( tray1.body, stuff)
+
+    def testSegmentationReassembly(self):
+        '''
+        Test segmented reassembly out of order into preallocated buffer
+        '''
+        console.terse("{0}\n".format(self.testSegmentationReassembly.__doc__))
+        hk = raeting.HeadKind.raet.value
+        bk = raeting.BodyKind.raw.value
+
+        data = odict(hk=hk, bk=bk)
+
+        stuff = []
+        for i in range(1000):
+            stuff.append(str(i).rjust(4, " "))
+        stuff = ns2b("".join(stuff))
+        self.assertEqual(len(stuff), 4000)
+
+        tray0 = packeting.TxTray(data=data, body=stuff)
+        tray0.pack()
+        self.assertEquals(len(tray0.packets), 5)
+
+        tray1 = packeting.RxTray()
+        for packet in reversed(tray0.packets):
+            rxPacket = packeting.RxPacket(packed=packet.packed)
+            rxPacket.parseOuter()
+            self.assertIsNone(tray1.body)
+            tray1.parse(rxPacket)
+            self.assertIsInstance(tray1.buffer, bytearray)
+            self.assertEqual(len(tray1.buffer), 4000)
+        self.assertTrue(tray1.complete)
+        self.assertEquals(tray1.body, stuff)
+
+        # segment that does not fit message length is rejected
+        tray1 = packeting.RxTray()
+        rxPacket = packeting.RxPacket(packed=tray0.packets[0].packed)
+        rxPacket.parseOuter()
+        tray1.parse(rxPacket)
+        rxPacket = packeting.RxPacket(packed=tray0.packets[-1].packed)
+        rxPacket.parseOuter()
+        rxPacket.data['sn'] = 1
+        self.assertRaises(raeting.PacketError, tray1.parse, rxPacket)
+
+    def testSegmentationMissingRuns(self):
+        '''
+        Test segmented reassembly bitmap tracking and missing runs
+        '''
+        console.terse("{0}\n".format(self.testSegmentationMissingRuns.__doc__))
+        hk = raeting.HeadKind.raet.value
+        bk = raeting.BodyKind.raw.value
+
+        data = odict(hk=hk, bk=bk)
+
+        stuff = []
+        for i in range(10000):
+            stuff.append(str(i).rjust(8, " "))
+        stuff = ns2b("".join(stuff))
+
+        tray0 = packeting.TxTray(data=data, body=stuff)
+        tray0.pack()
+        sc = len(tray0.packets)
+        self.assertEqual(sc, 84)
+
+        tray1 = packeting.RxTray()
+        received = [0, 1, 2, 5] + list(range(8, 40)) + [41, 60]
+        for sn in received:
+            tray1.parse(tray0.packets[sn])
+        self.assertEqual(tray1.total, sc)
+        self.assertEqual(len(tray1.received), (sc + 7) // 8)
+        self.assertEqual(tray1.tally, len(received))
+        self.assertEqual(tray1.floor, 3)
+        self.assertEqual(tray1.highest, 60)
+        self.assertTrue(tray1.has(5))
+        self.assertFalse(tray1.has(6))
+        self.assertFalse(tray1.complete)
+
+        self.assertEqual(tray1.missingRuns(), [(3, 5), (6, 8), (40, 41), (42, 60)])
+        self.assertEqual(tray1.missingRuns(begin=7), [(7, 8), (40, 41), (42, 60)])
+        self.assertEqual(tray1.missingRuns(end=41), [(3, 5), (6, 8)])
+        self.assertEqual(tray1.missing(end=41), [3, 4, 6, 7])
+
+        tray1.parse(tray0.packets[5])  # duplicate is ignored
+        self.assertEqual(tray1.tally, len(received))
+
+        for sn in range(sc):
+            tray1.parse(tray0.packets[sn])
+        self.assertTrue(tray1.complete)
+        self.assertEqual(tray1.tally, sc)
+        self.assertEqual(tray1.floor, sc)
+        self.assertEqual(tray1.missingRuns(), [])
+        self.assertEquals(tray1.body, stuff)
+
+    def testSegmentationStreaming(self):
+        '''
+        Test segmented tray in streaming mode packs segments only when needed
+        '''
+        console.terse("{0}\n".format(self.testSegmentationStreaming.__doc__))
+        hk = raeting.HeadKind.raet.value
+        bk = raeting.BodyKind.raw.value
+
+        data = odict(hk=hk, bk=bk)
+
+        stuff = []
+        for i in range(1000):
+            stuff.append(str(i).rjust(4, " "))
+        stuff = ns2b("".join(stuff))
+
+        tray0 = packeting.TxTray(data=data, body=stuff)
+        tray0.pack()
+        self.assertEqual(tray0.count, 5)
+        self.assertEqual(len(tray0.packets), 5)
+
+        tray1 = packeting.TxTray(data=data, body=stuff, streaming=True)
+        tray1.pack()
+        self.assertIs(tray1.streaming, True)
+        self.assertEqual(tray1.count, 5)
+        self.assertEqual(tray1.segsize, tray0.segsize)
+        self.assertEqual(len(tray1.packets), 0)
+        self.assertEqual(tray1.packed, stuff)
+
+        for sn in range(tray1.count):
+            self.assertEqual(tray1.packet(sn).packed, tray0.packets[sn].packed)
+        self.assertEqual(len(tray1.packets), 0)
+
+        packet = tray1.packet(4, wf=True, af=True)
+        self.assertIs(packet.data['wf'], True)
+        self.assertIs(packet.data['af'], True)
+        packet = tray0.packet(4, wf=True, af=True)
+        self.assertEqual(packet.packed, tray1.packet(4, wf=True, af=True).packed)
+
+        tray2 = packeting.RxTray()
+        for sn in reversed(range(tray1.count)):
+            tray2.parse(tray1.packet(sn))
+        self.assertTrue(tray2.complete)
+        self.assertEquals(tray2.body, stuff)
+
+        # unsegmented message is single stored packet in streaming mode
+        tray1 = packeting.TxTray(data=data, body=stuff[:100], streaming=True)
+        tray1.pack()
+        self.assertEqual(tray1.count, 1)
+        self.assertEqual(len(tray1.packets), 1)
+        self.assertIs(tray1.packet(0), tray1.packets[0])
+
 class StackTestCase(unittest.TestCase):
     '''
     Pack and Parse with stacks
@@ -499,6 +769,26 @@ class StackTestCase(unittest.TestCase):
         self.assertEqual(len(tray0.packets[0].packed), 1009)
         self.assertEqual(len(tray0.packets[1].packed), 458)
 
+        # foot signed in place over blank of detached signature
+        verfer = nacling.Verifier(self.main.local.signer.verhex)
+        for packet in tray0.packets:
+            self.assertIsInstance(packet.packed, bytearray)
+            fl = raeting.FootSize.nacl.value
+            self.assertEqual(packet.packed[-fl:], packet.foot.packed)
+            front = memoryview(packet.packed)[:-fl].tobytes()
+            self.assertTrue(verfer.verify(packet.foot.packed,
+                                          front + bytes(bytearray(fl))))
+
+        # received packet verified over front with zeroed blank foot as peers sign
+        for packet in tray0.packets:
+            rxPacket = packeting.RxPacket(stack=self.other, packed=bytes(packet.packed))
+            verifieds = []
+            verify = rxPacket.verify
+            rxPacket.verify = lambda sig, msg: verifieds.append(msg) or verify(sig, msg)
+            rxPacket.parseOuter()
+            fl = raeting.FootSize.nacl.value
+            self.assertEqual(bytes(verifieds[0]),
+                             bytes(packet.packed[:-fl]) + bytes(bytearray(fl)))
 
         tray1 = packeting.RxTray(stack=self.other)
         self.assertFalse(tray1.complete)
@@ -685,7 +975,12 @@ def runSome():
              'testBasicRaetJson',
              'testBasicRaetMsgpack',
              'testBasicRaetRaw',
-             'testSegmentation']
+             'testSegmentation',
+             'testBasicBinaryJson',
+             'testSegmentationBinary',
+             'testSegmentationReassembly',
+             'testSegmentationMissingRuns',
+             'testSegmentationStreaming']
     tests.extend(map(BasicTestCase, names))
 
     names = ['testSign',
@@ -16,6 +16,9 @@ import sys
 import time
 import tempfile
 import shutil
+import socket
+import errno
+import threading
 
 from ioflo.base.odicting import odict
 from ioflo.base.aiding import Timer, StoreTimer
@@ -26,7 +29,7 @@ console = getConsole()
 
 # Import raet libs
 from raet.abiding import *  # import globals
-from raet import raeting, nacling
+from raet import raeting, nacling, resolving
 from raet.road import keeping, estating, stacking, transacting
 
 if sys.platform == 'win32':
@@ -750,6 +753,304 @@ class BasicTestCase(unittest.TestCase):
         remote = self.other.remotes.values()[0]
         self.assertTrue(remote.alived)
 
+    def testCorrespondences(self):
+        '''
+        Test table driven dispatch of correspondent packets
+        '''
+        console.terse("{0}\n".format(self.testCorrespondences.__doc__))
+
+        TrnsKind = raeting.TrnsKind
+        PcktKind = raeting.PcktKind
+        self.assertEqual(len(self.main.correspondences), 5)
+        handler = self.main.correspondences[(TrnsKind.join.value,
+                                             PcktKind.request.value,
+                                             False)]
+        self.assertEqual(handler, self.main.replyJoin)
+        handler = self.main.correspondences[(TrnsKind.message.value,
+                                             PcktKind.message.value,
+                                             False)]
+        self.assertEqual(handler, self.main.replyMessageOrStale)
+        handler = self.main.correspondences[(TrnsKind.coalesce.value,
+                                             PcktKind.message.value,
+                                             False)]
+        self.assertEqual(handler, self.main.replyMessageOrStale)
+        self.assertIn(PcktKind.renew.value, self.main.StaleNacks)
+        self.assertNotIn(PcktKind.renew.value, self.main.StalentNacks)
+        self.assertNotIn(PcktKind.ack.value, self.main.StaleNacks)
+
+        class Packet(object):
+            pass
+
+        # handlers are dispatched on (tk, pk, cf) otherwise packet is stale
+        calls = []
+        self.main.correspondences[(TrnsKind.alive.value,
+                                   PcktKind.request.value,
+                                   False)] = lambda packet, remote: calls.append(packet)
+        packet = Packet()
+        packet.data = odict(tk=TrnsKind.alive.value, pk=PcktKind.request.value,
+                            cf=False)
+        self.main.correspond(packet, None)
+        self.assertEqual(calls, [packet])
+        packet.data['pk'] = PcktKind.ack.value
+        self.main.correspond(packet, None)
+        self.assertEqual(calls, [packet])
+        self.assertEqual(self.main.stats.get('stale_packet'), 1)
+
+        # stale nacks are ignored without a remote lookup
+        packet.data['pk'] = PcktKind.nack.value
+        self.main.stale(packet)
+        self.assertEqual(self.main.stats.get('invalid_remote_eid'), None)
+
+    def testLazyKeys(self):
+        '''
+        Test short term keys made on first use and taken from key pool
+        '''
+        console.terse("{0}\n".format(self.testLazyKeys.__doc__))
+
+        self.assertIs(self.main.keypool, None)
+        self.main.keypool = nacling.Keypool(size=2)
+        self.main.keypool.filler.join(5.0)
+        self.assertEqual(len(self.main.keypool), 2)
+        pooled = list(self.main.keypool.privateers)
+
+        self.join()
+        mainRemote = self.main.remotes.values()[0]
+        otherRemote = self.other.remotes.values()[0]
+        self.assertTrue(mainRemote.joined)
+        self.assertIs(mainRemote._privee, None)  # joins need no short term keys
+        self.assertIs(otherRemote._privee, None)
+
+        self.allow()
+        self.assertTrue(mainRemote.allowed)
+        self.assertTrue(otherRemote.allowed)
+        self.assertIs(mainRemote.privee, pooled[0])
+        self.assertIsNot(otherRemote._privee, None)
+        self.assertEqual(len(self.main.keypool), 1)
+
+        mainRemote.rekey()
+        self.assertIs(mainRemote._privee, None)
+        self.assertIs(mainRemote.privee, pooled[1])
+        self.main.keypool.filler.join(5.0)
+        self.assertEqual(len(self.main.keypool), 2)  # refilled once below low
+
+    def testServiceUntil(self):
+        '''
+        Test event driven servicing with deadline aware blocking waits
+        '''
+        console.terse("{0}\n".format(self.testServiceUntil.__doc__))
+
+        self.join()
+        self.allow()
+        self.assertEqual(len(self.main.transactions), 0)
+        self.assertEqual(len(self.other.transactions), 0)
+        otherRemote = self.main.remotes.values()[0]
+        mainRemote = self.other.remotes.values()[0]
+
+        # nothing pending so only remote timers when managed
+        self.assertIs(self.main.deadline(), None)
+        self.assertEqual(self.main.deadline(manage=True),
+                         min(otherRemote.timer.stop, otherRemote.reapTimer.stop))
+
+        # blocks until stamp when nothing to do
+        start = time.time()
+        stamp = self.store.stamp + 0.2
+        self.main.serviceUntil(stamp=stamp)
+        self.assertTrue(self.store.stamp >= stamp)
+        self.assertTrue(time.time() - start >= 0.15)
+
+        # pending transaction redo timer is a deadline, messenger has no timeout
+        self.other.transmit(odict(content="Hello main"))
+        self.other.serviceAllTx()
+        self.assertEqual(len(self.other.transactions), 1)
+        transaction = self.other.transactions[0]
+        self.assertEqual(transaction.timeout, 0.0)
+        self.assertEqual(self.other.deadline(), transaction.redoTimer.stop)
+
+        # readable server wakes the wait before the timeout
+        start = time.time()
+        self.assertTrue(self.main.wait(timeout=2.0))
+        self.assertTrue(time.time() - start < 1.0)
+
+        for i in range(10):
+            self.main.serviceUntil(stamp=self.store.stamp + 0.05)
+            self.other.serviceUntil(stamp=self.store.stamp + 0.05)
+            if not (self.main.transactions or self.other.transactions):
+                break
+        self.assertEqual(len(self.main.rxMsgs), 1)
+        msg, name = self.main.rxMsgs.popleft()
+        self.assertEqual(msg, odict(content="Hello main"))
+        self.assertEqual(len(self.main.transactions), 0)
+        self.assertEqual(len(self.other.transactions), 0)
+
+        # managed run keeps remotes alive in real time
+        self.main.run(duration=0.2)
+        self.assertTrue(otherRemote.alived)
+        self.assertTrue(self.main.selector is not None)
+
+        self.main.close()
+        self.assertTrue(self.main.selector is None)
+        self.assertTrue(self.main.server.ss is None)
+
+    def testTxParking(self):
+        '''
+        Test blocked destination is parked without holding up other destinations
+        '''
+        console.terse("{0}\n".format(self.testTxParking.__doc__))
+
+        blockedHa = ('127.0.0.1', raeting.RAET_TEST_PORT + 8)
+        otherHa = ('127.0.0.1', self.other.local.ha[1])
+        server = self.main.server
+        send = server.send
+        attempts = []
+        blocking = [True]
+
+        def blockingSend(data, da):
+            if da == blockedHa:
+                attempts.append(data)
+                if blocking[0]:
+                    raise socket.error(errno.EHOSTUNREACH, 'No route to host')
+            return send(data, da)
+
+        server.send = blockingSend
+
+        for i in range(3):
+            self.main.txes.append((b'blocked' + str(i).encode(), blockedHa))
+            self.main.txes.append((b'other' + str(i).encode(), otherHa))
+
+        self.main.serviceTxes()
+        self.assertEqual(len(self.main.txes), 0)
+        self.assertEqual(len(attempts), 1)  # blocked once then parked
+        self.assertIn(blockedHa, self.main.txParks)
+        self.assertEqual(len(self.main.txQueues[blockedHa]), 3)
+        self.assertNotIn(otherHa, self.main.txQueues)
+        self.assertEqual(len(self.main.txReadies), 0)
+        self.assertEqual(self.main.txBackoffs[blockedHa], self.main.TxBackoffMin)
+        self.assertEqual(self.main.deadline(), self.main.txParks[blockedHa].stop)
+
+        time.sleep(0.1)
+        self.other.serviceReceives()
+        self.assertEqual([rx for rx, ra in self.other.rxes],
+                         [b'other0', b'other1', b'other2'])
+        self.other.rxes.clear()
+
+        # parked so packets not touched again until park expires
+        self.main.txes.append((b'other3', otherHa))
+        self.main.serviceTxes()
+        self.assertEqual(len(attempts), 1)
+        self.assertNotIn(otherHa, self.main.txQueues)
+
+        self.store.advanceStamp(self.main.TxBackoffMin)
+        self.main.serviceTxes()
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(self.main.txBackoffs[blockedHa], self.main.TxBackoffMin * 2)
+
+        blocking[0] = False
+        self.store.advanceStamp(self.main.TxBackoffMin * 2)
+        self.main.serviceTxes()
+        self.assertEqual(attempts[2:], [b'blocked0', b'blocked1', b'blocked2'])
+        self.assertEqual(len(self.main.txQueues), 0)
+        self.assertEqual(len(self.main.txParks), 0)
+        self.assertEqual(len(self.main.txBackoffs), 0)
+        self.assertIs(self.main.deadline(), None)
+
+        server.send = send
+
+    def testTxPruning(self):
+        '''
+        Test blocked destination state is dropped when abandoned or its remote removed
+        '''
+        console.terse("{0}\n".format(self.testTxPruning.__doc__))
+
+        blockedHa = ('127.0.0.1', raeting.RAET_TEST_PORT + 8)
+        server = self.main.server
+        send = server.send
+        attempts = []
+
+        def blockingSend(data, da):
+            if da == blockedHa:
+                attempts.append(data)
+                raise socket.error(errno.EHOSTUNREACH, 'No route to host')
+            return send(data, da)
+
+        server.send = blockingSend
+
+        # abandoned once still blocked after max park
+        for i in range(2):
+            self.main.txes.append((b'blocked' + str(i).encode(), blockedHa))
+        self.main.serviceTxes()
+        while blockedHa in self.main.txParks:
+            self.store.advanceStamp(self.main.txBackoffs[blockedHa])
+            self.main.serviceTxes()
+        self.assertEqual(self.main.txBackoffs, odict())
+        self.assertEqual(self.main.txQueues, odict())
+        self.assertEqual(len(self.main.txReadies), 0)
+        self.assertEqual(self.main.stats.get('tx_abandoned'), 2)
+        self.assertEqual(len(attempts), 7)  # parks 0.05 doubling to 1.0 then abandoned
+        self.assertIs(self.main.deadline(), None)
+
+        # dropped when remote removed while parked
+        remote = estating.RemoteEstate(stack=self.main, fuid=0, sid=0, ha=blockedHa)
+        self.main.addRemote(remote)
+        self.main.txes.append((b'blocked', blockedHa))
+        self.main.serviceTxes()
+        self.assertIn(blockedHa, self.main.txParks)
+        self.assertIn(blockedHa, self.main.txQueues)
+        self.main.removeRemote(remote)
+        self.assertNotIn(blockedHa, self.main.txParks)
+        self.assertNotIn(blockedHa, self.main.txBackoffs)
+        self.assertNotIn(blockedHa, self.main.txQueues)
+        self.assertIs(self.main.deadline(), None)
+
+        server.send = send
+
+    def testFqdnNonBlocking(self):
+        '''
+        Test remote fqdn lookup never blocks join or allow on slow DNS
+        '''
+        console.terse("{0}\n".format(self.testFqdnNonBlocking.__doc__))
+
+        released = threading.Event()
+        lookups = []
+
+        class BlockingResolver(resolving.Resolver):
+            def fqdn(self, host):
+                lookups.append(host)
+                released.wait(10.0)
+                self._put(self.fqdns, host, 'blocked.example.com')
+                return 'blocked.example.com'
+
+        # locals were prefetched when made so only remotes look up below
+        self.assertTrue(self.main.local.fqdn)
+        self.assertTrue(self.other.local.fqdn)
+        shared = resolving.resolver
+        resolving.resolver = BlockingResolver()
+        try:
+            start = time.time()
+            self.join()
+            self.allow()
+            self.assertTrue(time.time() - start < 5.0)
+            for stack in [self.main, self.other]:
+                self.assertEqual(len(stack.transactions), 0)
+                remote = stack.remotes.values()[0]
+                self.assertTrue(remote.joined)
+                self.assertTrue(remote.allowed)
+                self.assertEqual(remote.fqdn, '')  # still pending
+            self.assertEqual(set(lookups), set(['127.0.0.1']))
+            self.assertEqual(resolving.resolver.pendings, set(['127.0.0.1']))
+
+            released.set()
+            for i in range(100):
+                if not resolving.resolver.pendings:
+                    break
+                time.sleep(0.05)
+            for stack in [self.main, self.other]:
+                remote = stack.remotes.values()[0]
+                self.assertEqual(remote.fqdn, 'blocked.example.com')
+            self.assertEqual(len(lookups), 1)  # one shared prefetch
+        finally:
+            released.set()
+            resolving.resolver = shared
+
 def runOne(test):
     '''
     Unittest Runner
@@ -773,6 +1074,12 @@ def runSome():
              'testBasicAlive',
              'testStaleNack',
              'testJoinForever',
+             'testCorrespondences',
+             'testLazyKeys',
+             'testServiceUntil',
+             'testTxParking',
+             'testTxPruning',
+             'testFqdnNonBlocking',
             ]
     tests.extend(map(BasicTestCase, names))
 
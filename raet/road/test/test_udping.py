@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+'''
+Tests for batched datagram io
+
+'''
+# pylint: skip-file
+# pylint: disable=C0103
+import sys
+if sys.version_info < (2, 7):
+    import unittest2 as unittest
+else:
+    import unittest
+
+import time
+from collections import deque
+
+from ioflo.base.consoling import getConsole
+console = getConsole()
+
+# Import raet libs
+from raet.abiding import *  # import globals
+from raet import raeting
+from raet.road import udping
+
+def setUpModule():
+    console.reinit(verbosity=console.Wordage.concise)
+
+def tearDownModule():
+    pass
+
+class BasicTestCase(unittest.TestCase):
+    """"""
+
+    def setUp(self):
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.close()
+
+    def createServer(self, port, count=4, mmsg=None):
+        '''
+        Return opened batched server at port
+        '''
+        server = udping.SocketUdpBatch(ha=('127.0.0.1', port),
+                                       bufsize=raeting.UDP_MAX_PACKET_SIZE * 2,
+                                       count=count,
+                                       mmsg=mmsg)
+        self.assertTrue(server.open())
+        self.servers.append(server)
+        return server
+
+    def receiveAll(self, server):
+        '''
+        Return list of all received by server in batches
+        '''
+        rxes = []
+        time.sleep(0.05)
+        while True:
+            batch = server.receiveMany()
+            self.assertTrue(len(batch) <= server.count)
+            if not batch:
+                break
+            rxes.extend(batch)
+        return rxes
+
+    def batchRoundTrip(self, mmsg):
+        '''
+        Send and receive in batches with mmsg
+        '''
+        alpha = self.createServer(raeting.RAET_TEST_PORT, mmsg=mmsg)
+        beta = self.createServer(raeting.RAET_TEST_PORT + 1, mmsg=mmsg)
+        if mmsg is not False:
+            self.assertEqual(alpha.mmsg, udping.RECVMMSG is not None)
+        else:
+            self.assertIs(alpha.mmsg, False)
+        self.assertIs(alpha.batched, True)
+
+        self.assertEqual(beta.receiveMany(), [])
+
+        txes = deque()
+        for i in range(10):
+            txes.append((ns2b("Datagram {0} ".format(i)) * (i + 1), beta.ha))
+        txes.append((bytearray(b"Bytearray datagram"), beta.ha))
+        sents = list(txes)
+        while txes:
+            sent = alpha.sendMany(txes)
+            self.assertTrue(0 < sent <= alpha.count)
+            for i in range(sent):
+                txes.popleft()
+
+        rxes = self.receiveAll(beta)
+        self.assertEqual(len(rxes), len(sents))
+        for (tx, ta), (rx, sa) in zip(sents, rxes):
+            self.assertEqual(rx, bytes(tx))
+            self.assertEqual(sa, alpha.ha)
+
+    def testBatchMmsg(self):
+        '''
+        Test batched send and receive with mmsg syscalls when available
+        '''
+        console.terse("{0}\n".format(self.testBatchMmsg.__doc__))
+        self.batchRoundTrip(mmsg=None)
+
+    def testBatchFallback(self):
+        '''
+        Test batched send and receive fallback loops
+        '''
+        console.terse("{0}\n".format(self.testBatchFallback.__doc__))
+        self.batchRoundTrip(mmsg=False)
+
+    def testBatchNonNumericHost(self):
+        '''
+        Test batched send stops at non numeric destination host
+        '''
+        console.terse("{0}\n".format(self.testBatchNonNumericHost.__doc__))
+        alpha = self.createServer(raeting.RAET_TEST_PORT)
+        beta = self.createServer(raeting.RAET_TEST_PORT + 1)
+        txes = deque([(b"one", beta.ha),
+                      (b"two", ('localhost', beta.ha[1])),
+                      (b"three", beta.ha)])
+        sent = alpha.sendMany(txes)
+        if alpha.mmsg:
+            self.assertEqual(sent, 1)
+            txes.popleft()
+            self.assertEqual(alpha.sendMany(txes), 0)
+            alpha.send(*txes.popleft())  # single send resolves name
+            self.assertEqual(alpha.sendMany(txes), 1)
+        else:
+            self.assertEqual(sent, 3)
+        rxes = self.receiveAll(beta)
+        self.assertEqual([rx for rx, sa in rxes], [b"one", b"two", b"three"])
+
+def runOne(test):
+    '''
+    Unittest Runner
+    '''
+    test = BasicTestCase(test)
+    suite = unittest.TestSuite([test])
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+def runSome():
+    """ Unittest runner """
+    tests =  []
+    names = ['testBatchMmsg',
+             'testBatchFallback',
+             'testBatchNonNumericHost', ]
+    tests.extend(map(BasicTestCase, names))
+
+    suite = unittest.TestSuite(tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+def runAll():
+    """ Unittest runner """
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.TestLoader().loadTestsFromTestCase(BasicTestCase))
+
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+if __name__ == '__main__' and __package__ is None:
+
+    #console.reinit(verbosity=console.Wordage.concise)
+
+    runAll() #run all unittests
+
+    #runSome()#only run some
+
+    #runOne('testBatchMmsg')
@@ -9,6 +9,7 @@ stacking.py raet protocol stacking classes
 import socket
 import binascii
 import struct
+from collections import deque, Mapping
 
 try:
     import simplejson as json
@@ -24,12 +25,13 @@ from ioflo.base.aiding import packByte, unpackByte
 # Import raet libs
 from ..abiding import *  # import globals
 from .. import raeting
-from ..raeting import Acceptance, PcktKind, TrnsKind, CoatKind, FootKind
+from ..raeting import Acceptance, PcktKind, TrnsKind, CoatKind, FootKind, Outcome
 from .. import nacling
+from .. import timing
 from . import packeting
 from . import estating
 
-from ioflo.base.consoling import getConsole
+from ..consoling import getConsole
 console = getConsole()
 
 class Transaction(object):
@@ -52,7 +54,8 @@ class Transaction(object):
         if timeout is None:
             timeout = self.Timeout
         self.timeout = timeout
-        self.timer = aiding.StoreTimer(self.stack.store, duration=self.timeout)
+        self.active = False  # True while added to remote transactions
+        self.timer = self.createTimer(duration=self.timeout)
 
         self.rmt = rmt # remote initiator
         self.bcst = bcst # bf flag
@@ -63,6 +66,7 @@ class Transaction(object):
         self.txData = txData or odict() # data used to prepare last txPacket
         self.txPacket = txPacket  # last tx packet needed for retries
         self.rxPacket = rxPacket  # last rx packet needed for index
+        self.rtStamps = deque()  # stamps of unanswered reply soliciting txes
 
     @property
     def index(self):
@@ -81,6 +85,16 @@ class Transaction(object):
         '''
         pass
 
+    def createTimer(self, duration=0.0):
+        '''
+        Returns timer for this transaction scheduled on the stack timeline
+        when the stack is scheduled
+        '''
+        return timing.DueTimer(self.stack.store,
+                               duration=duration,
+                               timeline=self.stack.transactionTimeline,
+                               owner=self)
+
     def receive(self, packet):
         '''
         Process received packet Subclasses should super call this
@@ -90,7 +104,11 @@ class Transaction(object):
     def transmit(self, packet):
         '''
         Queue tx duple on stack transmit queue
+        Stamps packet for a round trip sample when it solicits a reply.
+        Per Karn's rule a packet sent again is not stamped and drops pending
+        stamps as later replies may be to either send.
         '''
+        again = packet is self.txPacket or packet.data.get('af')
         try:
             self.stack.tx(packet.packed, self.remote.uid)
         except raeting.StackError as ex:
@@ -99,6 +117,47 @@ class Transaction(object):
             self.remove(remote=self.remote, index=packet.index)
             return
         self.txPacket = packet
+        if again:
+            self.rtStamps.clear()
+        elif self.solicits(packet):
+            self.rtStamps.append(self.stack.store.stamp)
+
+    def solicits(self, packet):
+        '''
+        Returns True if packet solicits a reply to sample round trip time
+        '''
+        return False
+
+    def sampleRtt(self):
+        '''
+        Sample round trip time to remote from stamp of oldest unanswered
+        reply soliciting tx to now when reply received. No sample when there is
+        none such as when dropped by Karn's rule.
+        When adaptive the redo timer duration is reset from the estimates
+        '''
+        if not self.rtStamps:
+            return
+        self.remote.sampleRtt(self.stack.store.stamp - self.rtStamps.popleft())
+        if self.stack.Adaptive:
+            self.redoTimer.duration = self.remote.redoTimeout()
+
+    def redoDuration(self, duration=None):
+        '''
+        Returns initial redo timer duration or when duration is given the
+        doubled backoff of duration after the redo timer expired.
+        When stack is adaptive and the remote has round trip estimates the
+        remote redo timeout is used instead of .redoTimeoutMin and
+        .redoTimeoutMax
+        '''
+        timeout = self.remote.redoTimeout() if self.stack.Adaptive else None
+        if timeout is None:
+            if duration is None:
+                return self.redoTimeoutMin
+            return min(max(self.redoTimeoutMin, duration * 2.0),
+                       self.redoTimeoutMax)
+        if duration is None:
+            return timeout
+        return min(max(timeout, duration * 2.0), self.remote.RedoTimeoutMax)
 
     def add(self, remote=None, index=None):
         '''
@@ -145,6 +204,13 @@ class Initiator(Transaction):
         kwa['rmt'] = False  # force rmt to False since local initator
         super(Initiator, self).__init__(**kwa)
 
+    def solicits(self, packet):
+        '''
+        Returns True if packet solicits a reply to sample round trip time
+        Every initiated request does
+        '''
+        return True
+
     def process(self):
         '''
         Process time based handling of transaction like timeout or retries
@@ -174,6 +240,31 @@ class Correspondent(Transaction):
 
         super(Correspondent, self).__init__(**kwa)
 
+    def reply(self, kind, body):
+        '''
+        Send reply packet of kind with body
+        When remote negotiated aggregated acks in allow queue reply on stack
+        instead so it is sent together with the replies of other transactions
+        with the same remote. Removed later if it then fails to pack
+        Returns True if sent or queued otherwise False
+        '''
+        if self.remote.aggregate:
+            self.stack.queueReply(self, kind, body)
+            return True
+        packet = packeting.TxPacket(stack=self.stack,
+                                    kind=kind,
+                                    embody=body,
+                                    data=self.txData)
+        try:
+            packet.pack()
+        except raeting.PacketError as ex:
+            console.terse(str(ex) + '\n')
+            self.stack.incStat("packing_error")
+            self.remove()
+            return False
+        self.transmit(packet)
+        return True
+
 class Staler(Initiator):
     '''
     RAET protocol Staler initiator transaction class
@@ -381,8 +472,7 @@ class Joiner(Initiator):
 
         self.redoTimeoutMax = redoTimeoutMax or self.RedoTimeoutMax
         self.redoTimeoutMin = redoTimeoutMin or self.RedoTimeoutMin
-        self.redoTimer = aiding.StoreTimer(self.stack.store,
-                                           duration=self.redoTimeoutMin)
+        self.redoTimer = self.createTimer(duration=self.redoTimeoutMin)
         self.pendRedoTimeout = pendRedoTimeout or self.PendRedoTimeout
 
         self.sid = 0 #always 0 for join
@@ -456,8 +546,8 @@ class Joiner(Initiator):
             else:
                 self.remove(index=self.index) # in case never sent txPacket
 
-            console.concise("Joiner {0}. Timed out with {1} in {2} at {3}\n".format(
-                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+            console.concise("Joiner {0}. Timed out with {1} in {2} at {3}\n",
+                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
 
             return
 
@@ -475,8 +565,8 @@ class Joiner(Initiator):
             if (self.txPacket and
                     self.txPacket.data['pk'] == PcktKind.request):
                 self.transmit(self.txPacket) #redo
-                console.concise("Joiner {0}. Redo Join with {1} in {2} at {3}\n".format(
-                     self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+                console.concise("Joiner {0}. Redo Join with {1} in {2} at {3}\n",
+                     self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
                 self.stack.incStat('joiner_tx_join_redo')
             else: #check to see if status has changed to accept after other kind
                 if self.remote:
@@ -555,11 +645,11 @@ class Joiner(Initiator):
             self.stack.incStat("packing_error")
             self.remove()
             return
-        console.concise("Joiner {0}. Do Join with {1} in {2} at {3}\n".format(
+        console.concise("Joiner {0}. Do Join with {1} in {2} at {3}\n",
                         self.stack.name,
                         self.remote.name,
                         self.tid,
-                        self.stack.store.stamp))
+                        self.stack.store.stamp)
         self.transmit(packet)
         self.add(index=self.txPacket.index)
 
@@ -794,8 +884,8 @@ class Joiner(Initiator):
             self.remove(index=self.txPacket.index)
             return
 
-        console.concise("Joiner {0}. Do Ack Pend of {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Joiner {0}. Do Ack Pend of {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
 
         self.transmit(packet)
 
@@ -830,8 +920,8 @@ class Joiner(Initiator):
             self.remove(index=self.txPacket.index)
             return
 
-        console.concise("Joiner {0}. Do Ack Accept, Done with {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Joiner {0}. Do Ack Accept, Done with {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat("join_initiate_complete")
 
         self.transmit(packet)
@@ -925,7 +1015,7 @@ class Joinent(Correspondent):
 
         self.redoTimeoutMax = redoTimeoutMax or self.RedoTimeoutMax
         self.redoTimeoutMin = redoTimeoutMin or self.RedoTimeoutMin
-        self.redoTimer = aiding.StoreTimer(self.stack.store, duration=0.0)
+        self.redoTimer = self.createTimer(duration=0.0)
         self.pendRedoTimeout = pendRedoTimeout or self.PendRedoTimeout
         self.vacuous = None # gets set in join method
         self.pended = False # Farside initiator has pended remote acceptance
@@ -990,8 +1080,8 @@ class Joinent(Correspondent):
         '''
         if self.timeout > 0.0 and self.timer.expired:
             self.nack() # stale
-            console.concise("Joinent {0}. Timed out with {1} in {2} at {3}\n".format(
-                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+            console.concise("Joinent {0}. Timed out with {1} in {2} at {3}\n",
+                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
             return
 
         # need to perform the check for accepted status and then send accept
@@ -1009,8 +1099,8 @@ class Joinent(Correspondent):
             if (self.txPacket and
                     self.txPacket.data['pk'] == PcktKind.response):
                 self.transmit(self.txPacket) #redo
-                console.concise("Joinent {0}. Redo Accept with {1} in {2} at {3}\n".format(
-                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+                console.concise("Joinent {0}. Redo Accept with {1} in {2} at {3}\n",
+                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
                 self.stack.incStat('joinent_tx_accept_redo')
             else: #check to see if status has changed to accept
                 if self.remote:
@@ -1349,8 +1439,8 @@ class Joinent(Correspondent):
             self.remove(index=self.rxPacket.index)
             return
 
-        console.concise("Joinent {0}. Do Ack Pending accept of {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Joinent {0}. Do Ack Pending accept of {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.transmit(packet)
 
     def ackAccept(self):
@@ -1392,8 +1482,8 @@ class Joinent(Correspondent):
             self.remove(index=self.rxPacket.index)
             return
 
-        console.concise("Joinent {0}. Do Accept of {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Joinent {0}. Do Accept of {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.transmit(packet)
 
     def pend(self):
@@ -1411,8 +1501,8 @@ class Joinent(Correspondent):
         if not self.stack.parseInner(self.rxPacket):
             return
 
-        console.concise("Joinent {0}. Done with {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Joinent {0}. Done with {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat("join_correspond_complete")
 
         if self.remote.sid == 0: # session id  must be non-zero after join
@@ -1523,8 +1613,7 @@ class Allower(Initiator):
 
         self.redoTimeoutMax = redoTimeoutMax or self.RedoTimeoutMax
         self.redoTimeoutMin = redoTimeoutMin or self.RedoTimeoutMin
-        self.redoTimer = aiding.StoreTimer(self.stack.store,
-                                           duration=self.redoTimeoutMin)
+        self.redoTimer = self.createTimer(duration=self.redoDuration())
 
         self.sid = self.remote.sid
         self.tid = self.remote.nextTid()
@@ -1546,8 +1635,10 @@ class Allower(Initiator):
 
         if packet.data['tk'] == TrnsKind.allow:
             if packet.data['pk'] == PcktKind.cookie:
+                self.sampleRtt()
                 self.cookie()
             elif packet.data['pk'] == PcktKind.ack:
+                self.sampleRtt()
                 self.allow()
             elif packet.data['pk'] == PcktKind.nack: # rejected
                 self.refuse()
@@ -1564,34 +1655,31 @@ class Allower(Initiator):
         '''
         if self.timeout > 0.0 and self.timer.expired:
             self.remove()
-            console.concise("Allower {0}. Timed out with {1} in {2} at {3}\n".format(
-                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+            console.concise("Allower {0}. Timed out with {1} in {2} at {3}\n",
+                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
             return
 
         # need keep sending join until accepted or timed out
         if self.redoTimer.expired:
-            duration = min(
-                         max(self.redoTimeoutMin,
-                              self.redoTimer.duration * 2.0),
-                         self.redoTimeoutMax)
+            duration = self.redoDuration(self.redoTimer.duration)
             self.redoTimer.restart(duration=duration)
             if self.txPacket:
                 if self.txPacket.data['pk'] == PcktKind.hello:
                     self.transmit(self.txPacket) # redo
-                    console.concise("Allower {0}. Redo Hello with {1} in {2} at {3}\n".format(
-                            self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+                    console.concise("Allower {0}. Redo Hello with {1} in {2} at {3}\n",
+                            self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
                     self.stack.incStat('redo_hello')
 
                 if self.txPacket.data['pk'] == PcktKind.initiate:
                     self.transmit(self.txPacket) # redo
-                    console.concise("Allower {0}. Redo Initiate with {1} in {2} at {3}\n".format(
-                             self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+                    console.concise("Allower {0}. Redo Initiate with {1} in {2} at {3}\n",
+                             self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
                     self.stack.incStat('redo_initiate')
 
                 if self.txPacket.data['pk'] == PcktKind.ack:
                     self.transmit(self.txPacket) # redo
-                    console.concise("Allower {0}. Redo Ack Final with {1} in {2} at {3}\n".format(
-                             self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+                    console.concise("Allower {0}. Redo Ack Final with {1} in {2} at {3}\n",
+                             self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
                     self.stack.incStat('redo_final')
 
     def prep(self):
@@ -1656,8 +1744,8 @@ class Allower(Initiator):
             self.remove()
             return
         self.transmit(packet)
-        console.concise("Allower {0}. Do Hello with {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Allower {0}. Do Hello with {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
 
     def cookie(self):
         '''
@@ -1737,7 +1825,7 @@ class Allower(Initiator):
                                                   vnonce,
                                                   fqdn)
 
-        cipher, nonce = self.remote.privee.encrypt(stuff, self.remote.publee.key)
+        cipher, nonce = self.remote.share().encrypt(stuff)
 
         oreo = binascii.unhexlify(self.oreo)
         body = raeting.INITIATE_PACKER.pack(self.remote.privee.pubraw,
@@ -1758,8 +1846,8 @@ class Allower(Initiator):
             return
 
         self.transmit(packet)
-        console.concise("Allower {0}. Do Initiate with {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Allower {0}. Do Initiate with {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
 
     def allow(self):
         '''
@@ -1772,6 +1860,7 @@ class Allower(Initiator):
 
         self.remote.allowed = True
         self.remote.alived = True  # fast alive as soon as allowed
+        self.remote.negotiate(self.rxPacket.body.data)
         self.ackFinal()
 
     def ackFinal(self):
@@ -1779,8 +1868,9 @@ class Allower(Initiator):
         Send ack to ack Initiate to terminate transaction
         This is so both sides wait on acks so transaction is not restarted until
         boths sides see completion.
+        Body accepts mac foot and session flags offered in ack Initiate
         '''
-        body = b''
+        body = self.remote.sessionBody()
         packet = packeting.TxPacket(stack=self.stack,
                                     kind=PcktKind.ack.value,
                                     embody=body,
@@ -1796,8 +1886,8 @@ class Allower(Initiator):
         self.remove()
         self.transmit(packet)
 
-        console.concise("Allower {0}. Do Ack Final, Done with {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Allower {0}. Do Ack Final, Done with {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat("allow_initiate_complete")
 
         self.remote.nextSid() # start new session always on successful allow
@@ -1854,8 +1944,8 @@ class Allower(Initiator):
             return
 
         self.remove()
-        console.concise("Allower {0}. Refused by {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Allower {0}. Refused by {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat(self.statKey())
 
     def reject(self):
@@ -1868,8 +1958,8 @@ class Allower(Initiator):
 
         self.remote.allowed = False
         self.remove()
-        console.concise("Allower {0}. Rejected by {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Allower {0}. Rejected by {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat(self.statKey())
 
     def unjoin(self):
@@ -1882,8 +1972,8 @@ class Allower(Initiator):
 
         self.remote.joined = False
         self.remove()
-        console.concise("Allower {0}. Rejected unjoin by {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Allower {0}. Rejected unjoin by {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat(self.statKey())
         self.stack.join(uid=self.remote.uid, cascade=self.cascade, timeout=self.timeout)
 
@@ -1905,8 +1995,7 @@ class Allowent(Correspondent):
 
         self.redoTimeoutMax = redoTimeoutMax or self.RedoTimeoutMax
         self.redoTimeoutMin = redoTimeoutMin or self.RedoTimeoutMin
-        self.redoTimer = aiding.StoreTimer(self.stack.store,
-                                           duration=self.redoTimeoutMin)
+        self.redoTimer = self.createTimer(duration=self.redoTimeoutMin)
 
         self.oreo = None #keep locally generated oreo around for redos
         self.prep() # prepare .txData
@@ -1945,8 +2034,8 @@ class Allowent(Correspondent):
         '''
         if self.timeout > 0.0 and self.timer.expired:
             self.nack(kind=PcktKind.refuse.value)
-            console.concise("Allowent {0}. Timed out with {1} in {2} at {3}\n".format(
-                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+            console.concise("Allowent {0}. Timed out with {1} in {2} at {3}\n",
+                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
             return
 
         # need to perform the check for accepted status and then send accept
@@ -1960,14 +2049,14 @@ class Allowent(Correspondent):
             if self.txPacket:
                 if self.txPacket.data['pk'] == PcktKind.cookie:
                     self.transmit(self.txPacket) #redo
-                    console.concise("Allowent {0}. Redo Cookie with {1} in {2} at {3}\n".format(
-                             self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+                    console.concise("Allowent {0}. Redo Cookie with {1} in {2} at {3}\n",
+                             self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
                     self.stack.incStat('redo_cookie')
 
                 if self.txPacket.data['pk'] == PcktKind.ack:
                     self.transmit(self.txPacket) #redo
-                    console.concise("Allowent {0}. Redo Ack with {1} in {2} at {3}\n".format(
-                             self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+                    console.concise("Allowent {0}. Redo Ack with {1} in {2} at {3}\n",
+                             self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
                     self.stack.incStat('redo_allow')
 
     def prep(self):
@@ -2107,8 +2196,8 @@ class Allowent(Correspondent):
             self.remove()
             return
         self.transmit(packet)
-        console.concise("Allowent {0}. Do Cookie with {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Allowent {0}. Do Cookie with {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
 
     def initiate(self):
         '''
@@ -2153,7 +2242,7 @@ class Allowent(Correspondent):
             self.nack(kind=PcktKind.reject.value)
             return
 
-        msg = self.remote.privee.decrypt(cipher, nonce, self.remote.publee.key)
+        msg = self.remote.share().decrypt(cipher, nonce)
         if len(msg) != raeting.INITIATESTUFF_PACKER.size:
             emsg = "Invalid length of initiate stuff\n"
             console.terse(emsg)
@@ -2198,9 +2287,12 @@ class Allowent(Correspondent):
     def ackInitiate(self):
         '''
         Send ack to initiate request
+        Body offers mac foot for session packets when stack .MacFoot and
+        session flags such as coalesced messages when stack .Coalesce and
+        aggregated acks when stack .Aggregate
+        Peers that do not support them ignore the body
         '''
-
-        body = b''
+        body = self.remote.sessionBody(offer=True)
         packet = packeting.TxPacket(stack=self.stack,
                                     kind=PcktKind.ack.value,
                                     embody=body,
@@ -2214,8 +2306,8 @@ class Allowent(Correspondent):
             return
 
         self.transmit(packet)
-        console.concise("Allowent {0}. Do Ack Initiate with {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Allowent {0}. Do Ack Initiate with {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
 
         self.allow()
 
@@ -2238,9 +2330,10 @@ class Allowent(Correspondent):
         if not self.stack.parseInner(self.rxPacket):
             return
 
+        self.remote.negotiate(self.rxPacket.body.data)
         self.remove()
-        console.concise("Allowent {0}. Done with {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Allowent {0}. Done with {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat("allow_correspond_complete")
         self.remote.sendSavedMessages() # could include messages saved on rejoin
 
@@ -2252,8 +2345,8 @@ class Allowent(Correspondent):
             return
 
         self.remove()
-        console.concise("Allowent {0}. Refused by {1} in {2} at {3}n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Allowent {0}. Refused by {1} in {2} at {3}n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat(self.statKey())
 
     def reject(self):
@@ -2266,8 +2359,8 @@ class Allowent(Correspondent):
 
         self.remote.allowed = False
         self.remove()
-        console.concise("Allowent {0}. Rejected by {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Allowent {0}. Rejected by {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat(self.statKey())
 
     def nack(self, kind=PcktKind.nack.value):
@@ -2291,11 +2384,11 @@ class Allowent(Correspondent):
             console.terse("Allowent {0}. Do Nack Refuse of {1} in {2} at {3}\n".format(
                     self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
         elif kind==PcktKind.reject:
-            console.concise("Allowent {0}. Do Nack Reject {1} in {2} at {3}\n".format(
-                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+            console.concise("Allowent {0}. Do Nack Reject {1} in {2} at {3}\n",
+                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         elif kind==PcktKind.unjoined:
-            console.concise("Allowent {0}. Do Nack Unjoined {1} in {2} at {3}\n".format(
-                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+            console.concise("Allowent {0}. Do Nack Unjoined {1} in {2} at {3}\n",
+                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         elif kind == PcktKind.nack:
             console.terse("Allowent {0}. Do Nack of {1} in {2} at {3}\n".format(
                     self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
@@ -2338,8 +2431,7 @@ class Aliver(Initiator):
 
         self.redoTimeoutMax = redoTimeoutMax or self.RedoTimeoutMax
         self.redoTimeoutMin = redoTimeoutMin or self.RedoTimeoutMin
-        self.redoTimer = aiding.StoreTimer(self.stack.store,
-                                           duration=self.redoTimeoutMin)
+        self.redoTimer = self.createTimer(duration=self.redoDuration())
 
         self.sid = self.remote.sid
         self.tid = self.remote.nextTid()
@@ -2360,6 +2452,7 @@ class Aliver(Initiator):
 
         if packet.data['tk'] == TrnsKind.alive:
             if packet.data['pk'] == PcktKind.ack:
+                self.sampleRtt()
                 self.complete()
             elif packet.data['pk'] == PcktKind.nack: # refused
                 self.refuse()
@@ -2377,24 +2470,21 @@ class Aliver(Initiator):
         Perform time based processing of transaction
         '''
         if self.timeout > 0.0 and self.timer.expired:
-            console.concise("Aliver {0}. Timed out with {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+            console.concise("Aliver {0}. Timed out with {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
             self.remove()
             self.remote.refresh(alived=False) # mark as dead
             return
 
         # need keep sending message until completed or timed out
         if self.redoTimer.expired:
-            duration = min(
-                         max(self.redoTimeoutMin,
-                              self.redoTimer.duration * 2.0),
-                         self.redoTimeoutMax)
+            duration = self.redoDuration(self.redoTimer.duration)
             self.redoTimer.restart(duration=duration)
             if self.txPacket:
                 if self.txPacket.data['pk'] == PcktKind.request:
                     self.transmit(self.txPacket) # redo
-                    console.concise("Aliver {0}. Redo with {1} in {2} at {3}\n".format(
-                        self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+                    console.concise("Aliver {0}. Redo with {1} in {2} at {3}\n",
+                        self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
                     self.stack.incStat('redo_alive')
 
     def prep(self):
@@ -2449,8 +2539,8 @@ class Aliver(Initiator):
             self.remove()
             return
         self.transmit(packet)
-        console.concise("Aliver {0}. Do Alive with {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Aliver {0}. Do Alive with {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
 
     def complete(self):
         '''
@@ -2460,8 +2550,8 @@ class Aliver(Initiator):
             return
         self.remote.refresh(alived=True) # restart timer mark as alive
         self.remove()
-        console.concise("Aliver {0}. Done with {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Aliver {0}. Done with {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat("alive_complete")
 
     def refuse(self):
@@ -2473,8 +2563,8 @@ class Aliver(Initiator):
             return
         self.remote.refresh(alived=None) # restart timer do not change status
         self.remove()
-        console.concise("Aliver {0}. Refused by {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Aliver {0}. Refused by {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat(self.statKey())
 
     def reject(self):
@@ -2486,8 +2576,8 @@ class Aliver(Initiator):
             return
         self.remote.refresh(alived=False) # restart timer set status to False
         self.remove()
-        console.concise("Aliver {0}. Rejected by {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Aliver {0}. Rejected by {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat(self.statKey())
 
     def unjoin(self):
@@ -2500,8 +2590,8 @@ class Aliver(Initiator):
         self.remote.refresh(alived=None) # restart timer do not change status
         self.remote.joined = False
         self.remove()
-        console.concise("Aliver {0}. Refused unjoin by {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Aliver {0}. Refused unjoin by {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat(self.statKey())
         self.stack.join(uid=self.remote.uid, cascade=self.cascade, timeout=self.timeout)
 
@@ -2515,8 +2605,8 @@ class Aliver(Initiator):
         self.remote.refresh(alived=None) # restart timer do not change status
         self.remote.allowed = False
         self.remove()
-        console.concise("Aliver {0}. Refused unallow by {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Aliver {0}. Refused unallow by {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat(self.statKey())
         self.stack.allow(uid=self.remote.uid, cascade=self.cascade, timeout=self.timeout)
 
@@ -2553,8 +2643,8 @@ class Alivent(Correspondent):
         '''
         if self.timeout > 0.0 and self.timer.expired:
             self.nack() #manage restarts alive later
-            console.concise("Alivent {0}. Timed out with {1} in {2} at {3}\n".format(
-                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+            console.concise("Alivent {0}. Timed out with {1} in {2} at {3}\n",
+                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
             return
 
     def prep(self):
@@ -2603,26 +2693,14 @@ class Alivent(Correspondent):
         data = self.rxPacket.data
         body = self.rxPacket.body.data
 
-        body = odict()
-        packet = packeting.TxPacket(stack=self.stack,
-                                    kind=PcktKind.ack.value,
-                                    embody=body,
-                                    data=self.txData)
-        try:
-            packet.pack()
-        except raeting.PacketError as ex:
-            console.terse(str(ex) + '\n')
-            self.stack.incStat("packing_error")
-            self.remove()
+        if not self.reply(PcktKind.ack.value, odict()):
             return
-
-        self.transmit(packet)
-        console.concise("Alivent {0}. Do ack alive with {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Alivent {0}. Do ack alive with {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.remote.refresh(alived=True)
         self.remove()
-        console.concise("Alivent {0}. Done with {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Alivent {0}. Done with {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat("alive_complete")
 
     def nack(self, kind=PcktKind.nack.value):
@@ -2652,8 +2730,8 @@ class Alivent(Correspondent):
                 console.terse("Alivent {0}. Do Unallowed of {1} in {2} at {3}\n".format(
                         self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
         elif kind == PcktKind.reject:
-            console.concise("Alivent {0}. Do Reject {1} in {2} at {3}\n".format(
-                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+            console.concise("Alivent {0}. Do Reject {1} in {2} at {3}\n",
+                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         elif kind == PcktKind.nack:
             console.terse("Alivent {0}. Do Nack of {1} in {2} at {3}\n".format(
                     self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
@@ -2680,25 +2758,42 @@ class Messenger(Initiator):
     RedoTimeoutMin = 0.2 # initial timeout
     RedoTimeoutMax = 0.5 # max timeout
 
-    def __init__(self, redoTimeoutMin=None, redoTimeoutMax=None, burst=0, **kwa):
+    def __init__(self, redoTimeoutMin=None, redoTimeoutMax=None, burst=0,
+                 window=0, streaming=False, done=None, coalesced=False, **kwa):
         '''
         Setup instance
-        '''
-        kwa['kind'] = TrnsKind.message.value
+        window is max segments in flight past the cumulative ack of a peer
+            that selectively acks, 0 means send bursts
+        done is optional callable called once with the Outcome when removed
+        coalesced True means body holds list of message bodies at 'msgs'
+            and the transaction kind is coalesce so the peer splits them
+        '''
+        kwa['kind'] = (TrnsKind.coalesce.value if coalesced
+                       else TrnsKind.message.value)
         super(Messenger, self).__init__(**kwa)
 
         self.redoTimeoutMax = redoTimeoutMax or self.RedoTimeoutMax
         self.redoTimeoutMin = redoTimeoutMin or self.RedoTimeoutMin
-        self.redoTimer = aiding.StoreTimer(self.stack.store,
-                                           duration=self.redoTimeoutMin)
+        self.redoTimer = self.createTimer(duration=self.redoDuration())
 
         self.burst = max(0, int(burst)) # BurstSize
-        self.misseds = oset()  # ordered set of currently missed segments
+        self.misseds = oset()  # ordered set of currently missed segment numbers
+        self.window = max(0, int(window)) # Window
+        self.stride = max(1, self.window // 2)  # segments between wait flags
+        self.sacking = None  # True once peer selectively acks, False if not
+        self.acked = 0  # cumulative ack, lowest segment not yet received by peer
+        self.holes = set()  # segment numbers resent since last redo
+        self.burstStop = 0  # segment number after last of current burst or window
+        self.paceTimer = self.createTimer(duration=0.0)  # when to pace more
+        self.unacked = 0  # segments sent since last ack for congestion window
+        self.recovery = 0  # window already reduced for loss below this segment
+        self.done = done  # callback with outcome on removal
+        self.outcome = Outcome.pending
 
         self.sid = self.remote.sid
         self.tid = self.remote.nextTid()
         self.prep() # prepare .txData
-        self.tray = packeting.TxTray(stack=self.stack)
+        self.tray = packeting.TxTray(stack=self.stack, streaming=streaming)
 
     def transmit(self, packet):
         '''
@@ -2707,18 +2802,28 @@ class Messenger(Initiator):
         super(Messenger, self).transmit(packet)
         self.redoTimer.restart()
 
+    def solicits(self, packet):
+        '''
+        Returns True if packet solicits a reply to sample round trip time
+        Only segments with wait flag set are acked
+        '''
+        return bool(packet.data.get('wf'))
+
     def receive(self, packet):
         """
         Process received packet belonging to this transaction
         """
         super(Messenger, self).receive(packet)
 
-        if packet.data['tk'] == TrnsKind.message:
+        if packet.data['tk'] == self.kind:
             if packet.data['pk'] == PcktKind.ack: # more
+                self.sampleRtt()
                 self.another()  # continue message
             elif packet.data['pk'] == PcktKind.resend:  # resend
+                self.sampleRtt()
                 self.resend()  # resend missed segments
             elif packet.data['pk'] == PcktKind.done:  # completed
+                self.sampleRtt()
                 self.complete()
             elif packet.data['pk'] == PcktKind.nack: # rejected
                 self.reject()
@@ -2728,18 +2833,25 @@ class Messenger(Initiator):
         Perform time based processing of transaction
         '''
         if self.timeout > 0.0 and self.timer.expired:
+            self.outcome = Outcome.timedout
             self.remove()
-            console.concise("Messenger {0}. Timed out with {1} in {2} at {3}\n".format(
-                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+            console.concise("Messenger {0}. Timed out with {1} in {2} at {3}\n",
+                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
             return
 
+        if self.tray.current < self.burstStop and self.paceTimer.expired:
+            self.pace()  # continue paced burst
+
         # keep sending message  until completed or timed out
         if self.redoTimer.expired:
-            duration = min(
-                         max(self.redoTimeoutMin,
-                              self.redoTimer.duration * 2.0),
-                         self.redoTimeoutMax)
+            duration = self.redoDuration(self.redoTimer.duration)
             self.redoTimer.restart(duration=duration)
+            self.congest(timeout=True)
+            if self.sacking and self.acked < self.tray.current:
+                self.holes.clear()  # holes may be resent again
+                self.resendSegments([self.acked])  # prompts selective ack
+                self.stack.incStat('redo_segment')
+                return
             if self.txPacket:
                 if self.txPacket.data['pk'] in [PcktKind.message]:
                     if not self.txPacket.data['af']:  # turn on AgnFlag if not set
@@ -2747,14 +2859,26 @@ class Messenger(Initiator):
                         self.txPacket.repack()
                     self.transmit(self.txPacket) # redo
                     console.concise("Messenger {0}. Redo Segment {1} with "
-                                    "{2} in {3} at {4}\n".format(
+                                    "{2} in {3} at {4}\n",
                                     self.stack.name,
                                     self.txPacket.data['sn'],
                                     self.remote.name,
                                     self.tid,
-                                    self.stack.store.stamp))
+                                    self.stack.store.stamp)
                     self.stack.incStat('redo_segment')
 
+    def remove(self, remote=None, index=None):
+        '''
+        Augment remove with call of .done callback with .outcome
+        Outcome still pending on removal is failed
+        '''
+        super(Messenger, self).remove(remote=remote, index=index)
+        if self.outcome == Outcome.pending:
+            self.outcome = Outcome.failed
+        if self.done:
+            done, self.done = self.done, None  # only once
+            done(self.outcome)
+
     def prep(self):
         '''
         Prepare .txData
@@ -2771,9 +2895,10 @@ class Messenger(Initiator):
                             si=self.sid,
                             ti=self.tid,)
 
-    def message(self, body=None):
+    def message(self, body=None, packed=None):
         '''
         Send message or part of message. So repeatedly called until complete
+        packed is optional body already packed so not packed again
         '''
 
         if not self.remote.allowed:
@@ -2784,18 +2909,18 @@ class Messenger(Initiator):
             self.remove()
             return
 
-        if not self.tray.packets:
+        if not self.tray.count:
             try:
-                self.tray.pack(data=self.txData, body=body)
+                self.tray.pack(data=self.txData, body=body, packed=packed)
             except raeting.PacketError as ex:
                 console.terse(str(ex) + '\n')
                 self.stack.incStat("packing_error")
                 self.remove()
                 return
 
-        if self.tray.current >= len(self.tray.packets):
+        if self.tray.current >= self.tray.count:
             emsg = "Messenger {0}. Current packet {1} greater than num packets {2}\n".format(
-                                self.stack.name, self.tray.current, len(self.tray.packets))
+                                self.stack.name, self.tray.current, self.tray.count)
             console.terse(emsg)
             self.remove()
             return
@@ -2810,26 +2935,161 @@ class Messenger(Initiator):
                                 self.tid,
                                 self.stack.store.stamp)
             console.terse(emsg)
-            self.incStat('message_index_collision')
+            self.stack.incStat('message_index_collision')
             self.remove()
             return
 
-        burst = (min(self.burst, (len(self.tray.packets) - self.tray.current))
-                    if self.burst else (len(self.tray.packets) - self.tray.current))
+        if self.window and self.sacking is not False:
+            self.slide()
+            return
+
+        burst = (min(self.burst, (self.tray.count - self.tray.current))
+                    if self.burst else (self.tray.count - self.tray.current))
+        if self.window:  # peer does not selectively ack so bursts of window
+            burst = min(self.window, burst)
+        if self.stack.Congestion:
+            burst = min(int(self.remote.cwnd), burst)
 
-        packets = self.tray.packets[self.tray.current:self.tray.current + burst]
-        if packets:
-            last = packets[-1]
-            last.data.update(wf=True)  # set wait flag on last packet in burst
-            last.repack()
+        self.stride = 0  # wait flag only on last of burst
+        self.burstStop = self.tray.current + burst
+        self.pace()
 
-        for packet in packets:
+    def pace(self):
+        '''
+        Send segments up to .burstStop as fast as the pacing of the remote
+        allows when congestion controlled otherwise all at once.
+        Sets wait flag on the last and every .stride segments when nonzero
+        Restarts .paceTimer for when more may be sent
+        '''
+        count = self.burstStop - self.tray.current
+        if self.stack.Congestion:
+            count = self.remote.pace(count)
+        for i in range(count):
+            sn = self.tray.current
+            try:  # set wait flag on last packet in burst
+                packet = (self.tray.packet(sn, wf=True)
+                          if (sn == self.burstStop - 1 or
+                                (self.stride and not ((sn + 1) % self.stride)))
+                          else self.tray.packet(sn))
+            except raeting.PacketError as ex:
+                console.terse(str(ex) + '\n')
+                self.stack.incStat("packing_error")
+                self.remove()
+                return
             self.transmit(packet)
-            self.tray.last = self.tray.current
+            self.tray.last = sn
             self.tray.current += 1
+            self.unacked += 1
             self.stack.incStat("message_segment_tx")
-            console.concise("Messenger {0}. Do Message Segment {1} with {2} in {3} at {4}\n".format(
-                    self.stack.name, self.tray.last, self.remote.name, self.tid, self.stack.store.stamp))
+            console.concise("Messenger {0}. Do Message Segment {1} with {2} in {3} at {4}\n",
+                    self.stack.name, self.tray.last, self.remote.name, self.tid, self.stack.store.stamp)
+        if self.tray.current < self.burstStop:
+            self.paceTimer.restart(duration=self.remote.paceInterval())
+            self.stack.incStat("message_paced")
+
+    def congest(self, timeout=False):
+        '''
+        Reduce congestion window of remote for loss once per flight of
+        segments unless timeout which always reduces
+        '''
+        if not self.stack.Congestion:
+            return
+        if not timeout and self.recovery and self.acked < self.recovery:
+            return  # already reduced for loss in this flight
+        self.recovery = self.tray.current
+        self.remote.congest(timeout=timeout)
+
+    def relieve(self, count):
+        '''
+        Grow congestion window of remote for count segments acked
+        '''
+        if self.stack.Congestion and count > 0:
+            self.remote.relieve(count)
+
+    def slide(self):
+        '''
+        Send new segments while fewer than .window are past the cumulative ack
+        Sets wait flag every .stride segments and on the last one sent so
+        the peer acks often enough to keep the window full
+        Congestion controlled the window is at most that of the remote
+        '''
+        window = self.window
+        if self.stack.Congestion:
+            window = max(1, min(window, int(self.remote.cwnd)))
+        self.stride = max(1, window // 2)
+        self.burstStop = min(self.tray.count, self.acked + window)
+        self.pace()
+
+    def sack(self):
+        '''
+        Process cumulative ack 'ca' and selective ack bitmap 'sk' in body of
+        ack or resend packet from a peer that supports windowed transfer.
+        Resends holes below the highest selectively acked segment once until
+        the next redo and then slides the window.
+        Returns False if body has no cumulative ack so peer does not
+        selectively ack and the ack or resend is processed as before
+        '''
+        body = self.rxPacket.body.data
+        ca = body.get('ca') if isinstance(body, Mapping) else None
+        if ca is None:
+            self.sacking = False
+            return False
+        self.sacking = True
+
+        try:
+            sacked = bytearray(binascii.unhexlify(body.get('sk', '')))
+        except (TypeError, ValueError, binascii.Error):
+            sacked = None
+        if (sacked is None or not isinstance(ca, (int, long)) or
+                not (0 <= ca <= self.tray.count)):
+            emsg = "Invalid selective ack '{0}' '{1}'\n".format(ca, body.get('sk'))
+            console.terse(emsg)
+            self.stack.incStat('invalid_sack')
+            return True
+
+        if ca > self.acked:
+            self.relieve(ca - self.acked)
+            self.acked = ca
+            self.holes = set(sn for sn in self.holes if sn >= ca)
+        base = (ca >> 3) << 3  # segment number of first bit in sacked
+        top = min(base + len(sacked) * 8, self.tray.current)
+        highest = None
+        for sn in range(top - 1, self.acked - 1, -1):
+            if sacked[(sn - base) >> 3] & (0x80 >> ((sn - base) & 7)):
+                highest = sn
+                break
+        if highest is not None:
+            holes = [sn for sn in range(self.acked, highest)
+                        if not (sacked[(sn - base) >> 3] & (0x80 >> ((sn - base) & 7)))
+                        and sn not in self.holes]
+            if holes:
+                self.congest()
+                self.holes.update(holes)
+                if not self.resendSegments(holes):
+                    return True
+        self.slide()
+        return True
+
+    def resendSegments(self, sns):
+        '''
+        Resend segments with segment numbers sns with again flag set and
+        wait flag set only on the last
+        Returns True if sent False otherwise
+        '''
+        for sn in sns:
+            try:
+                packet = self.tray.packet(sn, af=True, wf=(sn == sns[-1]))
+            except raeting.PacketError as ex:
+                console.terse(str(ex) + '\n')
+                self.stack.incStat("packing_error")
+                self.remove()
+                return False
+            self.transmit(packet)
+            self.stack.incStat("message_segment_tx")
+            console.concise("Messenger {0}. Do Resend Message Segment "
+                            "{1} with {2} in {3} at {4}\n",
+                self.stack.name, sn, self.remote.name, self.tid, self.stack.store.stamp)
+        return True
 
     def another(self):
         '''
@@ -2840,9 +3100,16 @@ class Messenger(Initiator):
         self.remote.refresh(alived=True)
         self.stack.incStat("message_ack_rx")
 
+        if self.window and self.sack():
+            return
+
+        self.relieve(self.unacked)
+        self.unacked = 0
+        self.recovery = 0  # acks of bursts come once per flight
+
         if self.misseds:
             self.sendMisseds()
-        elif self.tray.current < len(self.tray.packets):
+        elif self.tray.current < self.tray.count:
             self.message()  # continue message
 
     def resend(self):
@@ -2856,26 +3123,27 @@ class Messenger(Initiator):
         self.remote.refresh(alived=True)
         self.stack.incStat('message_resend_rx')
 
+        if self.window and self.sack():
+            return
+
         data = self.rxPacket.data
         body = self.rxPacket.body.data
 
         misseds = body.get('misseds')  # indexes of missed segments
         if misseds:
-            if not self.tray.packets:
+            if not self.tray.count:
                 emsg = "Invalid resend request '{0}'\n".format(misseds)
                 console.terse(emsg)
                 self.stack.incStat('invalid_resend')
                 return
 
             for m in misseds:
-                try:
-                    packet = self.tray.packets[m]
-                except IndexError as ex:
-                    #console.terse(str(ex) + '\n')
+                if not (0 <= m < self.tray.count):
                     console.terse("Invalid misseds segment number {0}\n".format(m))
                     self.stack.incStat("invalid_misseds")
                     return
-                self.misseds.add(packet)  # add segment, set only adds if unique
+                self.misseds.add(m)  # add segment, set only adds if unique
+            self.congest()
             self.sendMisseds()
 
     def sendMisseds(self):
@@ -2885,40 +3153,26 @@ class Messenger(Initiator):
         if self.misseds:
             burst = (min(self.burst, (len(self.misseds))) if
                      self.burst else len(self.misseds))
-            # make list of first burst number of packets
+            # make list of first burst number of segment numbers
             misseds = [missed for missed in self.misseds][:burst]
-            for packet in misseds[:-1]:
-                repack = False
-                if not packet.data['af']:  # turn on again flag if not set
-                    packet.data.update(af=True)
-                    repack = True
-                if packet.data['wf']:  # turn off wait flag if set
-                    packet.data.update(wf=False)
-                    repack = True
-                if repack:
-                    packet.repack()
-            for packet in misseds[-1:]:  # last packet
-                repack = False
-                if not packet.data['af']:  # turn on again flag is not set
-                    packet.data.update(af=True)
-                    repack = True
-                if not packet.data['wf']:  # turn on wait flag if not set
-                    packet.data.update(wf=True)
-                    repack = True
-                if repack:
-                    packet.repack()
-
-            for packet in misseds:
+            for sn in misseds:
+                try:  # turn on again flag and wait flag only on last packet
+                    packet = self.tray.packet(sn, af=True, wf=(sn == misseds[-1]))
+                except raeting.PacketError as ex:
+                    console.terse(str(ex) + '\n')
+                    self.stack.incStat("packing_error")
+                    self.remove()
+                    return
                 self.transmit(packet)
                 self.stack.incStat("message_segment_tx")
                 console.concise("Messenger {0}. Do Resend Message Segment "
-                                "{1} with {2} in {3} at {4}\n".format(
+                                "{1} with {2} in {3} at {4}\n",
                     self.stack.name,
                     packet.data['sn'],
                     self.remote.name,
                     self.tid,
-                    self.stack.store.stamp))
-                self.misseds.discard(packet)  # remove from self.misseds
+                    self.stack.store.stamp)
+                self.misseds.discard(sn)  # remove from self.misseds
 
     def complete(self):
         '''
@@ -2931,9 +3185,10 @@ class Messenger(Initiator):
         self.remote.refresh(alived=True)
         self.stack.incStat('message_complete_rx')
 
+        self.outcome = Outcome.complete
         self.remove()
-        console.concise("Messenger {0}. Done with {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Messenger {0}. Done with {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat("message_initiate_complete")
 
     def reject(self):
@@ -2947,9 +3202,10 @@ class Messenger(Initiator):
         self.remote.refresh(alived=True)
         self.stack.incStat('message_reject_rx')
 
+        self.outcome = Outcome.rejected
         self.remove()
-        console.concise("Messenger {0}. Rejected by {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Messenger {0}. Rejected by {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat(self.statKey())
 
     def nack(self):
@@ -2972,30 +3228,38 @@ class Messenger(Initiator):
         self.transmit(packet)
         self.stack.incStat('message_nack_tx')
         self.remove()
-        console.concise("Messenger {0}. Do Nack Reject of {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Messenger {0}. Do Nack Reject of {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat(self.statKey())
 
 class Messengent(Correspondent):
     '''
     RAET protocol Messengent Correspondent class Dual of Messenger
     Generic Messages
+
+    Acks and resends carry the cumulative ack 'ca', the lowest segment
+    number not yet received, and the selective ack 'sk', the hex bitmap of
+    received segments past it, for senders with windowed transfer. Senders
+    without it ignore them.
     '''
     Timeout = 0.0
     RedoTimeoutMin = 0.2 # initial timeout
     RedoTimeoutMax = 0.5 # max timeout
+    SackSize = 1024  # max segments past cumulative ack in selective ack
 
     def __init__(self, redoTimeoutMin=None, redoTimeoutMax=None, **kwa):
         '''
         Setup instance
+        Kind is that of the message or coalesce transaction of the rxPacket
         '''
-        kwa['kind'] = TrnsKind.message.value
+        kwa['kind'] = (TrnsKind.coalesce.value
+                       if kwa['rxPacket'].data['tk'] == TrnsKind.coalesce
+                       else TrnsKind.message.value)
         super(Messengent, self).__init__(**kwa)
 
         self.redoTimeoutMax = redoTimeoutMax or self.RedoTimeoutMax
         self.redoTimeoutMin = redoTimeoutMin or self.RedoTimeoutMin
-        self.redoTimer = aiding.StoreTimer(self.stack.store,
-                                           duration=self.redoTimeoutMin)
+        self.redoTimer = self.createTimer(duration=self.redoDuration())
 
         self.wait = False  # wf wait flag
         self.lowest = None
@@ -3009,6 +3273,17 @@ class Messengent(Correspondent):
         super(Messengent, self).transmit(packet)
         self.redoTimer.restart()
 
+    def reply(self, kind, body):
+        '''
+        Augment reply with restart of redo timer when queued as transmit
+        does when sent
+        '''
+        if not super(Messengent, self).reply(kind, body):
+            return False
+        if self.remote.aggregate:
+            self.redoTimer.restart()
+        return True
+
     def receive(self, packet):
         """
         Process received packet belonging to this transaction
@@ -3016,7 +3291,7 @@ class Messengent(Correspondent):
         super(Messengent, self).receive(packet)
 
         # resent message
-        if packet.data['tk'] == TrnsKind.message:
+        if packet.data['tk'] == self.kind:
             if packet.data['pk'] == PcktKind.message:
                 self.message()
             elif packet.data['pk'] == PcktKind.nack: # rejected
@@ -3029,24 +3304,21 @@ class Messengent(Correspondent):
         '''
         if self.timeout > 0.0 and self.timer.expired:
             self.nack()
-            console.concise("Messengent {0}. Timed out with {1} in {2} at {3}\n".format(
-                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+            console.concise("Messengent {0}. Timed out with {1} in {2} at {3}\n",
+                    self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
             return
 
         if self.redoTimer.expired:
-            duration = min(
-                         max(self.redoTimeoutMin,
-                              self.redoTimer.duration * 2.0),
-                         self.redoTimeoutMax)
+            duration = self.redoDuration(self.redoTimer.duration)
             self.redoTimer.restart(duration=duration)
 
             if self.tray.complete:
                 self.complete()
             else:
-                misseds = self.tray.missing(begin=self.lowest)
-                if misseds:  # resent missed segments
-                    self.lowest = misseds[0]
-                    self.resend(misseds)
+                runs = self.tray.missingRuns(begin=self.lowest)
+                if runs:  # resent missed segments
+                    self.lowest = runs[0][0]
+                    self.resend(runs)
                 else:  # always ask for more here
                     self.ack()
 
@@ -3083,7 +3355,7 @@ class Messengent(Correspondent):
             body = self.tray.parse(self.rxPacket)
         except raeting.PacketError as ex:
             console.terse(str(ex) + '\n')
-            self.incStat('parsing_message_error')
+            self.stack.incStat('parsing_message_error')
             self.nack()
             return
 
@@ -3097,7 +3369,7 @@ class Messengent(Correspondent):
                                 self.tid,
                                 self.stack.store.stamp)
             console.terse(emsg)
-            self.incStat('message_index_collision')
+            self.stack.incStat('message_index_collision')
             self.nack()
             return
 
@@ -3109,109 +3381,105 @@ class Messengent(Correspondent):
         if self.tray.complete:
             self.complete()
         elif self.wait:  # ask for more if sender waiting for ack
-            misseds = self.tray.missing(begin=self.lowest)
-            if misseds:  # resent missed segments
-                self.lowest = misseds[0]
-                self.resend(misseds)
+            runs = self.tray.missingRuns(begin=self.lowest)
+            if runs:  # resent missed segments
+                self.lowest = runs[0][0]
+                self.resend(runs)
             else:
                 self.ack()
 
+    def sack(self, body):
+        '''
+        Returns body updated with cumulative and selective ack
+        '''
+        body.update(ca=self.tray.floor, sk=self.tray.sack(self.SackSize))
+        return body
+
     def ack(self):
         '''
         Send ack to message
         '''
-        body = odict()
-        packet = packeting.TxPacket(stack=self.stack,
-                                    kind=PcktKind.ack.value,
-                                    embody=body,
-                                    data=self.txData)
-        try:
-            packet.pack()
-        except raeting.PacketError as ex:
-            console.terse(str(ex) + '\n')
-            self.stack.incStat("packing_error")
-            self.remove()
+        if not self.reply(PcktKind.ack.value, self.sack(odict())):
             return
-        self.transmit(packet)
         self.stack.incStat("message_more_ack")
-        console.concise("Messengent {0}. Do Ack More on Segment {1} with {2} in {3} at {4}\n".format(
+        console.concise("Messengent {0}. Do Ack More on Segment {1} with {2} in {3} at {4}\n",
             self.stack.name,
             self.rxPacket.data['sn'],
             self.remote.name,
             self.tid,
-            self.stack.store.stamp))
+            self.stack.store.stamp)
 
-    def resend(self, misseds):
+    def resend(self, runs):
         '''
-        Send resend request(s) for missing packets
+        Send resend request(s) for missing packets given by runs of
+        (start, stop) missing segment numbers
         '''
-        while misseds:
-            if len(misseds) > 64:
-                remainders = misseds[64:] # only do at most 64 at a time
-                misseds = misseds[:64]
-            else:
-                remainders = []
+        misseds = []
+        for start, stop in runs:
+            for sn in range(start, stop):
+                misseds.append(sn)
+                if len(misseds) >= 64: # only do at most 64 at a time
+                    if not self.resendMisseds(misseds):
+                        return
+                    misseds = []
+        if misseds:
+            self.resendMisseds(misseds)
 
-            body = odict(misseds=misseds)
-            packet = packeting.TxPacket(stack=self.stack,
-                                        kind=PcktKind.resend.value,
-                                        embody=body,
-                                        data=self.txData)
-            try:
-                packet.pack()
-            except raeting.PacketError as ex:
-                console.terse(str(ex) + '\n')
-                self.stack.incStat("packing_error")
-                self.remove()
-                return
-            self.transmit(packet)
-            self.stack.incStat("message_resend_tx")
-            console.concise("Messengent {0}. Do Resend Segments {1} with {2} in {3} at {4}\n".format(
-                    self.stack.name,
-                    misseds,
-                    self.remote.name,
-                    self.tid,
-                    self.stack.store.stamp))
-            misseds = remainders
+    def resendMisseds(self, misseds):
+        '''
+        Send resend request for list of missing segment numbers misseds
+        Returns True if sent False otherwise
+        '''
+        if not self.reply(PcktKind.resend.value, self.sack(odict(misseds=misseds))):
+            return False
+        self.stack.incStat("message_resend_tx")
+        console.concise("Messengent {0}. Do Resend Segments {1} with {2} in {3} at {4}\n",
+                self.stack.name,
+                misseds,
+                self.remote.name,
+                self.tid,
+                self.stack.store.stamp)
+        return True
 
     def complete(self):
         '''
         Complete transaction and remove
         '''
         self.done()
-        console.verbose("{0} received message body\n{1}\n".format(
-            self.stack.name, self.tray.body))
+        console.verbose("{0} received message body\n{1}\n",
+            self.stack.name, self.tray.body)
         # application layer authorizaiton needs to know who sent the message
-        self.stack.rxMsgs.append((self.tray.body, self.remote.name))
+        body = self.tray.body
+        if self.kind == TrnsKind.coalesce:  # split coalesced messages
+            bodies = body.get('msgs')
+            if isinstance(bodies, list):
+                for body in bodies:
+                    self.stack.rxMsgs.append((body, self.remote.name))
+            else:
+                emsg = "Messengent {0}. Invalid coalesced messages '{1}'\n".format(
+                        self.stack.name, bodies)
+                console.terse(emsg)
+                self.stack.incStat('invalid_coalesced')
+        else:
+            self.stack.rxMsgs.append((body, self.remote.name))
         self.remove()
-        console.concise("Messengent {0}. Complete with {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Messengent {0}. Complete with {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat("messagent_correspond_complete")
 
     def done(self):
         '''
         Send done ack to complete message
         '''
-        body = odict()
-        packet = packeting.TxPacket(stack=self.stack,
-                                    kind=PcktKind.done.value,
-                                    embody=body,
-                                    data=self.txData)
-        try:
-            packet.pack()
-        except raeting.PacketError as ex:
-            console.terse(str(ex) + '\n')
-            self.stack.incStat("packing_error")
-            self.remove()
+        if not self.reply(PcktKind.done.value, odict()):
             return
-        self.transmit(packet)
         self.stack.incStat("message_complete_ack")
-        console.concise("Messengent {0}. Do Ack Done Message on Segment {1} with {2} in {3} at {4}\n".format(
+        console.concise("Messengent {0}. Do Ack Done Message on Segment {1} with {2} in {3} at {4}\n",
             self.stack.name,
             self.rxPacket.data['sn'],
             self.remote.name,
             self.tid,
-            self.stack.store.stamp))
+            self.stack.store.stamp)
 
     def reject(self):
         '''
@@ -3225,8 +3493,8 @@ class Messengent(Correspondent):
         self.stack.incStat("message_reject_nack")
 
         self.remove()
-        console.concise("Messengent {0}. Rejected by {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Messengent {0}. Rejected by {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat(self.statKey())
 
     def nack(self):
@@ -3248,7 +3516,7 @@ class Messengent(Correspondent):
 
         self.transmit(packet)
         self.remove()
-        console.concise("Messagent {0}. Do Nack Reject of {1} in {2} at {3}\n".format(
-                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp))
+        console.concise("Messagent {0}. Do Nack Reject of {1} in {2} at {3}\n",
+                self.stack.name, self.remote.name, self.tid, self.stack.store.stamp)
         self.stack.incStat(self.statKey())
 
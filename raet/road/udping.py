@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+'''
+udping.py raet protocol batched datagram io on udp sockets
+
+SocketUdpBatch extends ioflo's non blocking udp socket with receiveMany and
+sendMany that move up to .count datagrams per call. On Linux these are single
+recvmmsg and sendmmsg syscalls over preallocated buffers through ctypes.
+Elsewhere they fall back to loops of recvfrom_into into one preallocated
+buffer and sendto.
+'''
+
+# Import python libs
+import socket
+import errno
+import struct
+import ctypes
+import ctypes.util
+import itertools
+
+# Import ioflo libs
+from ioflo.base import nonblocking
+
+# Import raet libs
+from ..abiding import *  # import globals
+
+from ..consoling import getConsole
+console = getConsole()
+
+MSG_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0x40)
+SOCKADDR_SIZE = 128  # sizeof(struct sockaddr_storage)
+SOCKADDR_IN_PACKER = struct.Struct('=H')  # sin_family in host order
+PORT_PACKER = struct.Struct('!H')  # sin_port in network order
+AF_INET_PACKED = SOCKADDR_IN_PACKER.pack(socket.AF_INET)
+
+class Iovec(ctypes.Structure):
+    '''
+    struct iovec
+    '''
+    _fields_ = [('iov_base', ctypes.c_void_p),
+                ('iov_len', ctypes.c_size_t)]
+
+class Msghdr(ctypes.Structure):
+    '''
+    struct msghdr
+    '''
+    _fields_ = [('msg_name', ctypes.c_void_p),
+                ('msg_namelen', ctypes.c_uint32),
+                ('msg_iov', ctypes.POINTER(Iovec)),
+                ('msg_iovlen', ctypes.c_size_t),
+                ('msg_control', ctypes.c_void_p),
+                ('msg_controllen', ctypes.c_size_t),
+                ('msg_flags', ctypes.c_int)]
+
+class Mmsghdr(ctypes.Structure):
+    '''
+    struct mmsghdr
+    '''
+    _fields_ = [('msg_hdr', Msghdr),
+                ('msg_len', ctypes.c_uint)]
+
+def loadMmsg():
+    '''
+    Returns duple of (recvmmsg, sendmmsg) ctypes functions from libc
+    or (None, None) if not available such as when not on Linux
+    '''
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        recvmmsg = libc.recvmmsg
+        sendmmsg = libc.sendmmsg
+    except (OSError, AttributeError, TypeError):
+        return (None, None)
+    recvmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(Mmsghdr), ctypes.c_uint,
+                         ctypes.c_int, ctypes.c_void_p]
+    recvmmsg.restype = ctypes.c_int
+    sendmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(Mmsghdr), ctypes.c_uint,
+                         ctypes.c_int]
+    sendmmsg.restype = ctypes.c_int
+    return (recvmmsg, sendmmsg)
+
+RECVMMSG, SENDMMSG = loadMmsg()
+
+
+class SocketUdpBatch(nonblocking.SocketUdpNb):
+    '''
+    Non blocking udp socket with batched datagram io
+        .count is max number of datagrams per receiveMany or sendMany
+        .batched is True so stacks use receiveMany and sendMany
+        .mmsg is True when using recvmmsg and sendmmsg syscalls
+    Logging of datagrams as done by SocketUdpNb is not supported when batched
+    '''
+    def __init__(self, count=64, mmsg=None, **kwa):
+        '''
+        Setup instance
+        count is max datagrams per batch
+        mmsg is True to use recvmmsg sendmmsg when available, None is default
+        of when available, False is never
+        '''
+        super(SocketUdpBatch, self).__init__(**kwa)
+        self.count = max(1, int(count))
+        self.mmsg = (RECVMMSG is not None) if mmsg is None else (mmsg and RECVMMSG is not None)
+        self.batched = not self.log
+
+        # preallocated buffers and headers
+        if self.mmsg:
+            self.rxBufs = [ctypes.create_string_buffer(self.bs) for i in range(self.count)]
+            self.rxNames = [ctypes.create_string_buffer(SOCKADDR_SIZE)
+                            for i in range(self.count)]
+            self.rxIovs = (Iovec * self.count)()
+            self.rxHdrs = (Mmsghdr * self.count)()
+            for i in range(self.count):
+                self.rxIovs[i].iov_base = ctypes.addressof(self.rxBufs[i])
+                self.rxIovs[i].iov_len = self.bs
+                hdr = self.rxHdrs[i].msg_hdr
+                hdr.msg_name = ctypes.addressof(self.rxNames[i])
+                hdr.msg_iov = ctypes.pointer(self.rxIovs[i])
+                hdr.msg_iovlen = 1
+            self.txNames = [ctypes.create_string_buffer(SOCKADDR_SIZE)
+                            for i in range(self.count)]
+            self.txIovs = (Iovec * self.count)()
+            self.txHdrs = (Mmsghdr * self.count)()
+            for i in range(self.count):
+                hdr = self.txHdrs[i].msg_hdr
+                hdr.msg_name = ctypes.addressof(self.txNames[i])
+                hdr.msg_namelen = 16  # sizeof(struct sockaddr_in)
+                hdr.msg_iov = ctypes.pointer(self.txIovs[i])
+                hdr.msg_iovlen = 1
+        else:
+            self.rxView = memoryview(bytearray(self.bs))
+
+    def receiveMany(self):
+        '''
+        Perform non blocking read of up to .count datagrams on socket
+        Returns list of (data, sa) duples, empty if no data
+        Raises socket.error on errors other than would block
+        '''
+        if self.mmsg:
+            return self._receiveMmsg()
+
+        rxes = []
+        for i in range(self.count):
+            try:
+                size, sa = self.ss.recvfrom_into(self.rxView)
+            except socket.error as ex:
+                if ex.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise
+            rxes.append((self.rxView[:size].tobytes(), sa))
+        return rxes
+
+    def _receiveMmsg(self):
+        '''
+        Receive with one recvmmsg syscall
+        '''
+        for i in range(self.count):
+            self.rxHdrs[i].msg_hdr.msg_namelen = SOCKADDR_SIZE
+        count = RECVMMSG(self.ss.fileno(), self.rxHdrs, self.count, MSG_DONTWAIT, None)
+        if count < 0:
+            err = ctypes.get_errno()
+            if err in (errno.EAGAIN, errno.EWOULDBLOCK):
+                return []
+            raise socket.error(err, errno.errorcode.get(err, ''))
+
+        rxes = []
+        for i in range(count):
+            name = self.rxNames[i].raw
+            sa = (socket.inet_ntoa(name[4:8]), PORT_PACKER.unpack(name[2:4])[0])
+            rxes.append((ctypes.string_at(self.rxBufs[i], self.rxHdrs[i].msg_len), sa))
+        return rxes
+
+    def sendMany(self, txes):
+        '''
+        Perform non blocking send of up to .count leading (data, da) duples
+        from txes in order. Stops early at a destination that is not a
+        numeric IPv4 address when using sendmmsg.
+        Returns number sent. Zero means the leading duple was not sent so
+        it should be sent singly with .send to get its error if any.
+        '''
+        if self.mmsg:
+            return self._sendMmsg(txes)
+
+        sent = 0
+        for data, da in itertools.islice(txes, self.count):
+            try:
+                self.ss.sendto(data, da)
+            except socket.error:
+                break
+            sent += 1
+        return sent
+
+    def _sendMmsg(self, txes):
+        '''
+        Send with one sendmmsg syscall
+        '''
+        keeps = []  # keep ctypes views of data alive until sent
+        count = 0
+        for data, da in itertools.islice(txes, self.count):
+            host, port = da
+            try:
+                addr = socket.inet_aton(host)
+            except (socket.error, TypeError):
+                break
+            ctypes.memmove(self.txNames[count],
+                           b''.join([AF_INET_PACKED, PORT_PACKER.pack(port), addr]),
+                           8)
+            if isinstance(data, bytes):
+                buf = ctypes.c_char_p(data)
+            else:
+                buf = (ctypes.c_char * len(data)).from_buffer(data)
+            keeps.append(buf)
+            self.txIovs[count].iov_base = ctypes.cast(buf, ctypes.c_void_p)
+            self.txIovs[count].iov_len = len(data)
+            count += 1
+
+        if not count:
+            return 0
+        sent = SENDMMSG(self.ss.fileno(), self.txHdrs, count, MSG_DONTWAIT)
+        return max(0, sent)
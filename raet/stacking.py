@@ -10,6 +10,13 @@ import socket
 import os
 import errno
 import sys
+import time
+try:
+    import selectors
+except ImportError:  # python2
+    selectors = None
+import select
+import itertools
 if sys.version_info > (3,):
     long = int
 
@@ -35,7 +42,7 @@ from . import raeting
 from . import keeping
 from . import lotting
 
-from ioflo.base.consoling import getConsole
+from .consoling import getConsole
 console = getConsole()
 
 class Stack(object):
@@ -45,6 +52,9 @@ class Stack(object):
     '''
     Count = 0
     Uid = 0 # base for next unique id for local and remotes
+    TxQuantum = 8  # stack default for max packets per destination per turn
+    TxBackoffMin = 0.05  # stack default for initial park of blocked destination
+    TxBackoffMax = 1.0  # stack default for max park of blocked destination
 
     def __init__(self,
                  store=None,
@@ -95,15 +105,21 @@ class Stack(object):
 
             self.ha = self.server.ha  # update local host address after open
 
-            console.verbose("Stack '{0}': Opened server at '{1}'\n".format(self.name,
-                                                                           self.ha))
+            console.verbose("Stack '{0}': Opened server at '{1}'\n",
+                            self.name, self.ha)
 
         self.rxMsgs = rxMsgs if rxMsgs is not None else deque() # messages received
         self.txMsgs = txMsgs if txMsgs is not None else deque() # messages to transmit
         self.rxes = rxes if rxes is not None else deque() # udp packets received
         self.txes = txes if txes is not None else deque() # udp packet to transmit
+        self.txQueues = odict()  # deques of tx duples keyed by destination address
+        self.txReadies = deque()  # destinations with packets not parked
+        self.txParks = odict()  # park timers of blocked destinations
+        self.txBackoffs = odict()  # last park duration of blocked destinations
         self.stats = stats if stats is not None else odict() # udp statistics
         self.statTimer = aiding.StoreTimer(self.store)
+        self.selector = None  # selector for event driven .serviceUntil
+        self.selectee = None
 
     @property
     def name(self):
@@ -224,6 +240,8 @@ class Stack(object):
 
         del self.uidRemotes[uid]
         del self.nameRemotes[remote.name]
+        if not any(other.ha == remote.ha for other in self.uidRemotes.values()):
+            self._dropTxes(remote.ha)
 
     def removeAllRemotes(self):
         '''
@@ -287,13 +305,33 @@ class Stack(object):
         return True
 
 
+    def _handleManyReceived(self):
+        '''
+        Handle batch of received messages from server with .receiveMany
+        assumes that there is a batched server
+        Returns True if batch was full so there may be more
+        '''
+        try:
+            rxes = self.server.receiveMany()
+        except socket.error as ex:
+            if ex.errno == errno.ECONNRESET:
+                return False
+            raise
+        self.rxes.extend(rxes)
+        return (len(rxes) >= self.server.count)
+
     def serviceReceives(self):
         '''
         Retrieve from server all recieved and put on the rxes deque
+        Uses batched receives when server is batched
         '''
         if self.server:
-            while self._handleOneReceived():
-                pass
+            if getattr(self.server, 'batched', False):
+                while self._handleManyReceived():
+                    pass
+            else:
+                while self._handleOneReceived():
+                    pass
 
     def serviceReceiveOnce(self):
         '''
@@ -308,7 +346,7 @@ class Stack(object):
         Assumes that there is a message on the .rxes deque
         '''
         raw, sa = self.rxes.popleft()
-        console.verbose("{0} received raw message\n{1}\n".format(self.name, raw))
+        console.verbose("{0} received raw message\n{1}\n", self.name, raw)
         processRx(packet=raw)
 
     def serviceRxes(self):
@@ -358,7 +396,7 @@ class Stack(object):
         '''
         body, uid = self.txMsgs.popleft() # duple (body dict, destination uid
         self.message(body, uid=uid)
-        console.verbose("{0} sending\n{1}\n".format(self.name, body))
+        console.verbose("{0} sending\n{1}\n", self.name, body)
 
     def serviceTxMsgs(self):
         '''
@@ -392,19 +430,86 @@ class Stack(object):
         self.txes.append((packed, self.remotes[duid].ha))
 
 
-    def _handleOneTx(self, laters, blocks):
+    def _queueTxes(self, count=None):
+        '''
+        Move up to count duples from .txes deque onto the per destination
+        .txQueues. count of None means all.
+        A destination whose queue becomes non empty is appended to .txReadies
+        unless it is parked
+        '''
+        while self.txes and (count is None or count > 0):
+            tx, ta = self.txes.popleft()  # duple = (packet, destination address)
+            queue = self.txQueues.get(ta)
+            if queue is None:
+                queue = self.txQueues[ta] = deque()
+            if not queue and ta not in self.txParks:
+                self.txReadies.append(ta)
+            queue.append((tx, ta))
+            if count is not None:
+                count -= 1
+
+    def _unparkTxes(self):
         '''
-        Handle one message on .txes deque
-        Assumes there is a message
-        laters is deque of messages to try again later
-        blocks is list of destinations that already blocked on this service
+        Append to .txReadies the parked destinations whose park has expired
         '''
-        tx, ta = self.txes.popleft()  # duple = (packet, destination address)
+        for ta, timer in list(self.txParks.items()):
+            if timer.expired:
+                del self.txParks[ta]
+                if self.txQueues.get(ta):
+                    self.txReadies.append(ta)
 
-        if ta in blocks: # already blocked on this iteration
-            laters.append((tx, ta)) # keep sequential
+    def _parkTx(self, ta):
+        '''
+        Park blocked destination ta so its queue is not serviced until its
+        park timer expires. Backoff doubles on each consecutive block.
+        A destination still blocked after a park of .TxBackoffMax is abandoned
+        and its queue dropped. Transactions redo their own packets.
+        '''
+        if self.txBackoffs.get(ta, 0.0) >= self.TxBackoffMax:
+            count = self._dropTxes(ta)
+            emsg = ("Stack '{0}': Abandoned {1} packets to blocked destination"
+                    " '{2}'\n".format(self.name, count, ta))
+            console.terse(emsg)
+            self.incStat("tx_abandoned", count)
             return
+        duration = min(max(self.TxBackoffMin, self.txBackoffs.get(ta, 0.0) * 2.0),
+                       self.TxBackoffMax)
+        self.txBackoffs[ta] = duration
+        self.txParks[ta] = aiding.StoreTimer(self.store, duration=duration)
+
+    def _dropTxes(self, ta):
+        '''
+        Remove queue, park, and backoff of destination ta
+        Returns number of duples dropped from its queue
+        '''
+        queue = self.txQueues.pop(ta, None)
+        self.txParks.pop(ta, None)
+        self.txBackoffs.pop(ta, None)
+        if ta in self.txReadies:
+            self.txReadies.remove(ta)
+        return (len(queue) if queue else 0)
+
+    def _popTxes(self, ta, count):
+        '''
+        Remove count sent duples from head of queue of destination ta
+        Returns True if the queue still has duples otherwise removes queue
+        '''
+        queue = self.txQueues[ta]
+        for i in range(count):
+            queue.popleft()
+        if count:
+            self.txBackoffs.pop(ta, None)  # unblocked
+        if not queue:
+            del self.txQueues[ta]
+            return False
+        return True
 
+    def _sendOneTx(self, tx, ta):
+        '''
+        Send packet tx to destination address ta through server
+        Returns True if consumed, False if blocked so destination is parked
+        Raises socket.error on other errors
+        '''
         try:
             self.server.send(tx, ta)
         except socket.error as ex:
@@ -413,34 +518,89 @@ class Stack(object):
                              errno.EHOSTUNREACH, errno.EHOSTDOWN,
                              errno.ECONNRESET]):
                 # problem sending such as busy with last message. save it for later
-                laters.append((tx, ta))
-                blocks.append(ta)
+                return False
             else:
                 raise
+        return True
+
+    def _handleOneTxTurn(self, quantum):
+        '''
+        Send up to quantum packets of next ready destination on .txReadies
+        Assumes there is a ready destination
+        Appends destination back onto .txReadies if more packets
+        Parks destination if blocked
+        '''
+        ta = self.txReadies.popleft()
+        queue = self.txQueues[ta]
+        sent = 0
+        while sent < quantum and sent < len(queue):
+            tx, da = queue[sent]
+            if not self._sendOneTx(tx, da):
+                self._popTxes(ta, sent)
+                self._parkTx(ta)
+                return
+            sent += 1
+        if self._popTxes(ta, sent):
+            self.txReadies.append(ta)
+
+    def _handleManyTxTurns(self):
+        '''
+        Send one batch through batched server gathered round robin with up to
+        .TxQuantum packets from each ready destination on .txReadies
+        Assumes there is a ready destination
+        Destinations that sent all their gathered packets go to the back of
+        .txReadies and the rest go back to the front in order.
+        Returns True if any sent. False means send the leading one singly.
+        '''
+        count = self.server.count
+        batch = []
+        takes = []  # duples of (destination, number gathered)
+        while self.txReadies and len(batch) < count:
+            ta = self.txReadies.popleft()
+            take = min(self.TxQuantum, len(self.txQueues[ta]), count - len(batch))
+            batch.extend(itertools.islice(self.txQueues[ta], take))
+            takes.append((ta, take))
+
+        sent = self.server.sendMany(batch)
+        result = sent > 0
+        fronts = []
+        for ta, take in takes:
+            done = min(take, sent)
+            sent -= done
+            more = self._popTxes(ta, done)
+            if done < take:  # not all sent so keep place
+                fronts.append(ta)
+            elif more:
+                self.txReadies.append(ta)
+        self.txReadies.extendleft(reversed(fronts))
+        return result
 
     def serviceTxes(self):
         '''
         Service the .txes deque to send  messages through server
+        Moves the .txes onto per destination queues then sends round robin
+        from the ready destinations so a blocked destination is parked
+        without holding up the others.
+        Uses batched sends when server is batched.
         '''
         if self.server:
-            laters = deque()
-            blocks = []
-            while self.txes:
-                self._handleOneTx(laters, blocks)
-            while laters:
-                self.txes.append(laters.popleft())
+            self._queueTxes()
+            self._unparkTxes()
+            batched = getattr(self.server, 'batched', False)
+            while self.txReadies:
+                if batched and self._handleManyTxTurns():
+                    continue
+                self._handleOneTxTurn(self.TxQuantum)
 
     def serviceTxOnce(self):
         '''
         Service on message on the .txes deque to send through server
         '''
         if self.server:
-            laters = deque()
-            blocks = [] # will always be empty since only once
-            if self.txes:
-                self._handleOneTx(laters, blocks)
-            while laters:
-                self.txes.append(laters.popleft())
+            self._queueTxes(count=1)
+            self._unparkTxes()
+            if self.txReadies:
+                self._handleOneTxTurn(1)
 
     def serviceAllRx(self):
         '''
@@ -509,6 +669,108 @@ class Stack(object):
         '''
         pass
 
+    def manage(self, cascade=False, immediate=False):
+        '''
+        Allow timer based management of remotes
+        '''
+        pass
+
+    def deadline(self, manage=False):
+        '''
+        Returns earliest future store stamp at which timer based processing
+        is due or None if nothing is pending.
+        manage True means include the timers serviced by .manage
+        Includes the park timers of blocked destinations
+        '''
+        stamp = self.store.stamp
+        stops = [timer.stop for timer in self.txParks.values() if timer.stop > stamp]
+        return min(stops) if stops else None
+
+    def wait(self, timeout=None):
+        '''
+        Block until server socket is readable or timeout seconds elapse
+        timeout of None means wait forever
+        Returns True if readable otherwise False
+        '''
+        if not self.server or getattr(self.server, 'ss', None) is None:
+            if timeout:
+                time.sleep(timeout)
+            return False
+
+        if selectors is not None:
+            if self.selector is None or self.selectee is not self.server.ss:
+                if self.selector is not None:
+                    self.selector.close()
+                self.selector = selectors.DefaultSelector()
+                self.selector.register(self.server.ss, selectors.EVENT_READ)
+                self.selectee = self.server.ss  # socket registered with selector
+            return bool(self.selector.select(timeout))
+
+        try:
+            readables, writeables, errables = select.select([self.server.ss],
+                                                            [], [], timeout)
+        except select.error as ex:
+            if ex.args[0] == errno.EINTR:
+                return False
+            raise
+        return bool(readables)
+
+    def serviceUntil(self, stamp=None, manage=False):
+        '''
+        Service the stack event driven until the store stamp reaches stamp
+        stamp of None means service forever
+        manage True means also call .manage each pass
+
+        Each pass services everything then blocks on the server socket
+        until it is readable or the earliest of .deadline and stamp.
+        Does not block while there are pending txMsgs or txes.
+        The store stamp is advanced by the real elapsed time so store
+        based timers run in real time.
+        '''
+        clock = getattr(time, 'monotonic', time.time)
+        last = clock()
+        while True:
+            if manage:
+                self.manage()
+            self.serviceAll()
+
+            if self.txMsgs or self.txes or self.rxes:
+                timeout = 0.0
+            else:
+                deadlines = [d for d in (self.deadline(manage=manage), stamp)
+                             if d is not None]
+                timeout = (max(0.0, min(deadlines) - self.store.stamp)
+                           if deadlines else None)
+            if timeout != 0.0:
+                self.wait(timeout)
+
+            now = clock()
+            self.store.advanceStamp(now - last)
+            last = now
+            if stamp is not None and self.store.stamp >= stamp:
+                break
+
+        self.serviceAll()
+
+    def run(self, duration=None, manage=True):
+        '''
+        Service the stack event driven for duration seconds
+        duration of None means run forever
+        manage True means also call .manage each pass
+        '''
+        stamp = None if duration is None else self.store.stamp + duration
+        self.serviceUntil(stamp=stamp, manage=manage)
+
+    def close(self):
+        '''
+        Close the server and the selector for event driven .serviceUntil if any
+        '''
+        if self.selector is not None:
+            self.selector.close()
+            self.selector = None
+            self.selectee = None
+        self.server.close()
+
 class KeepStack(Stack):
     '''
     RAET protocol base stack object with persistance via Keep attribute.
@@ -621,8 +883,8 @@ class KeepStack(Stack):
         '''
         Clear out and remove the keep dir and contents
         '''
-        console.verbose("Stack {0}: Clearing keep dir '{1}'\n".format(
-                                  self.name, self.keep.dirpath))
+        console.verbose("Stack {0}: Clearing keep dir '{1}'\n",
+                                  self.name, self.keep.dirpath)
         self.keep.clearAllDir()
 
     def dumpLocal(self):
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+'''
+Benchmark for lazy console formatting in stack servicing
+
+Run from the command line as
+python -m raet.test.bench_consoling
+
+Compares serviceAll time of message exchanges between two road stacks with
+lazy formatting against eager formatting of all console messages as done
+before the console facade. Console output goes to /dev/null.
+
+'''
+# pylint: skip-file
+# pylint: disable=C0103
+import sys
+import os
+import time
+import tempfile
+import shutil
+
+from ioflo.base.odicting import odict
+from ioflo.base import storing
+
+# Import raet libs
+from raet.abiding import *  # import globals
+from raet import raeting, nacling, consoling
+from raet.road import estating, keeping, stacking
+
+console = consoling.getConsole()
+
+
+def createStacks(base, store):
+    '''
+    Returns duple of joined and allowed (alpha, beta) road stacks
+    '''
+    stacks = []
+    for name, main, port in [('alpha', True, raeting.RAET_PORT),
+                             ('beta', None, raeting.RAET_TEST_PORT)]:
+        dirpath = os.path.join(base, 'road', 'keep', name)
+        keeping.clearAllKeep(dirpath)
+        stacks.append(stacking.RoadStack(store=store,
+                                         name=name,
+                                         main=main,
+                                         auto=raeting.AutoMode.once.value,
+                                         ha=("", port),
+                                         sigkey=nacling.Signer().keyhex,
+                                         prikey=nacling.Privateer().keyhex,
+                                         dirpath=dirpath))
+    alpha, beta = stacks
+    beta.addRemote(estating.RemoteEstate(stack=beta,
+                                         fuid=0,
+                                         sid=0,
+                                         ha=alpha.local.ha))
+    beta.join()
+    service(stacks, store)
+    beta.allow()
+    service(stacks, store)
+    return (alpha, beta)
+
+def service(stacks, store, duration=2.0):
+    '''
+    Service stacks until no transactions. Returns seconds spent in serviceAll
+    '''
+    spent = 0.0
+    end = store.stamp + duration
+    while store.stamp < end:
+        start = time.time()
+        for stack in stacks:
+            stack.serviceAll()
+        spent += time.time() - start
+        if all([not stack.transactions for stack in stacks]):
+            break
+        store.advanceStamp(0.01)
+        time.sleep(0.001)
+    return spent
+
+def benchMessages(alpha, beta, store, number=100, size=4000):
+    '''
+    Returns seconds of serviceAll for number messages from beta to alpha
+    '''
+    spent = 0.0
+    for i in range(number):
+        beta.transmit(odict(count=i, data="x" * size))
+        spent += service([alpha, beta], store)
+    alpha.rxMsgs.clear()
+    return spent
+
+def main(number=100):
+    '''
+    Run benchmarks and report results
+    '''
+    base = tempfile.mkdtemp(prefix="raet",  suffix="base")
+    store = storing.Store(stamp=0.0)
+    console.reinit(path=os.devnull)
+    results = []
+    try:
+        for verbosity in [console.Wordage.terse, console.Wordage.concise]:
+            console.reinit(verbosity=verbosity)
+            alpha, beta = createStacks(base, store)
+            benchMessages(alpha, beta, store, number=10)  # warm up
+            for eager in [True, False]:
+                consoling.Console.Eager = eager
+                spent = benchMessages(alpha, beta, store, number=number)
+                results.append((verbosity, eager, spent))
+            consoling.Console.Eager = False
+            for stack in [alpha, beta]:
+                stack.server.close()
+                stack.clearAllKeeps()
+    finally:
+        shutil.rmtree(base)
+        console.reinit(path='')
+
+    console.reinit(verbosity=console.Wordage.concise)
+    console.terse("serviceAll msec per message ({0} messages)\n".format(number))
+    for verbosity, eager, spent in results:
+        console.terse("verbosity {0} {1:<5} {2:8.3f}\n".format(
+                verbosity, 'eager' if eager else 'lazy', spent * 1e3 / number))
+
+if __name__ == '__main__':
+    main(number=int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+'''
+Benchmark for packing and parsing packet and page heads
+
+Run from the command line as
+python -m raet.test.bench_heading
+
+'''
+# pylint: skip-file
+# pylint: disable=C0103
+import sys
+import timeit
+
+from ioflo.base.odicting import odict
+from ioflo.base.consoling import getConsole
+console = getConsole()
+
+# Import raet libs
+from raet.abiding import *  # import globals
+from raet import raeting
+from raet.road import packeting
+from raet.lane import paging
+
+
+def benchPacket(hk, number=10000):
+    '''
+    Returns tuple of (pack, parse) microseconds per packet for head kind hk
+    '''
+    data = odict(hk=hk,
+                 bk=raeting.BodyKind.json.value,
+                 se=2,
+                 de=3,
+                 si=7,
+                 ti=11,
+                 tk=raeting.TrnsKind.message.value,
+                 pk=raeting.PcktKind.message.value,
+                 af=True)
+    body = odict([('msg', 'Hello Raet World'), ('extra', 'Goodby Big Moon')])
+    packet = packeting.TxPacket(embody=body, data=data)
+    packet.body.pack()
+    packet.coat.packed = packet.body.packed
+    packet.head.pack()
+    packed = packet.head.packed + packet.coat.packed
+
+    def pack():
+        packet.head.pack()
+
+    rx = packeting.RxPacket(packed=packed)
+
+    def parse():
+        rx.head.parse()
+
+    tpack = timeit.timeit(pack, number=number)
+    tparse = timeit.timeit(parse, number=number)
+    return (tpack * 1e6 / number, tparse * 1e6 / number)
+
+def benchPage(number=10000):
+    '''
+    Returns tuple of (pack, parse) microseconds per page
+    '''
+    data = odict(sn='alpha', dn='beta', si='000000000000000001', bi=3)
+    page = paging.TxPage(data=data, embody=odict(content='Hello Lane World'))
+    page.pack()
+    packed = page.packed
+
+    def pack():
+        page.head.pack()
+
+    rx = paging.RxPage(packed=packed)
+
+    def parse():
+        rx.head.parse()
+
+    tpack = timeit.timeit(pack, number=number)
+    tparse = timeit.timeit(parse, number=number)
+    return (tpack * 1e6 / number, tparse * 1e6 / number)
+
+def main(number=10000):
+    '''
+    Run benchmarks and report results
+    '''
+    console.terse("Head pack/parse usec per head ({0} iterations)\n".format(number))
+    for hk in [raeting.HeadKind.raet, raeting.HeadKind.json, raeting.HeadKind.binary]:
+        tpack, tparse = benchPacket(hk.value, number=number)
+        console.terse("packet {0:<8} pack {1:8.2f} parse {2:8.2f}\n".format(
+                hk.name, tpack, tparse))
+    tpack, tparse = benchPage(number=number)
+    console.terse("page   {0:<8} pack {1:8.2f} parse {2:8.2f}\n".format(
+            'raet', tpack, tparse))
+
+if __name__ == '__main__':
+    console.reinit(verbosity=console.Wordage.concise)
+    main(number=int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
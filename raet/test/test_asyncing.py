@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+'''
+Tests for asyncio adapter
+
+'''
+# pylint: skip-file
+# pylint: disable=C0103
+import sys
+if sys.version_info < (2, 7):
+    import unittest2 as unittest
+else:
+    import unittest
+
+import os
+import time
+import tempfile
+import shutil
+
+from ioflo.base.odicting import odict
+from ioflo.base.aiding import StoreTimer
+from ioflo.base import storing
+from ioflo.base.consoling import getConsole
+console = getConsole()
+
+# Import raet libs
+from raet.abiding import *  # import globals
+from raet import raeting, nacling
+from raet.road import estating, keeping
+from raet.road import stacking as roadstacking
+from raet.lane import yarding
+from raet.lane import stacking as lanestacking
+
+try:
+    import asyncio
+    from raet import asyncing
+except (ImportError, SyntaxError):
+    asyncing = None
+
+TEMPDIR = '/tmp'
+
+def setUpModule():
+    console.reinit(verbosity=console.Wordage.concise)
+
+def tearDownModule():
+    pass
+
+@unittest.skipIf(asyncing is None or sys.platform == 'win32', "Requires asyncio add_reader")
+class BasicTestCase(unittest.TestCase):
+    """"""
+
+    def setUp(self):
+        self.store = storing.Store(stamp=0.0)
+        self.timer = StoreTimer(store=self.store, duration=1.0)
+        self.base = tempfile.mkdtemp(prefix="raet",  suffix="base", dir=TEMPDIR)
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+        if os.path.exists(self.base):
+            shutil.rmtree(self.base)
+
+    def createRoadStack(self, name, ha, main=None):
+        '''
+        Creates road stack with auto accept
+        '''
+        dirpath = os.path.join(self.base, 'road', 'keep', name)
+        keeping.clearAllKeep(dirpath)
+        return roadstacking.RoadStack(store=self.store,
+                                      name=name,
+                                      main=main,
+                                      auto=raeting.AutoMode.once.value,
+                                      ha=ha,
+                                      sigkey=nacling.Signer().keyhex,
+                                      prikey=nacling.Privateer().keyhex,
+                                      dirpath=dirpath)
+
+    def serviceStacks(self, stacks, duration=1.0):
+        '''
+        Utility method to service queues for list of stacks. Call from test method.
+        '''
+        self.timer.restart(duration=duration)
+        while not self.timer.expired:
+            for stack in stacks:
+                stack.serviceAll()
+            if all([not stack.transactions for stack in stacks]):
+                break
+            self.store.advanceStamp(0.1)
+            time.sleep(0.1)
+
+    def runLoop(self, future, timeout=5.0):
+        '''
+        Run loop until future done or timeout and return its result
+        '''
+        return self.loop.run_until_complete(asyncio.wait_for(future,
+                                                             timeout,
+                                                             loop=self.loop))
+
+    def testRoadAdapter(self):
+        '''
+        Test asyncio adapter for road stacks
+        '''
+        console.terse("{0}\n".format(self.testRoadAdapter.__doc__))
+
+        main = self.createRoadStack('main', ("", raeting.RAET_PORT), main=True)
+        other = self.createRoadStack('other', ("", raeting.RAET_TEST_PORT))
+        other.addRemote(estating.RemoteEstate(stack=other,
+                                              fuid=0,
+                                              sid=0,
+                                              ha=main.local.ha))
+        other.join()
+        self.serviceStacks([other, main])
+        other.allow()
+        self.serviceStacks([other, main])
+        remote = other.remotes.values()[0]
+        self.assertTrue(remote.allowed)
+
+        mainer = asyncing.Adapter(main, loop=self.loop)
+        otherer = asyncing.Adapter(other, loop=self.loop)
+        mainer.open()
+        otherer.open()
+
+        outcome = self.runLoop(otherer.transmit(odict(content="Hello main")))
+        self.assertIs(outcome, raeting.Outcome.complete)
+        msg, name = self.runLoop(mainer.receive())
+        self.assertEqual(msg, odict(content="Hello main"))
+        self.assertEqual(name, other.local.name)
+
+        # async iteration over received messages
+        for i in range(3):
+            otherer.transmit(odict(count=i))
+        received = []
+        for i in range(3):
+            msg, name = self.runLoop(mainer.__anext__())
+            received.append(msg['count'])
+        self.assertEqual(received, [0, 1, 2])
+
+        # transaction timeout scheduled with call_at resolves as failure
+        mainer.close()
+        start = self.loop.time()
+        future = otherer.transmit(odict(content="Anyone"), timeout=0.5)
+        self.assertRaises(raeting.TransactionError, self.runLoop, future)
+        self.assertTrue(self.loop.time() - start >= 0.45)
+        self.assertEqual(len(other.transactions), 0)
+
+        # closed adapter ends iteration
+        self.assertRaises(StopAsyncIteration, self.runLoop, mainer.receive())
+
+        # invalid destination fails at once
+        future = otherer.transmit(odict(content="Nobody"), uid=99)
+        self.assertRaises(raeting.TransactionError, self.runLoop, future)
+
+        otherer.close()
+        main.server.close()
+        other.server.close()
+        main.clearAllDir()
+        other.clearAllDir()
+
+    def testLaneAdapter(self):
+        '''
+        Test asyncio adapter for lane stacks
+        '''
+        console.terse("{0}\n".format(self.testLaneAdapter.__doc__))
+
+        dirpath = os.path.join(self.base, 'lane', 'keep')
+        main = lanestacking.LaneStack(store=self.store,
+                                      name='main',
+                                      uid=1,
+                                      lanename='cherry',
+                                      sockdirpath=dirpath)
+        other = lanestacking.LaneStack(store=self.store,
+                                       name='other',
+                                       uid=1,
+                                       lanename='cherry',
+                                       sockdirpath=dirpath)
+        main.addRemote(yarding.RemoteYard(stack=main, ha=other.ha))
+        other.addRemote(yarding.RemoteYard(stack=other, ha=main.ha))
+
+        mainer = asyncing.Adapter(main, loop=self.loop)
+        otherer = asyncing.Adapter(other, loop=self.loop)
+        mainer.open()
+        otherer.open()
+        self.assertFalse(mainer.manage)
+
+        outcome = self.runLoop(otherer.transmit(odict(content="Hello main")))
+        self.assertIs(outcome, raeting.Outcome.complete)
+        msg, name = self.runLoop(mainer.receive())
+        self.assertEqual(msg, odict(content="Hello main"))
+        self.assertEqual(name, other.local.name)
+
+        mainer.close()
+        otherer.close()
+        main.server.close()
+        other.server.close()
+
+def runOne(test):
+    '''
+    Unittest Runner
+    '''
+    test = BasicTestCase(test)
+    suite = unittest.TestSuite([test])
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+def runSome():
+    """ Unittest runner """
+    tests =  []
+    names = ['testRoadAdapter',
+             'testLaneAdapter', ]
+    tests.extend(map(BasicTestCase, names))
+
+    suite = unittest.TestSuite(tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+def runAll():
+    """ Unittest runner """
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.TestLoader().loadTestsFromTestCase(BasicTestCase))
+
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+if __name__ == '__main__' and __package__ is None:
+
+    #console.reinit(verbosity=console.Wordage.concise)
+
+    runAll() #run all unittests
+
+    #runSome()#only run some
+
+    #runOne('testRoadAdapter')
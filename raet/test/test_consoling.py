@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+'''
+Tests for console logging facade
+
+'''
+# pylint: skip-file
+# pylint: disable=C0103
+import sys
+if sys.version_info < (2, 7):
+    import unittest2 as unittest
+else:
+    import unittest
+
+import os
+import tempfile
+import shutil
+
+from ioflo.base import consoling as iofloconsoling
+from ioflo.base.consoling import getConsole, Console
+console = getConsole()
+
+# Import raet libs
+from raet.abiding import *  # import globals
+from raet import consoling
+
+def setUpModule():
+    console.reinit(verbosity=console.Wordage.concise)
+
+def tearDownModule():
+    pass
+
+class Formatted(object):
+    '''
+    Counts its formattings
+    '''
+    count = 0
+
+    def __format__(self, spec):
+        Formatted.count += 1
+        return 'formatted'
+
+class BasicTestCase(unittest.TestCase):
+    """"""
+
+    def setUp(self):
+        self.base = tempfile.mkdtemp(prefix="raet",  suffix="base")
+        self.path = os.path.join(self.base, 'console.txt')
+        self.console = consoling.getConsole(
+                console=iofloconsoling.Console(path=self.path,
+                                               verbosity=Console.Wordage.concise))
+        Formatted.count = 0
+
+    def tearDown(self):
+        self.console.close()
+        shutil.rmtree(self.base)
+
+    def output(self):
+        self.console.flush()
+        with open(self.path) as f:
+            return f.read()
+
+    def testLazy(self):
+        '''
+        Test messages are only formatted when written
+        '''
+        console.terse("{0}\n".format(self.testLazy.__doc__))
+        self.assertIs(consoling.getConsole().console, iofloconsoling.getConsole())
+        lazy = self.console
+
+        self.assertTrue(lazy.enabled(lazy.Wordage.terse))
+        self.assertTrue(lazy.enabled(lazy.Wordage.concise))
+        self.assertFalse(lazy.enabled(lazy.Wordage.verbose))
+
+        value = Formatted()
+        lazy.verbose("skipped {0}\n", value)
+        lazy.profuse("skipped {0}\n", value)
+        self.assertEqual(Formatted.count, 0)
+        lazy.concise("written {0}\n", value)
+        self.assertEqual(Formatted.count, 1)
+        lazy.concise("as is {0}\n")  # no args so not formatted
+        self.assertTrue(self.output().endswith("written formatted\nas is {0}\n"))
+
+        consoling.Console.Eager = True
+        lazy.verbose("skipped {0}\n", value)
+        self.assertEqual(Formatted.count, 2)
+        consoling.Console.Eager = False
+        self.assertNotIn("skipped", self.output())
+
+        lazy.reinit(verbosity=lazy.Wordage.verbose)
+        lazy.verbose("written {0}\n", value)
+        self.assertEqual(Formatted.count, 3)
+        self.assertTrue(self.output().endswith("written formatted\n"))
+
+def runOne(test):
+    '''
+    Unittest Runner
+    '''
+    test = BasicTestCase(test)
+    suite = unittest.TestSuite([test])
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+def runSome():
+    """ Unittest runner """
+    tests =  []
+    names = ['testLazy', ]
+    tests.extend(map(BasicTestCase, names))
+
+    suite = unittest.TestSuite(tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+def runAll():
+    """ Unittest runner """
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.TestLoader().loadTestsFromTestCase(BasicTestCase))
+
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+if __name__ == '__main__' and __package__ is None:
+
+    #console.reinit(verbosity=console.Wordage.concise)
+
+    runAll() #run all unittests
+
+    #runSome()#only run some
+
+    #runOne('testLazy')
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+'''
+Tests for compiled head codecs
+
+'''
+# pylint: skip-file
+# pylint: disable=C0103
+import sys
+if sys.version_info < (2, 7):
+    import unittest2 as unittest
+else:
+    import unittest
+
+from ioflo.base.odicting import odict
+from ioflo.base.consoling import getConsole
+console = getConsole()
+
+# Import raet libs
+from raet.abiding import *  # import globals
+from raet import raeting, heading
+
+def setUpModule():
+    console.reinit(verbosity=console.Wordage.concise)
+
+def tearDownModule():
+    pass
+
+class BasicTestCase(unittest.TestCase):
+    """"""
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def testPacketCodecs(self):
+        '''
+        Test packet head codecs pack parse round trip for each head kind
+        '''
+        console.terse("{0}\n".format(self.testPacketCodecs.__doc__))
+
+        self.assertEqual(list(heading.PACKET_HEAD_CODECS.keys()),
+                         [raeting.HeadKind.raet.value,
+                          raeting.HeadKind.json.value,
+                          raeting.HeadKind.binary.value])
+
+        for hk in heading.PACKET_HEAD_CODECS:
+            codec = heading.packetHeadCodec(hk)
+            self.assertEqual(codec.Hk, hk)
+            data = odict(raeting.PACKET_DEFAULTS)
+            data.update(hk=hk, bk=raeting.BodyKind.json.value, se=2, de=3,
+                        ti=5, af=True, wf=True)
+            data['fg'] = "{0:02x}".format(codec.packFlags(data))
+            self.assertEqual(data['fg'], '14')
+            packed = codec.pack(data, 10)
+            self.assertEqual(data['hl'], len(packed))
+            self.assertEqual(data['pl'], len(packed) + 10)
+            self.assertIs(heading.detectPacketHeadCodec(packed + b' ' * 10), codec)
+
+            rxData = odict(raeting.PACKET_DEFAULTS)
+            head = codec.parse(packed + b' ' * 10, rxData)
+            self.assertEqual(head, packed)
+            for key in ['hk', 'hl', 'pl', 'bk', 'se', 'de', 'ti', 'af', 'wf',
+                        'cf', 'fg']:
+                self.assertEqual(rxData[key], data[key])
+
+        self.assertIs(heading.detectPacketHeadCodec(b'junk'), None)
+        self.assertRaises(raeting.PacketError,
+                          heading.packetHeadCodec,
+                          raeting.HeadKind.unknown.value)
+
+    def testPacketRaetCodecElision(self):
+        '''
+        Test raet packet head codec only includes non default fields
+        '''
+        console.terse("{0}\n".format(self.testPacketRaetCodecElision.__doc__))
+        codec = heading.packetHeadCodec(raeting.HeadKind.raet.value)
+        data = odict(raeting.PACKET_DEFAULTS)
+        data.update(bk=raeting.BodyKind.json.value)
+        packed = codec.pack(data, 52)
+        self.assertEqual(packed, b'ri RAET\npl 0056\nhl 22\nfg 00\nbk 1\n\n')
+
+        data = odict(raeting.PACKET_DEFAULTS)
+        self.assertRaises(raeting.PacketError, codec.parse,
+                          b'ri RAET\npl 0056\nhl 22\nzz 1\n\n', data)
+
+    def testPageCodec(self):
+        '''
+        Test page head codec pack parse round trip
+        '''
+        console.terse("{0}\n".format(self.testPageCodec.__doc__))
+        codec = heading.PAGE_HEAD_CODEC
+        data = odict(raeting.PAGE_DEFAULTS)
+        data.update(sn='alpha', dn='beta', bi=3)
+        packed = codec.pack(data)
+        self.assertEqual(packed, b'ri RAET\nvn 0\npk 0\nsn alpha\ndn beta\n'
+                                 b'si 000000000000000000\nbi 3\npn 0000\npc 0001\n\n')
+        self.assertTrue(codec.match(packed + b'{}'))
+
+        rxData = odict()
+        head, rest = codec.parse(packed + b'{}', rxData)
+        self.assertEqual(head, packed)
+        self.assertEqual(rest, b'{}')
+        self.assertDictEqual(rxData, data)
+
+        data['zz'] = 1
+        self.assertRaises(raeting.PageError, codec.pack, data)
+
+def runOne(test):
+    '''
+    Unittest Runner
+    '''
+    test = BasicTestCase(test)
+    suite = unittest.TestSuite([test])
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+def runSome():
+    """ Unittest runner """
+    tests =  []
+    names = ['testPacketCodecs',
+             'testPacketRaetCodecElision',
+             'testPageCodec', ]
+    tests.extend(map(BasicTestCase, names))
+
+    suite = unittest.TestSuite(tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+def runAll():
+    """ Unittest runner """
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.TestLoader().loadTestsFromTestCase(BasicTestCase))
+
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+if __name__ == '__main__' and __package__ is None:
+
+    #console.reinit(verbosity=console.Wordage.concise)
+
+    runAll() #run all unittests
+
+    #runSome()#only run some
+
+    #runOne('testPacketCodecs')
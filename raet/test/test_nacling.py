@@ -91,6 +91,61 @@ class BasicTestCase(unittest.TestCase):
         self.assertTrue(verified)
         console.terse("Verified by Pam = {0}\n".format(verified))
 
+    def testSignDetachedBuffers(self):
+        '''
+        Test detached signature and verification of buffer views
+        '''
+        console.terse("{0}\n".format(self.testSignDetachedBuffers.__doc__))
+        signerBob = nacling.Signer()
+        verferPam = nacling.Verifier(signerBob.verraw)
+
+        msg = b"Hello This is Bob, how are you Pam?"
+        signature = signerBob.signature(msg)
+        self.assertEqual(signature, signerBob.key.sign(msg).signature)
+
+        packed = bytearray(msg) + bytearray(64)
+        view = memoryview(packed)[:len(msg)]
+        self.assertEqual(signerBob.signature(bytearray(msg)), signature)
+        self.assertEqual(signerBob.signature(view), signature)
+        self.assertEqual(signerBob.signature(memoryview(msg)), signature)
+        self.assertEqual(signerBob.signature(memoryview(msg + b"!")[:len(msg)]),
+                         signature)
+
+        packed[len(msg):] = signature  # foot written in place
+        self.assertTrue(verferPam.verify(signature, view))
+        self.assertTrue(verferPam.verify(memoryview(packed)[len(msg):], msg))
+        self.assertTrue(verferPam.verify(signature, memoryview(msg)))
+        self.assertFalse(verferPam.verify(signature, msg + b"!"))
+        self.assertFalse(verferPam.verify(signature, bytearray(len(msg))))
+
+        self.assertIs(nacling.cbuffer(msg), msg)
+        self.assertIs(nacling.cbuffer(memoryview(msg)), msg)
+
+    def testVerifyBatch(self):
+        '''
+        Test batch verification of detached signatures
+        '''
+        console.terse("{0}\n".format(self.testVerifyBatch.__doc__))
+        signerBob = nacling.Signer()
+        signerPam = nacling.Signer()
+
+        triples = []
+        for i in range(8):
+            signer = signerBob if i % 2 else signerPam
+            msg = ns2b("Message number {0}".format(i))
+            triples.append((signer.signature(msg), msg, signer.verraw))
+        self.assertEqual(nacling.verifyBatch(triples), [True] * 8)
+        self.assertEqual(nacling.verifyBatch([]), [])
+
+        sig, msg, key = triples[3]
+        triples[3] = (sig, msg + b"!", key)  # tampered
+        sig, msg, key = triples[4]
+        triples[4] = (sig, msg, signerBob.verraw)  # wrong key
+        triples[5] = (triples[5][0], triples[5][1], b'')  # unknown key
+        triples[6] = (triples[6][0][:32], triples[6][1], triples[6][2])  # short
+        self.assertEqual(nacling.verifyBatch(triples),
+                         [True, True, True, False, False, False, False, True])
+
     def testEncrypt(self):
         '''
         Test encryption decryption with public private remote local key pairs
@@ -222,6 +277,126 @@ class BasicTestCase(unittest.TestCase):
         self.assertEqual(len(demsg), 50)
         self.assertEqual(demsg, enmsg)
 
+    def testShare(self):
+        '''
+        Test encryption decryption with precomputed shared keys
+        '''
+        console.terse("{0}\n".format(self.testShare.__doc__))
+        priverBob = nacling.Privateer()
+        pubberBob = nacling.Publican(priverBob.pubhex)
+        priverPam = nacling.Privateer()
+        pubberPam = nacling.Publican(priverPam.pubraw)
+
+        sharerBob = nacling.Sharer(priverBob, pubberPam)
+        sharerPam = nacling.Sharer(priverPam, pubberBob)
+        self.assertEqual(len(sharerBob.key), 32)
+        self.assertEqual(sharerBob.key, sharerPam.key)
+        self.assertIs(sharerBob.privateer, priverBob)
+        self.assertIs(sharerBob.publican, pubberPam)
+
+        enmsg = ns2b("Hello its me Bob, Did you get my last message?")
+
+        # shared encrypt and unshared decrypt interoperate
+        cipher, nonce = sharerBob.encrypt(enmsg)
+        self.assertEqual(len(nonce), 24)
+        self.assertEqual(sharerPam.decrypt(cipher, nonce), enmsg)
+        self.assertEqual(priverPam.decrypt(cipher, nonce, pubberBob.key), enmsg)
+
+        cipher, nonce = priverPam.encrypt(enmsg, pubberBob.key)
+        self.assertEqual(sharerBob.decrypt(cipher, nonce), enmsg)
+
+        # session mac authenticates with either side shared key
+        tag = sharerBob.mac(enmsg)
+        self.assertEqual(len(tag), 32)
+        self.assertNotEqual(sharerBob.authKey, sharerBob.key)
+        self.assertTrue(sharerPam.authenticate(tag, enmsg))
+        self.assertFalse(sharerPam.authenticate(tag, enmsg + b'.'))
+        self.assertFalse(sharerPam.authenticate(b''.rjust(32, b'\x00'), enmsg))
+
+    def testShareCounted(self):
+        '''
+        Test counted session nonces and stale nonce rejection with shared keys
+        '''
+        console.terse("{0}\n".format(self.testShareCounted.__doc__))
+        priverBob = nacling.Privateer()
+        pubberBob = nacling.Publican(priverBob.pubhex)
+        priverPam = nacling.Privateer()
+        pubberPam = nacling.Publican(priverPam.pubraw)
+
+        sharerBob = nacling.Sharer(priverBob, pubberPam, counted=True)
+        sharerPam = nacling.Sharer(priverPam, pubberBob)
+        self.assertIs(sharerBob.counted, True)
+        self.assertEqual(len(sharerBob.prefix), 16)
+        self.assertIs(sharerPam.counted, False)
+        self.assertIs(sharerPam.prefix, None)
+
+        # not counted never rejects
+        cipher, nonce = sharerBob.encrypt(b"")
+        self.assertTrue(sharerPam.fresh(nonce))
+        self.assertTrue(sharerPam.fresh(nonce))
+        sharerBob.counter = 0
+        sharerPam = nacling.Sharer(priverPam, pubberBob, counted=True)
+
+        enmsg = ns2b("Hello its me Bob, Did you get my last message?")
+        nonces = []
+        for i in range(4):
+            cipher, nonce = sharerBob.encrypt(enmsg)
+            self.assertEqual(len(nonce), 24)
+            self.assertEqual(nonce[:16], sharerBob.prefix)
+            self.assertEqual(nonce[16:], struct.pack('!Q', i + 1))
+            self.assertEqual(sharerPam.decrypt(cipher, nonce), enmsg)
+            nonces.append(nonce)
+        self.assertEqual(sharerBob.counter, 4)
+
+        # reordered within window accepted once, repeats rejected
+        for nonce in [nonces[0], nonces[2], nonces[1], nonces[3]]:
+            self.assertTrue(sharerPam.fresh(nonce))
+        for nonce in nonces:
+            self.assertFalse(sharerPam.fresh(nonce))
+        self.assertEqual(sharerPam.rxCounter, 4)
+
+        # backwards beyond window rejected
+        sharerBob.counter += sharerPam.Window + 1
+        cipher, nonce = sharerBob.encrypt(enmsg)
+        self.assertTrue(sharerPam.fresh(nonce))
+        cipher, nonce = sharerBob.encrypt(enmsg)
+        self.assertTrue(sharerPam.fresh(nonce))
+        self.assertFalse(sharerPam.fresh(nonces[3]))
+
+        # random nonces never share a prefix
+        for i in range(4):
+            cipher, nonce = priverPam.encrypt(enmsg, pubberBob.key)
+            self.assertEqual(sharerBob.decrypt(cipher, nonce), enmsg)
+            self.assertTrue(sharerBob.fresh(nonce))
+
+        # new session prefix restarts window
+        sharerBob = nacling.Sharer(priverBob, pubberPam, counted=True)
+        cipher, nonce = sharerBob.encrypt(enmsg)
+        self.assertEqual(nonce[16:], struct.pack('!Q', 1))
+        self.assertTrue(sharerPam.fresh(nonce))
+
+    def testKeypool(self):
+        '''
+        Test pool of pregenerated short term keys
+        '''
+        console.terse("{0}\n".format(self.testKeypool.__doc__))
+        keypool = nacling.Keypool(size=4)
+        self.assertEqual(keypool.low, 2)
+        keypool.filler.join(5.0)
+        self.assertEqual(len(keypool), 4)
+
+        filler = keypool.filler
+        privateers = [keypool.take() for i in range(2)]
+        self.assertEqual(len(set(privateer.keyraw for privateer in privateers)), 2)
+        self.assertIs(keypool.filler, filler)  # not low yet so not refilled
+        keypool.take()  # below low starts refill
+        keypool.filler.join(5.0)
+        self.assertEqual(len(keypool), 4)
+
+        keypool.privateers.clear()  # empty pool makes one inline
+        privateer = keypool.take()
+        self.assertTrue(isinstance(privateer, nacling.Privateer))
+
     def testUuid(self):
         '''
         Test uuid generation
@@ -318,7 +493,12 @@ def runSome():
     """ Unittest runner """
     tests = []
     names = ['testSign',
-             'testEncrypt'
+             'testSignDetachedBuffers',
+             'testVerifyBatch',
+             'testEncrypt',
+             'testShare',
+             'testShareCounted',
+             'testKeypool',
              'testUuid', ]
     tests.extend(map(BasicTestCase, names))
 
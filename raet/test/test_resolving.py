@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+'''
+Tests for cached host resolution
+
+'''
+# pylint: skip-file
+# pylint: disable=C0103
+import sys
+if sys.version_info < (2, 7):
+    import unittest2 as unittest
+else:
+    import unittest
+
+import socket
+
+from ioflo.base.consoling import getConsole
+console = getConsole()
+
+# Import raet libs
+from raet.abiding import *  # import globals
+from raet import resolving
+
+def setUpModule():
+    console.reinit(verbosity=console.Wordage.concise)
+
+def tearDownModule():
+    pass
+
+class BasicTestCase(unittest.TestCase):
+    """"""
+
+    def setUp(self):
+        self.lookups = []
+        self.gethostbyname = socket.gethostbyname
+        self.getfqdn = socket.getfqdn
+
+        def gethostbyname(host):
+            self.lookups.append(('address', host))
+            return '10.0.0.{0}'.format(len(self.lookups))
+
+        def getfqdn(host):
+            self.lookups.append(('fqdn', host))
+            return '{0}.example.com'.format(host)
+
+        socket.gethostbyname = gethostbyname
+        socket.getfqdn = getfqdn
+
+    def tearDown(self):
+        socket.gethostbyname = self.gethostbyname
+        socket.getfqdn = self.getfqdn
+
+    def testResolve(self):
+        '''
+        Test numeric short circuit and LRU with TTL caching of addresses
+        '''
+        console.terse("{0}\n".format(self.testResolve.__doc__))
+
+        resolver = resolving.Resolver(size=2)
+        self.assertEqual(resolver.resolve('192.168.1.5'), '192.168.1.5')
+        self.assertEqual(resolver.resolve(''), '127.0.0.1')
+        self.assertEqual(resolver.resolve('0.0.0.0'), '127.0.0.1')
+        self.assertEqual(self.lookups, [])
+        self.assertFalse(resolving.numeric('1'))  # gethostbyname expands it
+        self.assertFalse(resolving.numeric('alpha'))
+
+        self.assertEqual(resolver.resolve('alpha'), '10.0.0.1')
+        self.assertEqual(resolver.resolve('alpha'), '10.0.0.1')
+        self.assertEqual(self.lookups, [('address', 'alpha')])
+
+        resolver.resolve('beta')
+        resolver.resolve('alpha')  # alpha most recently used
+        resolver.resolve('gamma')  # evicts beta
+        self.assertEqual(list(resolver.hosts.keys()), ['alpha', 'gamma'])
+        self.assertEqual(len(self.lookups), 3)
+
+        resolver.ttl = -1.0  # new entries expire at once
+        resolver.clear()
+        resolver.resolve('alpha')
+        resolver.resolve('alpha')
+        self.assertEqual(len(self.lookups), 5)
+
+    def testFqdn(self):
+        '''
+        Test cached and prefetched fqdn lookups
+        '''
+        console.terse("{0}\n".format(self.testFqdn.__doc__))
+
+        resolver = resolving.Resolver()
+        self.assertIs(resolver.cached('10.0.0.9'), None)
+        self.assertEqual(self.lookups, [])
+        self.assertEqual(resolver.fqdn('10.0.0.9'), '10.0.0.9.example.com')
+        self.assertEqual(resolver.fqdn('10.0.0.9'), '10.0.0.9.example.com')
+        self.assertEqual(self.lookups, [('fqdn', '10.0.0.9')])
+        self.assertEqual(resolver.cached('10.0.0.9'), '10.0.0.9.example.com')
+
+        thread = resolver.prefetch('10.0.0.7')
+        self.assertIsNot(thread, None)
+        thread.join(5.0)
+        self.assertEqual(resolver.pendings, set())
+        self.assertEqual(len(self.lookups), 2)
+        self.assertEqual(resolver.fqdn('10.0.0.7'), '10.0.0.7.example.com')
+        self.assertEqual(len(self.lookups), 2)
+        self.assertIs(resolver.prefetch('10.0.0.7'), None)  # already cached
+
+def runOne(test):
+    '''
+    Unittest Runner
+    '''
+    test = BasicTestCase(test)
+    suite = unittest.TestSuite([test])
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+def runSome():
+    """ Unittest runner """
+    tests =  []
+    names = ['testResolve',
+             'testFqdn', ]
+    tests.extend(map(BasicTestCase, names))
+
+    suite = unittest.TestSuite(tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+def runAll():
+    """ Unittest runner """
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.TestLoader().loadTestsFromTestCase(BasicTestCase))
+
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+if __name__ == '__main__' and __package__ is None:
+
+    #console.reinit(verbosity=console.Wordage.concise)
+
+    runAll() #run all unittests
+
+    #runSome()#only run some
+
+    #runOne('testResolve')
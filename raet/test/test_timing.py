@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+'''
+Tests for timer scheduling
+
+'''
+# pylint: skip-file
+# pylint: disable=C0103
+import sys
+if sys.version_info < (2, 7):
+    import unittest2 as unittest
+else:
+    import unittest
+
+from ioflo.base import storing
+from ioflo.base.consoling import getConsole
+console = getConsole()
+
+# Import raet libs
+from raet.abiding import *  # import globals
+from raet import timing
+
+def setUpModule():
+    console.reinit(verbosity=console.Wordage.concise)
+
+def tearDownModule():
+    pass
+
+class BasicTestCase(unittest.TestCase):
+    """"""
+
+    def setUp(self):
+        self.store = storing.Store(stamp=0.0)
+
+    def tearDown(self):
+        pass
+
+    def testTimeline(self):
+        '''
+        Test timeline pops unique due owners in order of due
+        '''
+        console.terse("{0}\n".format(self.testTimeline.__doc__))
+
+        timeline = timing.Timeline()
+        self.assertEqual(len(timeline), 0)
+        self.assertIs(timeline.deadline(0.0), None)
+        self.assertEqual(timeline.pop(10.0), [])
+
+        alpha = object()
+        beta = object()
+        timeline.add(2.0, alpha)
+        timeline.add(1.0, beta)
+        timeline.add(3.0, alpha)
+        self.assertEqual(len(timeline), 3)
+        self.assertEqual(timeline.deadline(0.0), 1.0)
+        self.assertEqual(timeline.deadline(1.0), 2.0)
+        self.assertEqual(timeline.pop(0.5), [])
+        self.assertEqual(timeline.pop(3.0), [beta, alpha])
+        self.assertEqual(len(timeline), 0)
+
+    def testDueTimer(self):
+        '''
+        Test due timer schedules its stop on timeline when restarted
+        '''
+        console.terse("{0}\n".format(self.testDueTimer.__doc__))
+
+        timeline = timing.Timeline()
+        owner = object()
+        timer = timing.DueTimer(self.store, duration=1.0, timeline=timeline,
+                                owner=owner)
+        self.assertEqual(timer.stop, 1.0)
+        self.assertEqual(timeline.deadline(0.0), 1.0)
+
+        self.store.advanceStamp(0.5)
+        timer.restart(duration=2.0)  # later so entry kept
+        self.assertEqual(len(timeline), 1)
+        self.assertEqual(timeline.deadline(self.store.stamp), 2.5)
+        self.assertEqual(timeline.pop(self.store.stamp), [])
+        self.store.advanceStamp(0.5)
+        self.assertEqual(timeline.pop(self.store.stamp), [])  # pushed again
+        self.assertEqual(len(timeline), 1)
+        self.assertEqual(timeline.deadline(self.store.stamp), 2.5)
+        timer.extend(1.0)
+        self.assertEqual(timeline.deadline(self.store.stamp), 3.5)
+        self.assertEqual(len(timeline), 1)
+
+        timer.restart(duration=0.5)  # earlier so supersedes
+        self.assertEqual(len(timeline), 2)
+        self.assertEqual(timeline.deadline(self.store.stamp), 1.5)
+        self.store.advanceStamp(0.5)
+        self.assertEqual(timeline.pop(self.store.stamp), [owner])
+        self.assertTrue(timer.expired)
+        self.assertEqual(len(timeline), 1)  # superseded entry
+        self.assertIs(timeline.deadline(self.store.stamp), None)
+        self.store.advanceStamp(10.0)
+        self.assertEqual(timeline.pop(self.store.stamp), [])
+        self.assertEqual(len(timeline), 0)
+
+        timer = timing.DueTimer(self.store, duration=1.0)  # unscheduled
+        timer.restart()
+        self.assertIs(timer.timeline, None)
+
+    def testDueTimerBounded(self):
+        '''
+        Test timeline stays bounded when due timers restart often
+        '''
+        console.terse("{0}\n".format(self.testDueTimerBounded.__doc__))
+
+        timeline = timing.Timeline()
+        owners = [object() for i in range(3)]
+        timers = [timing.DueTimer(self.store, duration=3600.0, timeline=timeline,
+                                  owner=owner) for owner in owners]
+        for i in range(1000):  # such as reap timers refreshed by each packet
+            self.store.advanceStamp(0.01)
+            for timer in timers:
+                timer.restart()
+            self.assertEqual(timeline.pop(self.store.stamp), [])
+        self.assertEqual(len(timeline), len(timers))
+        self.assertEqual(timeline.deadline(self.store.stamp), self.store.stamp + 3600.0)
+
+        for i in range(1000):  # shrinking durations supersede entries
+            timers[0].restart(duration=3600.0 - i)
+        self.assertLessEqual(len(timeline), 1000 + len(timers))
+        self.store.advanceStamp(3600.0)
+        self.assertEqual(timeline.pop(self.store.stamp), owners)
+        self.assertEqual(len(timeline), 0)
+
+def runOne(test):
+    '''
+    Unittest Runner
+    '''
+    test = BasicTestCase(test)
+    suite = unittest.TestSuite([test])
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+def runSome():
+    """ Unittest runner """
+    tests =  []
+    names = ['testTimeline',
+             'testDueTimer',
+             'testDueTimerBounded', ]
+    tests.extend(map(BasicTestCase, names))
+
+    suite = unittest.TestSuite(tests)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+def runAll():
+    """ Unittest runner """
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.TestLoader().loadTestsFromTestCase(BasicTestCase))
+
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+if __name__ == '__main__' and __package__ is None:
+
+    #console.reinit(verbosity=console.Wordage.concise)
+
+    runAll() #run all unittests
+
+    #runSome()#only run some
+
+    #runOne('testTimeline')
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+'''
+timing.py raet protocol timer scheduling
+
+Timeline is a heap of timer stops so stacks only process the owners of timers
+that are due instead of polling every timer. DueTimer is a StoreTimer that
+schedules its stop on a Timeline each time it is (re)started.
+'''
+# pylint: skip-file
+# pylint: disable=W0611
+
+# Import python libs
+import heapq
+import itertools
+
+# Import ioflo libs
+from ioflo.base import aiding
+
+# Import raet libs
+from .abiding import *  # import globals
+
+from .consoling import getConsole
+console = getConsole()
+
+
+class Timeline(object):
+    '''
+    Heap of (stop, count, owner, timer) entries ordered by stop
+    A DueTimer keeps one live entry due no later than its stop. Restarting it
+    later leaves its entry to be pushed again at the new stop when popped.
+    Restarting it earlier pushes a new entry which supersedes the old one
+    so the old one is dropped when reached. So the heap holds about one entry
+    per timer however often timers restart. Entries added for owners without
+    a timer are popped as is.
+    '''
+    def __init__(self):
+        '''
+        Setup instance
+        '''
+        self.heap = []
+        self.counter = itertools.count()  # tie breaker keeps owners uncompared
+
+    def __len__(self):
+        return len(self.heap)
+
+    def add(self, stop, owner):
+        '''
+        Add entry for owner due at stop
+        '''
+        heapq.heappush(self.heap, (stop, next(self.counter), owner, None))
+
+    def schedule(self, timer):
+        '''
+        Add entry for timer owner due at timer stop unless timer already has
+        a live entry due no later
+        '''
+        if timer.entry is not None and timer.entry[0] <= timer.stop:
+            return
+        count = next(self.counter)
+        timer.entry = (timer.stop, count)
+        heapq.heappush(self.heap, (timer.stop, count, timer.owner, timer))
+
+    def pop(self, stamp):
+        '''
+        Remove entries due at or before stamp
+        Returns list of unique owners of due timers or entries in order of due
+        Timers restarted to stops after stamp are scheduled again instead
+        Entries added while owners are being processed are not included
+        '''
+        owners = []
+        seen = set()
+        laters = []
+        while self.heap and self.heap[0][0] <= stamp:
+            stop, count, owner, timer = heapq.heappop(self.heap)
+            if timer is not None:
+                if timer.entry != (stop, count):
+                    continue  # superseded by earlier entry
+                timer.entry = None
+                if timer.stop > stamp:  # restarted later since so not due
+                    laters.append(timer)
+                    continue
+            if id(owner) not in seen:
+                seen.add(id(owner))
+                owners.append(owner)
+        for timer in laters:
+            self.schedule(timer)
+        return owners
+
+    def deadline(self, stamp):
+        '''
+        Returns earliest stop after stamp or None if none
+        '''
+        if not self.heap:
+            return None
+        stop, count, owner, timer = self.heap[0]
+        if stop > stamp and (timer is None or
+                             (timer.entry == (stop, count) and timer.stop == stop)):
+            return stop  # no other entry or timer stop is earlier
+        stops = []
+        for stop, count, owner, timer in self.heap:
+            if timer is not None:
+                if timer.entry != (stop, count):
+                    continue  # superseded
+                stop = timer.stop
+            if stop > stamp:
+                stops.append(stop)
+        return min(stops) if stops else None
+
+
+class DueTimer(aiding.StoreTimer):
+    '''
+    StoreTimer that schedules its stop for owner on timeline when (re)started
+    timeline of None means not scheduled so just a StoreTimer
+    .entry is the (stop, count) of its live timeline entry if any
+    '''
+    def __init__(self, store, duration=0.0, timeline=None, owner=None):
+        '''
+        Setup instance
+        '''
+        self.timeline = timeline
+        self.owner = owner
+        self.entry = None
+        super(DueTimer, self).__init__(store, duration=duration)
+
+    def restart(self, start=None, duration=None):
+        '''
+        Augment restart to schedule new stop on timeline
+        '''
+        result = super(DueTimer, self).restart(start=start, duration=duration)
+        if self.timeline is not None:
+            self.timeline.schedule(self)
+        return result